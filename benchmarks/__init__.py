@@ -0,0 +1,7 @@
+"""
+Benchmark suite for the hot views, run against a seeded synthetic school.
+
+Usage:
+    python manage.py run_benchmarks --output before.json
+    python manage.py run_benchmarks --output after.json --compare before.json
+"""
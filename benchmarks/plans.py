@@ -0,0 +1,77 @@
+"""
+Query-plan checks: EXPLAIN the hot count/rank/list queries against the seeded
+database and confirm they are served by the composite indexes instead of a
+full table scan.
+"""
+import re
+
+from django.db import connection
+
+from curriculum.models import Progress
+from exams.models import ExamSubmission
+from users.models import User
+
+
+def build_plan_checks(school):
+    """Check list: (name, queryset, table, expected index name or None for any index)"""
+    student = school['student']
+    lesson = school['lessons'][0]
+    exam = school['exams'][0]
+    return [
+        ('progress completed by student',
+         Progress.objects.filter(student=student, is_completed=True).values('pk'),
+         Progress._meta.db_table, 'progress_student_done_idx'),
+        ('progress by student and lesson',
+         Progress.objects.filter(student=student, lesson=lesson),
+         Progress._meta.db_table, None),
+        ('progress completed by lesson',
+         Progress.objects.filter(lesson=lesson, is_completed=True).values('pk'),
+         Progress._meta.db_table, 'progress_lesson_done_idx'),
+        ('exam rank',
+         ExamSubmission.objects.filter(exam=exam, score__gt=5).values('pk'),
+         ExamSubmission._meta.db_table, 'submission_exam_score_idx'),
+        ('student exam history',
+         ExamSubmission.objects.filter(student=student).order_by('-submitted_at').values('pk'),
+         ExamSubmission._meta.db_table, 'submission_student_time_idx'),
+        ('student star rank',
+         User.objects.filter(role='student', star_points__gt=student.star_points).values('pk'),
+         User._meta.db_table, 'user_role_stars_idx'),
+        ('class roster',
+         User.objects.filter(role='student', student_class=student.student_class).values('pk'),
+         User._meta.db_table, 'user_role_class_idx'),
+    ]
+
+
+def _full_scan(plan, table):
+    if connection.vendor == 'postgresql':
+        return f'Seq Scan on {table}' in plan
+    if connection.vendor == 'sqlite':
+        return re.search(rf'\bSCAN {re.escape(table)}\b(?! USING)', plan) is not None
+    return False
+
+
+def _uses_index(plan, table):
+    if connection.vendor == 'postgresql':
+        pattern = rf'(Index (Only )?Scan using \S+ on|Bitmap Heap Scan on) {re.escape(table)}\b'
+        return re.search(pattern, plan) is not None
+    if connection.vendor == 'sqlite':
+        return re.search(rf'\b(SEARCH|SCAN) {re.escape(table)} USING (COVERING )?INDEX', plan) is not None
+    return True
+
+
+def run_plan_checks(checks):
+    """EXPLAIN each query; 'ok' means it uses the expected index and never scans the table"""
+    results = {}
+    for name, queryset, table, expected_index in checks:
+        plan = queryset.explain()
+        full_scan = _full_scan(plan, table)
+        if expected_index:
+            uses_index = expected_index in plan
+        else:
+            uses_index = _uses_index(plan, table)
+        results[name] = {
+            'index': expected_index or 'any',
+            'status': 'ok' if uses_index and not full_scan else 'seq scan' if full_scan else 'other index',
+            'plan': plan,
+        }
+    return results
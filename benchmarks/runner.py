@@ -0,0 +1,112 @@
+"""
+Time the hot views with the Django test client and record query counts.
+"""
+import json
+import platform
+import statistics
+import time
+
+import django
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+
+
+def build_scenarios(school):
+    """
+    Scenario list: (name, user, method, url, json_body).
+    URLs are reversed under the 'en' prefix the i18n patterns expect.
+    """
+    teacher = school['teacher']
+    student = school['student']
+    lessons = school['lessons']
+    # Quiz/coding lesson the student has unlocked, so the views take the full path
+    lesson = next((l for l in lessons if l.coding), lessons[0])
+    problem = lesson.coding[0] if lesson.coding else {'question_id': 1}
+    quiz_answers = {str(q['question_id']): str(q['answer']) for q in lesson.quiz}
+
+    with translation.override('en'):
+        return [
+            ('student_dashboard[teacher]', teacher, 'get', reverse('dashboard'), None),
+            ('student_dashboard[student]', student, 'get', reverse('dashboard'), None),
+            ('curriculum_view', student, 'get', reverse('curriculum'), None),
+            ('class_detail[all]', teacher, 'get', reverse('class_detail', args=['all']), None),
+            ('student_progress_view', student, 'get', reverse('progress'), None),
+            ('submit_quiz', student, 'post', reverse('submit_quiz', args=[lesson.id]), {'answers': quiz_answers}),
+            ('run_code', student, 'post', reverse('run_code', args=[lesson.id]), {
+                'problem_id': problem['question_id'],
+                'code': f"n = int(input())\nprint(n * {problem['question_id'] + 1})\n",
+            }),
+        ]
+
+
+def run_scenarios(scenarios, repeat=10, warmup=1, only=None):
+    """Run each scenario `warmup + repeat` times and summarize the timed runs"""
+    results = {}
+    for name, user, method, url, body in scenarios:
+        if only and name.split('[')[0] not in only and name not in only:
+            continue
+        client = Client()
+        client.force_login(user)
+
+        def request():
+            if method == 'post':
+                return client.post(url, data=json.dumps(body), content_type='application/json')
+            return client.get(url)
+
+        for _ in range(warmup):
+            request()
+
+        timings = []
+        query_counts = []
+        status = None
+        size = 0
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries.captured_queries))
+            status = response.status_code
+            size = len(response.content)
+
+        timings.sort()
+        results[name] = {
+            'url': url,
+            'status': status,
+            'runs': repeat,
+            'min_ms': round(timings[0], 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))], 2),
+            'queries': max(query_counts),
+            'response_bytes': size,
+        }
+    return results
+
+
+def environment_info(scale):
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'database_version': '.'.join(str(v) for v in getattr(connection, 'sqlite_version_info', ())) or
+                            str(getattr(connection, 'pg_version', '')),
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'scale': scale,
+    }
+
+
+def compare(before, after):
+    """Rows of (scenario, median before, median after, change %, queries before, queries after)"""
+    rows = []
+    for name, current in after['results'].items():
+        previous = before.get('results', {}).get(name)
+        if not previous:
+            continue
+        change = ((current['median_ms'] - previous['median_ms']) / previous['median_ms'] * 100
+                  if previous['median_ms'] else 0.0)
+        rows.append((name, previous['median_ms'], current['median_ms'], change,
+                     previous['queries'], current['queries']))
+    return rows
@@ -0,0 +1,217 @@
+"""
+Seed a synthetic school shaped like production data: students spread over the
+real CLASS_CHOICES, lessons with quiz/coding JSON in the same format as the
+curriculum loaders, and exams with submissions.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from curriculum.models import Chapter, Lesson, Progress
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from users.models import User
+
+
+BENCHMARK_PASSWORD = 'benchmark-pass-123'
+
+DEFAULT_SCALE = {
+    'classes': 30,
+    'students_per_class': 50,
+    'lessons': 20,
+    'exams': 200,
+    'submissions': 10000,
+}
+
+
+def _lesson_quiz(order, count=10):
+    """Quiz questions in the Lesson.quiz format (option1..option4, 1-based answer)"""
+    return [
+        {
+            'question_id': i,
+            'question': f'Bài {order} - Câu hỏi {i}: kết quả của biểu thức là gì?',
+            'option1': 'Đáp án A',
+            'option2': 'Đáp án B',
+            'option3': 'Đáp án C',
+            'option4': 'Đáp án D',
+            'answer': (i % 4) + 1,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _lesson_coding(order, count=2):
+    """Coding problems in the Lesson.coding format (stdin input, expected_output)"""
+    return [
+        {
+            'question_id': i,
+            'question': f'Bài {order} - Bài tập {i}: đọc một số nguyên và in ra số đó nhân {i + 1}.',
+            'test_cases': [
+                {'input': str(n), 'expected_output': str(n * (i + 1))}
+                for n in (1, 7, 42)
+            ],
+            'starter_code': '# Viết code của bạn ở đây\nn = int(input())\n\n',
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _exam_questions(exam_type, count):
+    """Questions in the ActiveExam.questions format for either exam type"""
+    if exam_type == 'multi_choice':
+        return [
+            {
+                'id': i,
+                'question': f'Question {i}',
+                'options': ['Option A', 'Option B', 'Option C', 'Option D'],
+                'correct_answer': i % 4,
+            }
+            for i in range(1, count + 1)
+        ]
+    return [
+        {
+            'id': i,
+            'title': f'Problem {i}',
+            'description': 'Read an integer and print its square.',
+            'starter_code': 'n = int(input())\n',
+            'test_cases': [{'input': '3', 'expected': '9'}, {'input': '5', 'expected': '25'}],
+            'examples': [{'input': '2', 'output': '4'}],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def seed_school(classes=30, students_per_class=50, lessons=20, exams=200, submissions=10000, seed=42, stdout=None):
+    """
+    Populate the current database with a synthetic school.
+    Returns a dict with the objects the benchmark scenarios need.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCHMARK_PASSWORD)
+    class_names = [code for code, _ in User.CLASS_CHOICES][:classes]
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    # Teachers (one per grade) and students
+    teachers = User.objects.bulk_create([
+        User(username=f'bench_teacher_{grade}', email=f'bench_teacher_{grade}@example.com',
+             first_name='Teacher', last_name=str(grade), role='teacher', password=password)
+        for grade in (10, 11, 12)
+    ])
+    User.objects.bulk_create([
+        User(
+            username=f'bench_{class_name}_{i}'.lower(),
+            email=f'bench_{class_name}_{i}@example.com'.lower(),
+            first_name=f'Student{i}',
+            last_name=class_name,
+            role='student',
+            student_class=class_name,
+            star_points=rng.randint(0, 500),
+            gender=rng.choice(['male', 'female']),
+            password=password,
+        )
+        for class_name in class_names
+        for i in range(students_per_class)
+    ], batch_size=1000)
+    students = list(User.objects.filter(role='student', username__startswith='bench_').order_by('id'))
+    log(f'  {len(teachers)} teachers, {len(students)} students in {len(class_names)} classes')
+
+    # Chapters and lessons
+    chapters = Chapter.objects.bulk_create([
+        Chapter(title=f'Chương {i}', order=i) for i in range(1, 5)
+    ])
+    Lesson.objects.bulk_create([
+        Lesson(
+            chapter=chapters[(order - 1) * len(chapters) // lessons],
+            title=f'Bài {order}',
+            order=order,
+            video='dQw4w9WgXcQ',
+            quiz=_lesson_quiz(order),
+            coding=_lesson_coding(order) if order % 2 == 0 else [],
+            game='Game1.html' if order % 5 == 0 else '',
+        )
+        for order in range(1, lessons + 1)
+    ])
+    lesson_list = list(Lesson.objects.order_by('order'))
+    log(f'  {len(lesson_list)} lessons')
+
+    # Progress: each student has worked through a random prefix of the curriculum
+    progress_rows = []
+    for student in students:
+        completed = rng.randint(0, len(lesson_list))
+        for lesson in lesson_list[:completed + 1]:
+            done = lesson.order <= completed
+            progress_rows.append(Progress(
+                student=student,
+                lesson=lesson,
+                is_unlocked=True,
+                is_completed=done,
+                quiz_passed=done,
+                quiz_score=len(lesson.quiz) if done else 0,
+                code_test_passed=done and bool(lesson.coding),
+                quiz_passed_at=now - timedelta(days=rng.randint(1, 60)) if done else None,
+                completed_at=now - timedelta(days=rng.randint(1, 60)) if done else None,
+            ))
+        student.progress_percent = int(completed / len(lesson_list) * 100) if lesson_list else 0
+    Progress.objects.bulk_create(progress_rows, batch_size=2000)
+    User.objects.bulk_update(students, ['progress_percent'], batch_size=1000)
+    log(f'  {len(progress_rows)} progress rows')
+
+    # Exams: a mix of past, running and upcoming, restricted to a few classes each
+    exam_objects = []
+    for i in range(exams):
+        exam_type = 'multi_choice' if i % 4 else 'coding'
+        start = now + timedelta(days=rng.randint(-60, 5))
+        exam_objects.append(ActiveExam(
+            title=f'Benchmark exam {i + 1}',
+            teacher=teachers[i % len(teachers)],
+            exam_type=exam_type,
+            questions=_exam_questions(exam_type, 20 if exam_type == 'multi_choice' else 3),
+            start_time=start,
+            end_time=start + timedelta(days=rng.randint(1, 30)),
+            duration_minutes=45,
+            points_value=50,
+            allowed_classes=rng.sample(class_names, min(3, len(class_names))),
+        ))
+    ActiveExam.objects.bulk_create(exam_objects, batch_size=500)
+    exam_list = list(ActiveExam.objects.filter(title__startswith='Benchmark exam').order_by('id'))
+    log(f'  {len(exam_list)} exams')
+
+    # Submissions: unique (exam, student) pairs
+    pairs = set()
+    target = min(submissions, len(exam_list) * len(students))
+    while len(pairs) < target:
+        pairs.add((rng.randrange(len(exam_list)), rng.randrange(len(students))))
+    submission_rows = []
+    for exam_index, student_index in pairs:
+        exam = exam_list[exam_index]
+        total = len(exam.questions)
+        score = rng.randint(0, total)
+        entered = now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 600))
+        submission_rows.append(ExamSubmission(
+            exam=exam,
+            student=students[student_index],
+            answers={str(q['id']): rng.randint(0, 3) for q in exam.questions} if exam.exam_type == 'multi_choice' else {},
+            score=score,
+            total_questions=total,
+            stars_earned=int(score / total * exam.points_value) if total else 0,
+            entered_at=entered,
+            time_spent_seconds=rng.randint(60, 2700),
+            abandoned=rng.random() < 0.05,
+        ))
+    ExamSubmission.objects.bulk_create(submission_rows, batch_size=2000)
+    # bulk_create bypasses the per-submission stats updates
+    ExamStats.rebuild()
+    log(f'  {len(submission_rows)} exam submissions')
+
+    return {
+        'teacher': teachers[0],
+        # A student with partial progress exercises both locked and unlocked lessons
+        'student': max(students, key=lambda s: (s.progress_percent < 100, s.progress_percent)),
+        'lessons': lesson_list,
+        'exams': exam_list,
+    }
@@ -0,0 +1,32 @@
+"""
+Versioning for cached lesson markup. Template fragments that depend only on
+lesson content are cached with {% cache %} keyed on the lesson id, this
+version and the language; saving any lesson bumps the version, which
+orphans every old fragment at once.
+"""
+import time
+
+from django.core.cache import cache
+
+
+LESSON_CONTENT_VERSION_KEY = 'curriculum:lesson_content_version'
+
+# Lifetime of cached lesson fragments (they are invalidated on save anyway)
+FRAGMENT_CACHE_SECONDS = 60 * 60 * 24
+
+
+def get_lesson_content_version():
+    version = cache.get(LESSON_CONTENT_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a cache restart never reuses an older version number
+        cache.add(LESSON_CONTENT_VERSION_KEY, int(time.time()), None)
+        version = cache.get(LESSON_CONTENT_VERSION_KEY, int(time.time()))
+    return version
+
+
+def bump_lesson_content_version():
+    try:
+        cache.incr(LESSON_CONTENT_VERSION_KEY)
+    except ValueError:
+        # Key missing (evicted or never read yet)
+        cache.set(LESSON_CONTENT_VERSION_KEY, int(time.time()), None)
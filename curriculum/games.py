@@ -0,0 +1,61 @@
+"""
+Game serving helpers. Game shells in static/games/ are plain static files
+(fingerprinted and served by WhiteNoise); per-lesson data comes from the
+game_data endpoint, resolved through a cached lesson <-> game lookup built
+from Lesson.game.
+"""
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.templatetags.static import static
+from django.urls import reverse
+
+
+ALLOWED_GAMES = ['Game1.html', 'Game2.html', 'Game3.html']
+GAME_LESSONS_CACHE_KEY = 'curriculum:game_lessons'
+
+
+def get_game_lessons():
+    """
+    Lessons that have a game, as plain dicts:
+    {'by_id': {lesson_id: lesson}, 'by_game': {game_name: [lessons ordered by order]}}
+    """
+    lookup = cache.get(GAME_LESSONS_CACHE_KEY)
+    if lookup is None:
+        from .models import Lesson
+
+        lookup = {'by_id': {}, 'by_game': {}}
+        rows = Lesson.objects.exclude(game='').order_by('order').values('id', 'order', 'title', 'game')
+        for row in rows:
+            lookup['by_id'][row['id']] = row
+            lookup['by_game'].setdefault(row['game'], []).append(row)
+        cache.set(GAME_LESSONS_CACHE_KEY, lookup, None)
+    return lookup
+
+
+def invalidate_game_lessons():
+    cache.delete(GAME_LESSONS_CACHE_KEY)
+
+
+def find_game_lesson(game_name, lesson_id=None):
+    """
+    The lesson a game is being played for: the requested lesson if it uses
+    this game, otherwise the first lesson (by order) the game is assigned to.
+    """
+    lookup = get_game_lessons()
+    try:
+        lesson = lookup['by_id'].get(int(lesson_id)) if lesson_id else None
+    except (TypeError, ValueError):
+        lesson = None
+    if lesson is not None and lesson['game'] == game_name:
+        return lesson
+    lessons = lookup['by_game'].get(game_name)
+    return lessons[0] if lessons else None
+
+
+def game_shell_url(game_name, lesson_id=None):
+    """Fingerprinted static URL of a game shell, pointing it at its lesson data"""
+    url = static(f'games/{game_name}')
+    if lesson_id is not None:
+        url += '?' + urlencode({'data': reverse('game_data', args=[lesson_id])})
+    return url
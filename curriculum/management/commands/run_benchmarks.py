@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from benchmarks.plans import build_plan_checks, run_plan_checks
+from benchmarks.runner import build_scenarios, compare, environment_info, run_scenarios
+from benchmarks.seed import DEFAULT_SCALE, seed_school
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic school in a throwaway test database and time the hot views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--classes', type=int, default=DEFAULT_SCALE['classes'])
+        parser.add_argument('--students-per-class', type=int, default=DEFAULT_SCALE['students_per_class'])
+        parser.add_argument('--lessons', type=int, default=DEFAULT_SCALE['lessons'])
+        parser.add_argument('--exams', type=int, default=DEFAULT_SCALE['exams'])
+        parser.add_argument('--submissions', type=int, default=DEFAULT_SCALE['submissions'])
+        parser.add_argument('--repeat', type=int, default=10, help='Timed runs per scenario')
+        parser.add_argument('--only', nargs='*', help='Scenario names to run (default: all)')
+        parser.add_argument('--output', help='Write results as JSON to this file')
+        parser.add_argument('--compare', help='Earlier JSON results to compare against')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Keep the benchmark database afterwards (it is reseeded on every run)')
+
+    def handle(self, *args, **options):
+        scale = {key: options[key] for key in DEFAULT_SCALE}
+
+        # Never seed the real database: use Django's test database for the configured backend
+        old_name = connection.settings_dict['NAME']
+        self.stdout.write(f'Creating benchmark database ({connection.vendor})...')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        # A private cache too, so entries for the real (or a previous benchmark) database never leak in
+        cache_override = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmarks'},
+        })
+        cache_override.enable()
+        try:
+            if options['keepdb']:
+                from django.core.management import call_command
+                call_command('flush', interactive=False, verbosity=0)
+
+            self.stdout.write('Seeding synthetic school...')
+            school = seed_school(stdout=self.stdout, **scale)
+
+            # Plain static storage so templates render without a collectstatic manifest
+            with override_settings(
+                ALLOWED_HOSTS=['testserver'],
+                STORAGES={
+                    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+                    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+                },
+            ):
+                results = run_scenarios(build_scenarios(school), repeat=options['repeat'], only=options['only'])
+            plans = run_plan_checks(build_plan_checks(school))
+            report = {'environment': environment_info(scale), 'results': results, 'plans': plans}
+        finally:
+            cache_override.disable()
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        self.stdout.write('')
+        self.stdout.write(f'{"Scenario":<30} {"median ms":>10} {"p95 ms":>10} {"queries":>8} {"status":>7}')
+        self.stdout.write('-' * 69)
+        for name, row in report['results'].items():
+            self.stdout.write(
+                f'{name:<30} {row["median_ms"]:>10.1f} {row["p95_ms"]:>10.1f} {row["queries"]:>8} {row["status"]:>7}'
+            )
+
+        self.stdout.write('')
+        self.stdout.write(f'{"Query plan":<32} {"index":<30} {"status":>11}')
+        self.stdout.write('-' * 75)
+        for name, row in report['plans'].items():
+            status = row['status']
+            styled = self.style.SUCCESS(status) if status == 'ok' else self.style.WARNING(status)
+            self.stdout.write(f'{name:<32} {row["index"]:<30} {" " * (11 - len(status))}{styled}')
+        if options['verbosity'] > 1:
+            for name, row in report['plans'].items():
+                self.stdout.write(f'\n{name}:\n{row["plan"]}')
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as f:
+                before = json.load(f)
+            self.stdout.write('')
+            self.stdout.write(f'{"Scenario":<30} {"before":>10} {"after":>10} {"change":>8} {"queries":>12}')
+            self.stdout.write('-' * 74)
+            for name, old_ms, new_ms, change, old_q, new_q in compare(before, report):
+                self.stdout.write(
+                    f'{name:<30} {old_ms:>10.1f} {new_ms:>10.1f} {change:>+7.1f}% {f"{old_q} -> {new_q}":>12}'
+                )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n✓ Results written to {options["output"]}'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0011_progress_code_test_passed_at_progress_completed_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='progress',
+            index=models.Index(fields=['student', 'is_completed'], name='progress_student_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='progress',
+            index=models.Index(fields=['lesson', 'is_completed'], name='progress_lesson_done_idx'),
+        ),
+    ]
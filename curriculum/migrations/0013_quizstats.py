@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curriculum', '0012_progress_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('lesson', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quiz_stats', serialize=False, to='curriculum.lesson')),
+                ('attempt_count', models.IntegerField(default=0, help_text='Quiz submissions, including retakes')),
+                ('pass_count', models.IntegerField(default=0, help_text='Submissions with every answer correct')),
+                ('item_stats', models.JSONField(default=dict, help_text='Per-question attempts, correct count and answer distribution')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Quiz stats',
+            },
+        ),
+    ]
@@ -60,4 +60,45 @@ class Progress(models.Model):
 
     class Meta:
         verbose_name_plural = "Progress"
-        unique_together = ('student', 'lesson')
\ No newline at end of file
+        # (student, lesson) lookups are served by the unique constraint's index
+        unique_together = ('student', 'lesson')
+        indexes = [
+            models.Index(fields=['student', 'is_completed'], name='progress_student_done_idx'),
+            models.Index(fields=['lesson', 'is_completed'], name='progress_lesson_done_idx'),
+        ]
+
+class QuizStats(models.Model):
+    """Per-lesson quiz analytics, updated on every quiz submission by QuizStats.record()"""
+    lesson = models.OneToOneField(Lesson, on_delete=models.CASCADE, primary_key=True, related_name='quiz_stats')
+    attempt_count = models.IntegerField(default=0, help_text="Quiz submissions, including retakes")
+    pass_count = models.IntegerField(default=0, help_text="Submissions with every answer correct")
+    item_stats = models.JSONField(default=dict, help_text="Per-question attempts, correct count and answer distribution")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Quiz stats"
+
+    def __str__(self):
+        return f"Quiz stats for {self.lesson_id}: {self.attempt_count} attempts"
+
+    @classmethod
+    def for_lesson(cls, lesson):
+        """Stats row for reading (all zeros if nobody has taken the quiz yet)"""
+        return cls.objects.filter(lesson=lesson).first() or cls(lesson=lesson)
+
+    @classmethod
+    def record(cls, lesson, answers, passed):
+        """Add one graded submission; call inside the transaction that saves the progress"""
+        from exams.analytics import apply_item_results, grade_quiz_items
+
+        stats, _ = cls.objects.select_for_update().get_or_create(lesson=lesson)
+        stats.attempt_count += 1
+        stats.pass_count += int(passed)
+        apply_item_results(stats.item_stats, grade_quiz_items(lesson.quiz, answers))
+        stats.save()
+        return stats
+
+    def item_analysis(self):
+        """Per-question rows, most-missed first"""
+        from exams.analytics import quiz_item_analysis
+        return quiz_item_analysis(self.lesson.quiz, self.item_stats)
@@ -0,0 +1,59 @@
+"""
+Per-student progress snapshot: the Progress flags for every lesson a student
+has a row for, cached as a single entry so the dashboard, curriculum, lesson
+and progress pages share one query. The signal handlers drop the snapshot
+whenever a row is saved or deleted, again once the transaction commits, and
+snapshots read inside a transaction are never cached, so a rolled-back write
+can't leave a snapshot the database doesn't have.
+"""
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from .models import Progress
+
+
+PROGRESS_SNAPSHOT_KEY = 'curriculum:progress:{student_id}'
+
+# Safety net only; writes drop the snapshot
+PROGRESS_SNAPSHOT_SECONDS = 60 * 60 * 24
+
+SNAPSHOT_FIELDS = (
+    'id', 'lesson_id', 'is_unlocked', 'is_completed', 'quiz_passed', 'quiz_score',
+    'code_test_passed', 'quiz_passed_at', 'code_test_passed_at', 'completed_at',
+)
+
+
+def _snapshot_key(student_id):
+    return PROGRESS_SNAPSHOT_KEY.format(student_id=student_id)
+
+
+def _progress_from_row(student_id, row):
+    progress = Progress(student_id=student_id, **row)
+    progress._state.adding = False
+    return progress
+
+
+def get_progress_snapshot(student):
+    """{lesson_id: Progress} for the student, read from the cache when possible"""
+    key = _snapshot_key(student.pk)
+    rows = cache.get(key)
+    if rows is None:
+        rows = {
+            row['lesson_id']: row
+            for row in Progress.objects.filter(student_id=student.pk).values(*SNAPSHOT_FIELDS)
+        }
+        # Rows read inside a transaction may still be rolled back
+        if not connection.in_atomic_block:
+            cache.set(key, rows, PROGRESS_SNAPSHOT_SECONDS)
+    return {lesson_id: _progress_from_row(student.pk, row) for lesson_id, row in rows.items()}
+
+
+def invalidate_progress_snapshot(student_id):
+    """
+    Drop the student's snapshot; inside a transaction it is dropped again on
+    commit, in case another request cached the pre-commit rows meanwhile
+    """
+    key = _snapshot_key(student_id)
+    cache.delete(key)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete(key))
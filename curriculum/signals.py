@@ -0,0 +1,25 @@
+"""
+Signal handlers that keep lesson-derived caches in sync with the database
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .content_cache import bump_lesson_content_version
+from .games import invalidate_game_lessons
+from .models import Lesson, Progress
+from .progress_cache import invalidate_progress_snapshot
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    """Drop cached data built from lessons when any lesson changes"""
+    invalidate_game_lessons()
+    bump_lesson_content_version()
+
+
+@receiver(post_save, sender=Progress)
+@receiver(post_delete, sender=Progress)
+def progress_changed(sender, instance, **kwargs):
+    """Drop the student's progress snapshot; the next read rebuilds it"""
+    invalidate_progress_snapshot(instance.student_id)
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from curriculum.games import game_shell_url
+from curriculum.models import Lesson
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=TEST_STORAGES)
+class GameDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate('en')
+        self.addCleanup(translation.deactivate)
+        self.lesson = Lesson.objects.create(title='Functions', order=6, game='Game1.html')
+        self.user = User.objects.create_user('player', password='x')
+        self.client.force_login(self.user)
+        self.url = reverse('game_data', args=[self.lesson.id])
+
+    def test_payload_and_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(response.json()['player_name'], 'player')
+        self.assertEqual(response.json()['lesson']['order'], 6)
+
+    def test_matching_etag_is_not_modified_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+
+        # Only the session and user lookups remain
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_with_the_lesson_and_the_player(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.lesson.order = 13
+        self.lesson.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['lesson']['order'], 13)
+        etag = response['ETag']
+
+        self.client.force_login(User.objects.create_user('other', password='x'))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_lesson_without_game_is_not_found(self):
+        lesson = Lesson.objects.create(title='Intro', order=1)
+
+        self.assertEqual(self.client.get(reverse('game_data', args=[lesson.id])).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=TEST_STORAGES)
+class LessonGameEmbedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate('en')
+        self.addCleanup(translation.deactivate)
+        self.client.force_login(User.objects.create_user('teacher', password='x', role='teacher'))
+
+    def get_game_page(self, lesson):
+        return self.client.get(reverse('lesson_detail_category', args=[lesson.order, 'game']))
+
+    def test_known_game_embeds_the_shell_url(self):
+        lesson = Lesson.objects.create(title='Functions', order=6, game='Game1.html')
+
+        response = self.get_game_page(lesson)
+
+        self.assertEqual(response.context['game_url'], game_shell_url('Game1.html', lesson.id))
+        self.assertContains(response, '<iframe')
+
+    def test_unknown_game_is_not_embedded(self):
+        lesson = Lesson.objects.create(title='Functions', order=6, game='../settings.py')
+
+        response = self.get_game_page(lesson)
+
+        self.assertIsNone(response.context['game_url'])
+        self.assertNotContains(response, '<iframe')
+        self.assertContains(response, 'Game not available')
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from curriculum.models import Lesson, Progress
+from curriculum.progress_cache import SNAPSHOT_FIELDS, _snapshot_key, get_progress_snapshot
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+# Transactions have to really commit or roll back, so TestCase's wrapping atomic block won't do
+@override_settings(CACHES=LOCMEM_CACHE)
+class ProgressSnapshotTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('student', password='x')
+        self.lesson = Lesson.objects.create(title='Variables', order=1)
+        self.progress = Progress.objects.create(student=self.student, lesson=self.lesson, is_unlocked=True)
+
+    def cached(self):
+        return cache.get(_snapshot_key(self.student.pk))
+
+    def test_snapshot_is_cached_and_dropped_on_save(self):
+        self.assertFalse(get_progress_snapshot(self.student)[self.lesson.id].is_completed)
+        self.assertIsNotNone(self.cached())
+
+        with self.assertNumQueries(0):
+            get_progress_snapshot(self.student)
+
+        self.progress.is_completed = True
+        self.progress.save()
+        self.assertIsNone(self.cached())
+        self.assertTrue(get_progress_snapshot(self.student)[self.lesson.id].is_completed)
+
+    def test_snapshot_cached_before_commit_is_dropped_on_commit(self):
+        with transaction.atomic():
+            self.progress.is_completed = True
+            self.progress.save()
+            # Another request caches the rows it still sees, before this one commits
+            stale = Progress.objects.filter(pk=self.progress.pk).values(*SNAPSHOT_FIELDS).get()
+            cache.set(_snapshot_key(self.student.pk), {self.lesson.id: dict(stale, is_completed=False)})
+
+        self.assertIsNone(self.cached())
+        self.assertTrue(get_progress_snapshot(self.student)[self.lesson.id].is_completed)
+
+    def test_snapshot_read_in_a_rolled_back_transaction_is_not_cached(self):
+        get_progress_snapshot(self.student)
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.progress.is_completed = True
+                self.progress.save()
+                self.assertTrue(get_progress_snapshot(self.student)[self.lesson.id].is_completed)
+                raise RuntimeError('rolled back')
+
+        self.assertIsNone(self.cached())
+        self.assertFalse(get_progress_snapshot(self.student)[self.lesson.id].is_completed)
@@ -4,13 +4,44 @@ from django.utils.translation import activate
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.views.decorators.clickjacking import xframe_options_sameorigin
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_GET
 from datetime import datetime, timedelta
 import fitz  # PyMuPDF
 import os
 from io import BytesIO
 import base64
 
+from pyez_learning.caching import single_flight
+
+from .content_cache import FRAGMENT_CACHE_SECONDS, get_lesson_content_version
+from .progress_cache import get_progress_snapshot, invalidate_progress_snapshot
+
+LEADERBOARD_CACHE_KEY = 'curriculum:leaderboard_rows'
+LEADERBOARD_CACHE_SECONDS = 60
+# Only what the leaderboard and its profile popup render; never whole User rows
+LEADERBOARD_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email', 'gender', 'role', 'student_class',
+    'bio', 'created_at', 'star_points', 'progress_percent', 'profile_picture', 'profile_thumbnail',
+)
+PDF_PAGES_CACHE_SECONDS = 60 * 60 * 24
+
+def _leaderboard_rows():
+    """Top 5 students as plain dicts, safe to keep in the shared cache"""
+    from users.models import User
+    
+    picture_storage = User._meta.get_field('profile_picture').storage
+    thumbnail_storage = User._meta.get_field('profile_thumbnail').storage
+    roles = dict(User.ROLE_CHOICES)
+    rows = list(User.objects.filter(role='student').order_by('-star_points', 'first_name').values(*LEADERBOARD_FIELDS)[:5])
+    for row in rows:
+        picture, thumbnail = row.pop('profile_picture'), row.pop('profile_thumbnail')
+        row['role_display'] = roles.get(row['role'], row['role'])
+        row['profile_picture_url'] = picture_storage.url(picture) if picture else ''
+        row['avatar_thumbnail_url'] = thumbnail_storage.url(thumbnail) if thumbnail else row['profile_picture_url']
+    return rows
+
+
 # LANGUAGE SWITCHER VIEW
 def set_language_view(request, language):
     """
@@ -28,7 +59,8 @@ def set_language_view(request, language):
 # 1. THE DASHBOARD VIEW (With Real Data from Database)
 @login_required(login_url='signin')
 def student_dashboard(request):
-    from django.db.models import Count, Avg, Q
+    from django.db.models import Count, Avg, Q, Value
+    from django.db.models.functions import Coalesce
     from django.utils import timezone
     from datetime import timedelta
     from exams.models import ActiveExam, ExamSubmission
@@ -41,27 +73,19 @@ def student_dashboard(request):
         
         # Get real active exams based on user role
         if user.is_teacher:
-            # For teachers/admins: show all exams that are not manually ended AND within schedule
-            all_not_ended = ActiveExam.objects.filter(is_ended=False).order_by('-created_at')
-            
-            # Filter by schedule (teachers must follow schedule)
-            accessible_exams = []
-            for exam in all_not_ended:
-                if exam.is_active():  # This checks both schedule and is_ended
-                    accessible_exams.append(exam)
-            
-            active_exams = accessible_exams
+            # For teachers/admins: show all exams that are not ended AND within schedule
+            active_exams = list(ActiveExam.objects.open().order_by('-created_at'))
         else:
             # For students: filter by class and time, exclude already submitted
             submitted_exam_ids = ExamSubmission.objects.filter(student=user).values_list('exam_id', flat=True)
             
-            # Get all active exams (not manually ended)
-            all_active = ActiveExam.objects.filter(is_ended=False).exclude(id__in=submitted_exam_ids)
+            # Get all running exams (not ended, within schedule)
+            all_active = ActiveExam.objects.open().exclude(id__in=submitted_exam_ids)
             
-            # Filter by time and access
+            # Filter by class access
             accessible_exams = []
             for exam in all_active:
-                if exam.is_active() and exam.can_student_access(user):
+                if exam.can_student_access(user):
                     accessible_exams.append(exam)
             
             active_exams = accessible_exams
@@ -69,9 +93,12 @@ def student_dashboard(request):
         from .models import Lesson, Progress
         from users.models import User
         
-        # Get real leaderboard from database
-        leaderboard_students = User.objects.filter(role='student').order_by('-star_points', 'first_name')[:5]
-        leaderboard = list(leaderboard_students) if leaderboard_students.exists() else []
+        # Get real leaderboard from database (shared by every dashboard for a minute)
+        leaderboard = single_flight(
+            LEADERBOARD_CACHE_KEY,
+            _leaderboard_rows,
+            LEADERBOARD_CACHE_SECONDS,
+        )
         
         # For Teachers: Different data
         if user.is_teacher:
@@ -97,7 +124,7 @@ def student_dashboard(request):
             
             # Get teacher's exams with submission counts
             my_exams = ActiveExam.objects.filter(teacher=user).annotate(
-                submission_count=Count('submissions')
+                submission_count=Coalesce('stats__submission_count', Value(0))
             ).order_by('-created_at')[:3]
             
             # Format for template
@@ -122,7 +149,7 @@ def student_dashboard(request):
             # For Students: Original data
             user_stars = user.star_points or 0
             total_lessons = Lesson.objects.count()
-            completed_lessons = Progress.objects.filter(student=user, is_completed=True).count()
+            completed_lessons = sum(1 for p in get_progress_snapshot(user).values() if p.is_completed)
             
             # Use progress from model (handle None)
             progress_percent = user.progress_percent if user.progress_percent is not None else 0
@@ -186,12 +213,23 @@ def curriculum_view(request):
     
     # For students, add lock/unlock status
     if request.user.role == 'student':
+        lessons = list(lessons)
+        snapshot = get_progress_snapshot(request.user)
+        
+        # Create the missing progress rows in one query instead of one get_or_create per lesson
+        missing = [lesson for lesson in lessons if lesson.id not in snapshot]
+        if missing:
+            Progress.objects.bulk_create(
+                [Progress(student=request.user, lesson=lesson) for lesson in missing],
+                ignore_conflicts=True,
+            )
+            # bulk_create skips the signals that keep the snapshot current
+            invalidate_progress_snapshot(request.user.pk)
+            snapshot = get_progress_snapshot(request.user)
+        
         lessons_data = []
         for lesson in lessons:
-            progress, created = Progress.objects.get_or_create(
-                student=request.user,
-                lesson=lesson
-            )
+            progress = snapshot[lesson.id]
             
             # Auto-unlock lesson 1
             if lesson.order == 1 and not progress.is_unlocked:
@@ -216,6 +254,10 @@ def curriculum_view(request):
             'is_student': False,
         }
     
+    # Lesson-only markup is fragment-cached per content version
+    context['content_version'] = get_lesson_content_version()
+    context['fragment_cache_seconds'] = FRAGMENT_CACHE_SECONDS
+    
     return render(request, 'classroom/curriculum.html', context)
 
 # 6. LESSON DETAIL VIEW (Display specific category of a lesson)
@@ -228,11 +270,14 @@ def lesson_detail_category(request, lesson_order, category):
     user = request.user
     
     # Check if lesson is unlocked for student
+    progress = None
     if user.role == 'student':
-        progress, created = Progress.objects.get_or_create(
-            student=user,
-            lesson=lesson
-        )
+        progress = get_progress_snapshot(user).get(lesson.id)
+        if progress is None:
+            progress, created = Progress.objects.get_or_create(
+                student=user,
+                lesson=lesson
+            )
         
         # Auto-unlock lesson 1 for all students
         if lesson.order == 1 and not progress.is_unlocked:
@@ -326,10 +371,18 @@ def lesson_detail_category(request, lesson_order, category):
     # Get category content
     category_content = getattr(lesson, category, None)
     
-    # Get progress data for students
-    progress_data = None
-    if user.role == 'student':
-        progress_data = Progress.objects.filter(student=user, lesson=lesson).first()
+    # Teachers see which quiz questions students miss most
+    quiz_stats = None
+    if category == 'quiz' and user.is_teacher:
+        from .models import QuizStats
+        quiz_stats = QuizStats.for_lesson(lesson)
+    
+    # Only known game shells are embedded; anything else shows "Game not available"
+    game_url = None
+    if category == 'game':
+        from .games import ALLOWED_GAMES, game_shell_url
+        if category_content in ALLOWED_GAMES:
+            game_url = game_shell_url(category_content, lesson.id)
     
     context = {
         'lesson': lesson,
@@ -340,7 +393,12 @@ def lesson_detail_category(request, lesson_order, category):
         'prev_category': prev_category,
         'next_lesson': next_lesson,
         'next_category': next_category,
-        'progress': progress_data,
+        'progress': progress,
+        'quiz_stats': quiz_stats,
+        'game_url': game_url,
+        # Lesson-only markup is fragment-cached per content version
+        'content_version': get_lesson_content_version(),
+        'fragment_cache_seconds': FRAGMENT_CACHE_SECONDS,
     }
     
     return render(request, 'classroom/lesson_detail.html', context)
@@ -395,6 +453,7 @@ def my_class(request):
             'star_points': classmate.star_points,
             'progress_percent': classmate.progress_percent,
             'profile_picture': classmate.profile_picture,
+            'avatar_thumbnail_url': classmate.avatar_thumbnail_url,
             'bio': classmate.bio,
             'created_at': classmate.created_at,
             'gender': classmate.gender,
@@ -464,23 +523,16 @@ def class_management(request):
     return render(request, 'classroom/student_management.html', context)
 
 
-# 9. CLASS DETAIL VIEW (For Teachers - see students in a specific class)
-@login_required(login_url='signin')
-def class_detail(request, class_name):
+def _filter_class_students(class_name, params):
+    """Students shown on a class page, with the page's GET filters applied in the database"""
     from django.db.models import Q
     from users.models import User
-    from .models import Lesson, Progress
-    
-    # Check if user is teacher
-    if not request.user.is_teacher:
-        return redirect('dashboard')
     
-    # Get filter parameters
-    name_filter = request.GET.get('name', '')
-    progress_filter = request.GET.get('progress', '')
-    stars_filter = request.GET.get('stars', '')
-    class_filter = request.GET.get('class', '')
-    status_filter = request.GET.get('status', '')
+    name_filter = params.get('name', '')
+    progress_filter = params.get('progress', '')
+    stars_filter = params.get('stars', '')
+    class_filter = params.get('class', '')
+    status_filter = params.get('status', '')
     
     # Get students in this class, unassigned, or all
     if class_name == 'unassigned':
@@ -505,6 +557,18 @@ def class_detail(request, class_name):
         else:
             students = students.filter(student_class=class_filter)
     
+    # Apply progress filter
+    if progress_filter == 'high':
+        students = students.filter(progress_percent__gte=60)
+    elif progress_filter == 'low':
+        students = students.filter(progress_percent__lt=60)
+    
+    # Apply stars filter
+    if stars_filter == 'high':
+        students = students.filter(star_points__gte=30)
+    elif stars_filter == 'low':
+        students = students.filter(star_points__lt=30)
+    
     # Apply status filter (only for 'all' view)
     if class_name == 'all' and status_filter:
         if status_filter == 'active':
@@ -512,6 +576,28 @@ def class_detail(request, class_name):
         elif status_filter == 'inactive':
             students = students.filter(is_active=False)
     
+    return students
+
+
+# 9. CLASS DETAIL VIEW (For Teachers - see students in a specific class)
+@login_required(login_url='signin')
+def class_detail(request, class_name):
+    from users.models import User
+    from .models import Lesson, Progress
+    
+    # Check if user is teacher
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    # Get filter parameters
+    name_filter = request.GET.get('name', '')
+    progress_filter = request.GET.get('progress', '')
+    stars_filter = request.GET.get('stars', '')
+    class_filter = request.GET.get('class', '')
+    status_filter = request.GET.get('status', '')
+    
+    students = _filter_class_students(class_name, request.GET)
+    
     # Get students data with progress from model
     students_data = []
     
@@ -526,6 +612,7 @@ def class_detail(request, class_name):
             'progress_percent': student.progress_percent,
             'is_active': student.is_active,
             'profile_picture': student.profile_picture,
+            'avatar_thumbnail_url': student.avatar_thumbnail_url,
             'student_class': student.student_class,
             'bio': student.bio,
             'created_at': student.created_at,
@@ -533,18 +620,6 @@ def class_detail(request, class_name):
             'get_gender_display': student.get_gender_display() if student.gender else '',
         })
     
-    # Apply progress filter
-    if progress_filter == 'high':
-        students_data = [s for s in students_data if s['progress_percent'] >= 60]
-    elif progress_filter == 'low':
-        students_data = [s for s in students_data if s['progress_percent'] < 60]
-    
-    # Apply stars filter
-    if stars_filter == 'high':
-        students_data = [s for s in students_data if s['star_points'] >= 30]
-    elif stars_filter == 'low':
-        students_data = [s for s in students_data if s['star_points'] < 30]
-    
     # Get all unique classes for filter dropdown (only for 'all' view)
     all_classes = []
     class_options = []
@@ -586,11 +661,35 @@ def class_detail(request, class_name):
     return render(request, 'classroom/class_detail.html', context)
 
 
+# CLASS PROGRESS EXPORT (CSV of the students on a class page, same filters)
+@login_required(login_url='signin')
+def export_class_progress(request, class_name):
+    from django.db.models import Count, Q
+    from pyez_learning.exports import EXPORT_CHUNK_SIZE, stream_csv
+    
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    students = _filter_class_students(class_name, request.GET).annotate(
+        completed_lessons=Count('progress', filter=Q(progress__is_completed=True))
+    ).order_by('student_class', 'last_name', 'first_name', 'id')
+    rows = students.values_list(
+        'username', 'first_name', 'last_name', 'email', 'student_class', 'gender',
+        'star_points', 'progress_percent', 'completed_lessons', 'is_active', 'created_at',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    
+    header = ['username', 'first_name', 'last_name', 'email', 'class', 'gender',
+              'star_points', 'progress_percent', 'completed_lessons', 'is_active', 'joined']
+    return stream_csv(f'class-{class_name}-progress.csv', header, rows, request=request)
+
+
 # 8. SUBMIT QUIZ VIEW (Handle quiz submission and unlock next lesson)
 @login_required(login_url='signin')
 def submit_quiz(request, lesson_id):
     from django.http import JsonResponse
-    from .models import Lesson, Progress
+    from .models import Lesson, Progress, QuizStats
+    from exams.grading import quiz_answer_key
+    from django.db import transaction
     from django.utils import timezone
     import json
     
@@ -610,26 +709,21 @@ def submit_quiz(request, lesson_id):
         if not quiz_data:
             return JsonResponse({'success': False, 'error': 'No quiz data found'}, status=404)
         
-        # Calculate score
-        correct_count = 0
-        total_questions = len(quiz_data)
-        results = []
-        
-        for question in quiz_data:
-            question_id = str(question['question_id'])
-            user_answer = answers.get(question_id)
-            correct_answer = question['answer']
-            
-            is_correct = str(user_answer) == str(correct_answer)
-            if is_correct:
-                correct_count += 1
-            
-            results.append({
+        # Calculate score against the quiz's compiled answer key
+        answer_key = quiz_answer_key(lesson)
+        marks = answer_key.marks(answers)
+        correct_count = sum(marks)
+        total_questions = answer_key.total
+        results = [
+            {
                 'question_id': question_id,
                 'correct': is_correct,
-                'user_answer': user_answer,
+                'user_answer': answers.get(question_id),
                 'correct_answer': correct_answer
-            })
+            }
+            for question_id, correct_answer, is_correct
+            in zip(answer_key.question_ids, answer_key.correct_answers, marks)
+        ]
         
         # Check if all answers are correct
         all_correct = correct_count == total_questions
@@ -684,7 +778,10 @@ def submit_quiz(request, lesson_id):
                     progress.completed_at = timezone.now()
                     lesson_completed_now = True
         
-        progress.save()
+        with transaction.atomic():
+            progress.save()
+            # Per-question analytics for teachers, committed together with the progress
+            QuizStats.record(lesson, answers, all_correct)
         
         # Unlock next lesson if current is completed
         if progress.is_completed:
@@ -725,77 +822,64 @@ def submit_quiz(request, lesson_id):
 
 # SERVE GAME VIEW
 @login_required(login_url='signin')
-@xframe_options_sameorigin
 def serve_game(request, game_name):
     """
-    Serve game HTML files with Django template rendering
-    Allow embedding in iframes from same origin
+    Redirect to the static, fingerprinted game shell for a lesson.
+    Kept so existing links keep working; pages embed game_shell_url directly.
     """
-    from django.template import Template, Context
-    from django.conf import settings
-    import os
+    from .games import ALLOWED_GAMES, find_game_lesson, game_shell_url
     
     # Security: Only allow specific game files
-    allowed_games = ['Game1.html', 'Game2.html', 'Game3.html']
-    if game_name not in allowed_games:
+    if game_name not in ALLOWED_GAMES:
         return HttpResponse("Game not found", status=404)
     
-        # Build path to game file in static folder
-    game_path = os.path.join(settings.BASE_DIR, 'static', 'games', game_name)
-    
-    # Check if file exists
-    if not os.path.exists(game_path):
-        return HttpResponse("Game file not found", status=404)
-    
-    # Read game file
-    with open(game_path, 'r', encoding='utf-8') as f:
-        game_content = f.read()
-    
-    # Get lesson context if available
-    lesson = None
-    lesson_id = request.GET.get('lesson_id')
-    if lesson_id:
-        try:
-            from .models import Lesson
-            lesson = Lesson.objects.get(id=lesson_id)
-        except:
-            pass
-    
-    # If no lesson found, try to find from referer or use default
-    if not lesson:
-        # For Game1 (lesson 6 or 13), Game2 (lesson 10), Game3 (lesson 17)
-        if game_name == 'Game1.html':
-            # Try to determine from referer or default to lesson 6
-            referer = request.META.get('HTTP_REFERER', '')
-            if 'lesson/13' in referer or 'lesson_id=13' in referer:
-                lesson_id = 13
-            else:
-                lesson_id = 6
-        elif game_name == 'Game2.html':
-            lesson_id = 10
-        elif game_name == 'Game3.html':
-            lesson_id = 17
-        
-        if lesson_id:
-            try:
-                from .models import Lesson
-                lesson = Lesson.objects.get(order=lesson_id)
-            except:
-                # Create a mock lesson object with order
-                class MockLesson:
-                    def __init__(self, order):
-                        self.order = order
-                lesson = MockLesson(lesson_id)
-    
-    # Render as Django template
-    template = Template(game_content)
-    context = Context({
-        'request': request,
-        'lesson': lesson,
+    lesson = find_game_lesson(game_name, request.GET.get('lesson_id'))
+    return redirect(game_shell_url(game_name, lesson['id'] if lesson else None))
+
+
+def _game_data_etag(request, lesson_id):
+    """ETag for game_data: changes when the lesson's game data or the player changes"""
+    import hashlib
+    from .games import get_game_lessons
+    
+    lesson = get_game_lessons()['by_id'].get(lesson_id)
+    if lesson is None:
+        return None
+    key = f"{lesson['id']}:{lesson['order']}:{lesson['title']}:{lesson['game']}:{request.user.username}"
+    return hashlib.md5(key.encode('utf-8')).hexdigest()
+
+
+# GAME DATA VIEW (per-lesson payload for the static game shells)
+@login_required(login_url='signin')
+@require_GET
+@cache_control(private=True, no_cache=True)
+@etag(_game_data_etag)
+def game_data(request, lesson_id):
+    """
+    Small JSON payload a game shell needs for one lesson. Revalidated with
+    ETag, so repeat plays cost a 304 and no database queries.
+    """
+    from django.urls import reverse
+    from .games import get_game_lessons
+    
+    lesson = get_game_lessons()['by_id'].get(lesson_id)
+    if lesson is None:
+        return JsonResponse({'success': False, 'error': 'Game not found for this lesson'}, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'player_name': request.user.username or 'guest',
+        'lesson': {
+            'id': lesson['id'],
+            'order': lesson['order'],
+            'title': lesson['title'],
+            'game': lesson['game'],
+        },
+        'urls': {
+            'lesson': reverse('lesson_detail_category', args=[lesson['order'], 'game']),
+            'curriculum': reverse('curriculum'),
+        },
     })
-    rendered_game = template.render(context)
-    
-    return HttpResponse(rendered_game, content_type='text/html')
 
 
 # 9. RUN CODE VIEW (Execute Python code and test against test cases)
@@ -1008,16 +1092,19 @@ def submit_coding(request, lesson_id):
 
 
 @login_required(login_url='signin')
-def render_pdf_pages(request, lesson_id):
+async def render_pdf_pages(request, lesson_id):
     """
-    Convert PDF pages to images and return as JSON with base64-encoded images
+    Convert PDF pages to images and return as JSON with base64-encoded images.
+    Async, so the worker keeps serving other requests while the PDF downloads.
     """
     try:
         from .models import Lesson
-        import requests
-        from io import BytesIO
+        import httpx
+        from asgiref.sync import sync_to_async
+        from pyez_learning.caching import async_single_flight
+        from pyez_learning.http_client import fetch_bytes
         
-        lesson = Lesson.objects.get(id=lesson_id)
+        lesson = await Lesson.objects.aget(id=lesson_id)
         
         if not lesson.pdf_file:
             return JsonResponse({
@@ -1028,42 +1115,49 @@ def render_pdf_pages(request, lesson_id):
         # Get PDF from Cloudinary URL
         pdf_url = lesson.pdf_file.url
         
-        # Download PDF from Cloudinary
-        response = requests.get(pdf_url, timeout=10)
-        if response.status_code != 200:
-            return JsonResponse({
-                'success': False,
-                'error': 'Failed to download PDF from cloud storage'
-            }, status=404)
-        
-        pdf_bytes = BytesIO(response.content)
-        
-        # Open PDF with PyMuPDF from bytes
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        pages_data = []
-        
-        # Convert each page to image
-        for page_num in range(len(doc)):
-            page = doc.load_page(page_num)
-            
-            # Render page to image at 2x scale for better quality
-            mat = fitz.Matrix(2, 2)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PNG bytes
-            img_bytes = pix.tobytes("png")
+        def render_pages(pdf_data):
+            # Open PDF with PyMuPDF from bytes
+            doc = fitz.open(stream=BytesIO(pdf_data), filetype="pdf")
+            pages_data = []
             
-            # Encode to base64
-            img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+            # Convert each page to image
+            for page_num in range(len(doc)):
+                page = doc.load_page(page_num)
+                
+                # Render page to image at 2x scale for better quality
+                mat = fitz.Matrix(2, 2)
+                pix = page.get_pixmap(matrix=mat)
+                
+                # Convert to PNG bytes
+                img_bytes = pix.tobytes("png")
+                
+                # Encode to base64
+                img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+                
+                pages_data.append({
+                    'page_number': page_num + 1,
+                    'image': f'data:image/png;base64,{img_base64}',
+                    'width': pix.width,
+                    'height': pix.height
+                })
             
-            pages_data.append({
-                'page_number': page_num + 1,
-                'image': f'data:image/png;base64,{img_base64}',
-                'width': pix.width,
-                'height': pix.height
-            })
+            doc.close()
+            return pages_data
         
-        doc.close()
+        async def download_and_render():
+            # Download PDF from Cloudinary without blocking the worker
+            pdf_data = await fetch_bytes(pdf_url)
+            # Rendering is CPU-bound: run it on a thread, off the event loop
+            return await sync_to_async(render_pages, thread_sensitive=False)(pdf_data)
+        
+        # Rendered once per file across all workers; a new upload gets a new key
+        pages_data = await async_single_flight(
+            f'curriculum:pdf_pages:{lesson.id}:{lesson.pdf_file.name}',
+            download_and_render,
+            PDF_PAGES_CACHE_SECONDS,
+            lock_timeout=120,
+            wait_seconds=60,
+        )
         
         return JsonResponse({
             'success': True,
@@ -1076,6 +1170,11 @@ def render_pdf_pages(request, lesson_id):
             'success': False,
             'error': 'Lesson not found'
         }, status=404)
+    except httpx.HTTPError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Failed to download PDF from cloud storage'
+        }, status=404)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -1089,12 +1188,13 @@ def teaching_content(request):
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    from django.db.models import Count
+    from django.db.models import Value
+    from django.db.models.functions import Coalesce
     from exams.models import ActiveExam
     
-    # Get all exams created by this teacher with submission counts
+    # Get all exams created by this teacher with submission counts (from the stats row)
     exams = ActiveExam.objects.filter(teacher=request.user).annotate(
-        submission_count=Count('submissions')
+        submission_count=Coalesce('stats__submission_count', Value(0))
     ).order_by('-created_at')
     
     context = {
@@ -1141,7 +1241,7 @@ def end_exam_view(request, exam_id):
 @login_required(login_url='signin')
 def student_progress_view(request):
     """Display student's learning progress and exam results"""
-    from .models import Lesson, Progress, Chapter
+    from .models import Lesson, Chapter
     from exams.models import ExamSubmission
     from users.models import User
     from django.db.models import Count, Q
@@ -1154,7 +1254,8 @@ def student_progress_view(request):
     
     # Get curriculum progress data
     total_lessons = Lesson.objects.count()
-    completed_lessons_count = Progress.objects.filter(student=user, is_completed=True).count()
+    snapshot = get_progress_snapshot(user)
+    completed_lessons_count = sum(1 for p in snapshot.values() if p.is_completed)
     progress_percent = user.progress_percent if user.progress_percent is not None else 0
     
     # Calculate student's rank based on star points
@@ -1175,7 +1276,7 @@ def student_progress_view(request):
         for chapter in chapters:
             chapter_lessons = []
             for lesson in chapter.lessons.all().order_by('order'):
-                progress = Progress.objects.filter(student=user, lesson=lesson).first()
+                progress = snapshot.get(lesson.id)
                 
                 # Only show lessons where student has done something (quiz or coding)
                 if progress and (progress.quiz_passed or progress.code_test_passed):
@@ -1203,7 +1304,7 @@ def student_progress_view(request):
         if all_lessons.exists():
             chapter_lessons = []
             for lesson in all_lessons:
-                progress = Progress.objects.filter(student=user, lesson=lesson).first()
+                progress = snapshot.get(lesson.id)
                 
                 # Only show lessons where student has done something (quiz or coding)
                 if progress and (progress.quiz_passed or progress.code_test_passed):
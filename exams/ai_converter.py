@@ -2,12 +2,175 @@
 AI Service for converting natural language or document text to exam JSON format.
 Supports both Vietnamese and English languages using OpenAI ChatGPT.
 """
+import asyncio
+import codecs
+import contextvars
+import functools
+import hashlib
 import json
+import logging
+import os
+import random
 import re
-from typing import Dict, List, Any, Optional
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional
+import httpx
+from openai import OpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# Extracted PDF page text is cached by file hash for this long
+PDF_TEXT_CACHE_SECONDS = 60 * 60 * 24
+
+
+class AIServiceBusyError(Exception):
+    """Raised when the OpenAI quota stays exhausted after queuing and retries"""
+    pass
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `capacity` per minute. Holds no state
+    itself: levels live in the shared cache (see RateLimiter), so every worker
+    process draws from the same bucket. A level may go negative (e.g. when
+    reconciling actual usage); later callers then wait until the debt is refilled.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self.rate = self.capacity / 60.0  # tokens per second
+
+    def refill(self, state, now: float) -> float:
+        """Level of the bucket at `now`, given its cached (level, updated) state"""
+        if state is None:
+            return float(self.capacity)
+        level, updated = state
+        return min(self.capacity, level + max(0.0, now - updated) * self.rate)
+
+    def wait_time(self, level: float, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)"""
+        amount = min(amount, self.capacity)
+        return 0.0 if level >= amount else (amount - level) / self.rate
+
+
+class RateLimiter:
+    """
+    Limiter for OpenAI calls shared by all worker processes through the cache:
+    one bucket for requests/min and one for tokens/min. `acquire` queues until
+    both buckets allow the call, or raises AIServiceBusyError once the deadline
+    (`max_wait` seconds by default) would pass. The cache lock is only held
+    while the levels are read and written, never while waiting.
+    """
+    CACHE_KEY = 'openai:rate_limiter'
+    # Longest sleep between checks, so refunds by other callers are noticed
+    POLL_SECONDS = 1.0
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_wait: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+
+    def _update(self, change):
+        """Apply `change(requests_level, tokens_level)` to the cached levels under the cache lock"""
+        from django.core.cache import cache
+        from pyez_learning.caching import cache_lock
+
+        for _ in range(100):
+            with cache_lock(self.CACHE_KEY, timeout=5) as acquired:
+                if acquired:
+                    now = time.time()
+                    state = cache.get(self.CACHE_KEY) or {}
+                    requests = self.requests.refill(state.get('requests'), now)
+                    tokens = self.tokens.refill(state.get('tokens'), now)
+                    requests, tokens, result = change(requests, tokens)
+                    cache.set(self.CACHE_KEY, {'requests': (requests, now), 'tokens': (tokens, now)}, 60 * 60)
+                    return result
+            time.sleep(0.01)
+        raise AIServiceBusyError('AI rate limiter is unavailable')
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        """Take one request and `estimated_tokens` if both are available; else seconds to wait"""
+        def change(requests, tokens):
+            wait = max(self.requests.wait_time(requests, 1), self.tokens.wait_time(tokens, estimated_tokens))
+            if wait > 0:
+                return requests, tokens, wait
+            return requests - 1, tokens - min(estimated_tokens, self.tokens.capacity), 0.0
+        return self._update(change)
+
+    def acquire(self, estimated_tokens: int, deadline: Optional[float] = None) -> float:
+        """
+        Reserve one request and `estimated_tokens` tokens; return seconds waited.
+        `deadline` is a time.monotonic() value; it defaults to max_wait from now.
+        """
+        start = time.monotonic()
+        deadline = deadline if deadline is not None else start + self.max_wait
+        while True:
+            wait = self._reserve(estimated_tokens)
+            if wait <= 0:
+                return time.monotonic() - start
+            if time.monotonic() + wait > deadline:
+                raise AIServiceBusyError('AI request queue is full')
+            time.sleep(min(wait, self.POLL_SECONDS))
+
+    def adjust_tokens(self, delta: float):
+        """Charge (positive) or refund (negative) tokens after the fact"""
+        self._update(lambda requests, tokens: (requests, min(self.tokens.capacity, tokens - delta), None))
+
+
+class _InFlightCall:
+    """A pending OpenAI call that identical concurrent prompts can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+# Shared across every ExamAIConverter in the process
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+_in_flight: Dict[str, _InFlightCall] = {}
+_in_flight_lock = threading.Lock()
+_metrics = {
+    'requests': 0,
+    'coalesced': 0,
+    'retries': 0,
+    'rate_limited': 0,
+    'failures': 0,
+    'busy_rejections': 0,
+    'tokens_used': 0,
+    'queue_wait_seconds': 0.0,
+}
+_metrics_lock = threading.Lock()
+
+
+def _record(metric: str, amount=1):
+    with _metrics_lock:
+        _metrics[metric] += amount
+
+
+def get_ai_metrics() -> Dict[str, Any]:
+    """Snapshot of OpenAI call metrics for this process"""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get or create the OpenAI rate limiter (its buckets are shared through the cache)"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                requests_per_minute=getattr(settings, 'OPENAI_REQUESTS_PER_MINUTE', 60),
+                tokens_per_minute=getattr(settings, 'OPENAI_TOKENS_PER_MINUTE', 150000),
+                max_wait=getattr(settings, 'OPENAI_MAX_QUEUE_SECONDS', 90),
+            )
+        return _rate_limiter
+
 
 class ExamAIConverter:
     """
@@ -15,14 +178,105 @@ class ExamAIConverter:
     into structured exam JSON format using OpenAI ChatGPT
     """
     
-    def __init__(self):
-        """Initialize the AI converter with OpenAI API"""
-        api_key = getattr(settings, 'OPENAI_API_KEY', None)
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in settings")
-        
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, client: Optional[OpenAI] = None):
+        """Initialize the AI converter with OpenAI API (pooled process client by default)"""
+        self.client = client or get_openai_client()
         self.model = "gpt-4o-mini"  # Cost-effective, fast, and capable
+        self.limiter = get_rate_limiter()
+        self.max_retries = getattr(settings, 'OPENAI_MAX_RETRIES', 5)
+        self.max_output_tokens = 4096
+
+    def _chat(self, system: str, prompt: str, temperature: float) -> str:
+        """
+        Send a JSON-mode chat completion through the shared rate limiter.
+        Identical prompts already in flight are coalesced into one API call.
+        
+        Returns:
+            The message content of the first choice
+        
+        Raises:
+            AIServiceBusyError: quota still exhausted after queuing and retries
+        """
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
+        key = hashlib.sha256(
+            json.dumps([self.model, temperature, messages]).encode('utf-8')
+        ).hexdigest()
+        
+        with _in_flight_lock:
+            call = _in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                _in_flight[key] = call
+        
+        if not leader:
+            _record('coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = self._chat_with_retries(messages, temperature)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+            call.done.set()
+
+    def _chat_with_retries(self, messages: List[Dict], temperature: float) -> str:
+        """Call the API with exponential backoff and full jitter on transient errors"""
+        # Rough estimate (~4 characters per token) plus the output allowance
+        estimated_tokens = sum(len(m['content']) for m in messages) // 4 + self.max_output_tokens
+        
+        # Queuing and backoff together never exceed the limiter's max_wait
+        deadline = time.monotonic() + self.limiter.max_wait
+        for attempt in range(self.max_retries + 1):
+            try:
+                _record('queue_wait_seconds', self.limiter.acquire(estimated_tokens, deadline))
+            except AIServiceBusyError:
+                _record('busy_rejections')
+                raise
+            
+            _record('requests')
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=self.max_output_tokens,
+                    response_format={ "type": "json_object" }
+                )
+            except (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError) as e:
+                if isinstance(e, RateLimitError):
+                    _record('rate_limited')
+                    # An exhausted monthly quota will not recover by waiting
+                    if 'insufficient_quota' in str(e):
+                        _record('failures')
+                        raise AIServiceBusyError('OpenAI quota exceeded') from e
+                delay = random.uniform(0, min(30.0, 2 ** attempt))
+                if attempt == self.max_retries or time.monotonic() + delay > deadline:
+                    _record('failures')
+                    if isinstance(e, RateLimitError):
+                        raise AIServiceBusyError('OpenAI rate limit exceeded') from e
+                    raise
+                _record('retries')
+                logger.warning(f"OpenAI call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            
+            usage = getattr(response, 'usage', None)
+            if usage is not None:
+                _record('tokens_used', usage.total_tokens)
+                # Refund (or charge) the difference between estimate and actual usage
+                self.limiter.adjust_tokens(usage.total_tokens - estimated_tokens)
+            return response.choices[0].message.content
     
     def convert_text_to_exam(
         self, 
@@ -117,16 +371,12 @@ Return ONLY the corrected JSON array. No explanations, no markdown, no code bloc
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert exam JSON validator. Return only valid JSON without markdown formatting."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={ "type": "json_object" }
+            content = self._chat(
+                "You are an expert exam JSON validator. Return only valid JSON without markdown formatting.",
+                prompt,
+                temperature=0.3
             )
-            json_fixed = self._extract_json(response.choices[0].message.content)
+            json_fixed = self._extract_json(content)
             data = json.loads(json_fixed)
             
             # Handle both wrapped object and direct array
@@ -145,6 +395,8 @@ Return ONLY the corrected JSON array. No explanations, no markdown, no code bloc
                 'exam_type': 'multi_choice',
                 'fixed': True
             }
+        except AIServiceBusyError:
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -202,16 +454,12 @@ Return ONLY the corrected JSON array. No explanations, no markdown, no code bloc
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert programming exam JSON validator. Return only valid JSON without markdown formatting."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={ "type": "json_object" }
+            content = self._chat(
+                "You are an expert programming exam JSON validator. Return only valid JSON without markdown formatting.",
+                prompt,
+                temperature=0.3
             )
-            json_fixed = self._extract_json(response.choices[0].message.content)
+            json_fixed = self._extract_json(content)
             data = json.loads(json_fixed)
             
             # Handle both wrapped object and direct array
@@ -230,6 +478,8 @@ Return ONLY the corrected JSON array. No explanations, no markdown, no code bloc
                 'exam_type': 'coding',
                 'fixed': True
             }
+        except AIServiceBusyError:
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -274,16 +524,12 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert exam creator. Convert text to multiple choice questions in JSON format without markdown."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                response_format={ "type": "json_object" }
+            content = self._chat(
+                "You are an expert exam creator. Convert text to multiple choice questions in JSON format without markdown.",
+                prompt,
+                temperature=0.5
             )
-            json_text = self._extract_json(response.choices[0].message.content)
+            json_text = self._extract_json(content)
             data = json.loads(json_text)
             
             # Handle both wrapped object and direct array
@@ -301,6 +547,8 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
                 'count': len(validated_questions),
                 'exam_type': 'multi_choice'
             }
+        except AIServiceBusyError:
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -352,16 +600,12 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert programming exam creator. Convert text to coding problems in JSON format without markdown."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                response_format={ "type": "json_object" }
+            content = self._chat(
+                "You are an expert programming exam creator. Convert text to coding problems in JSON format without markdown.",
+                prompt,
+                temperature=0.5
             )
-            json_text = self._extract_json(response.choices[0].message.content)
+            json_text = self._extract_json(content)
             data = json.loads(json_text)
             
             # Handle both wrapped object and direct array
@@ -379,6 +623,8 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
                 'count': len(validated_problems),
                 'exam_type': 'coding'
             }
+        except AIServiceBusyError:
+            raise
         except Exception as e:
             return {
                 'success': False,
@@ -453,67 +699,124 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
         
         return validated
     
-    def extract_text_from_file(self, file_path: str) -> Optional[str]:
+    def _read_source(self, source) -> bytes:
+        """Read a path or file-like object (e.g. an UploadedFile) into bytes"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                return f.read()
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        if hasattr(source, 'chunks'):
+            return b''.join(source.chunks())
+        return source.read()
+    
+    def iter_text_from_file(self, source, file_ext: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield text from a .txt or .pdf file incrementally (one chunk per PDF page).
+        PDF page text is cached by file content hash, so re-uploading the same
+        document skips PyMuPDF entirely.
+        
+        Args:
+            source: Path to the file, or a file-like object such as an UploadedFile
+            file_ext: Extension including the dot; derived from the path/name if omitted
+        
+        Raises:
+            ValueError: for unsupported file types
+        """
+        if file_ext is None:
+            file_ext = Path(getattr(source, 'name', None) or str(source)).suffix
+        file_ext = file_ext.lower()
+        
+        if file_ext == '.txt':
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            if isinstance(source, (str, os.PathLike)):
+                with open(source, 'rb') as f:
+                    for chunk in iter(lambda: f.read(64 * 1024), b''):
+                        yield decoder.decode(chunk)
+            else:
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+                chunks = source.chunks() if hasattr(source, 'chunks') else iter(lambda: source.read(64 * 1024), b'')
+                for chunk in chunks:
+                    yield decoder.decode(chunk)
+            yield decoder.decode(b'', final=True)
+        
+        elif file_ext == '.pdf':
+            yield from self._iter_pdf_pages(self._read_source(source))
+        
+        else:
+            # .doc/.docx would need python-docx; other formats are unsupported
+            raise ValueError(f"Unsupported file type: {file_ext}")
+    
+    def _iter_pdf_pages(self, data: bytes) -> Iterator[str]:
+        """Yield page text for a PDF, reading from and filling the page cache"""
+        from django.core.cache import cache
+        
+        digest = hashlib.sha256(data).hexdigest()
+        count_key = f'ai_pdf_pages:{digest}'
+        page_count = cache.get(count_key)
+        
+        cached = {}
+        if page_count is not None:
+            keys = [f'ai_pdf_page:{digest}:{i}' for i in range(page_count)]
+            cached = cache.get_many(keys)
+            if len(cached) == page_count:
+                for key in keys:
+                    yield cached[key]
+                return
+        
+        import fitz  # PyMuPDF
+        doc = fitz.open(stream=data, filetype='pdf')
+        try:
+            cache.set(count_key, len(doc), PDF_TEXT_CACHE_SECONDS)
+            for i in range(len(doc)):
+                key = f'ai_pdf_page:{digest}:{i}'
+                text = cached.get(key)
+                if text is None:
+                    text = doc.load_page(i).get_text()
+                    cache.set(key, text, PDF_TEXT_CACHE_SECONDS)
+                yield text
+        finally:
+            doc.close()
+    
+    def extract_text_from_file(self, source, file_ext: Optional[str] = None) -> Optional[str]:
         """
         Extract text from uploaded file (txt, pdf, docx, etc.)
         
         Args:
-            file_path: Path to the uploaded file
+            source: Path to the uploaded file, or a file-like object
+            file_ext: Extension including the dot; derived from the path/name if omitted
         
         Returns:
             Extracted text content or None if failed
         """
-        import os
-        from pathlib import Path
-        
-        file_ext = Path(file_path).suffix.lower()
-        
         try:
-            if file_ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            
-            elif file_ext == '.pdf':
-                import fitz  # PyMuPDF
-                doc = fitz.open(file_path)
-                text = ""
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                return text
-            
-            elif file_ext in ['.doc', '.docx']:
-                # For Word documents, we'd need python-docx
-                # For now, return an error message
-                return None
-            
-            else:
-                # Unsupported format
-                return None
-                
+            return ''.join(self.iter_text_from_file(source, file_ext))
         except Exception as e:
-            print(f"Error extracting text from file: {e}")
+            logger.warning(f"Error extracting text from file: {e}")
             return None
     
     def convert_file_to_exam(
         self, 
-        file_path: str, 
+        source, 
         exam_type: str = 'multi_choice',
-        language: str = 'vi'
+        language: str = 'vi',
+        file_ext: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Convert uploaded file to exam JSON format.
         
         Args:
-            file_path: Path to uploaded file
+            source: Path to uploaded file, or a file-like object
             exam_type: 'multi_choice' or 'coding'
             language: 'vi' or 'en'
+            file_ext: Extension including the dot; derived from the path/name if omitted
         
         Returns:
             Dict with 'questions' list and metadata
         """
         # Extract text from file
-        text = self.extract_text_from_file(file_path)
+        text = self.extract_text_from_file(source, file_ext)
         
         if text is None:
             return {
@@ -533,12 +836,141 @@ Return ONLY the JSON array, no explanation, no markdown formatting, no code bloc
         return self.convert_text_to_exam(text, exam_type, language)
 
 
-# Singleton instance
+# Process-wide registry: one pooled OpenAI client and one converter per process.
+# Guarded by a lock for threaded workers and rebuilt after fork, since a pooled
+# HTTP connection must never be shared between parent and child processes.
+_registry_lock = threading.Lock()
+_registry_pid = None
+_client_instance = None
+_http_client = None
 _converter_instance = None
+# Async views run the blocking AI calls on their own bounded pool, so slow completions
+# can't fill the default executor that static files and PDF renders share
+_executor = None
+
+
+def _reset_after_fork():
+    """Drop state inherited from the parent process (runs in the forked child)"""
+    global _registry_lock, _registry_pid, _client_instance, _http_client, _converter_instance, _executor
+    global _rate_limiter, _rate_limiter_lock, _in_flight_lock, _metrics_lock
+    _registry_lock = threading.Lock()
+    _registry_pid = None
+    _client_instance = None
+    _http_client = None
+    _converter_instance = None
+    _executor = None
+    _rate_limiter = None
+    _rate_limiter_lock = threading.Lock()
+    _in_flight.clear()
+    _in_flight_lock = threading.Lock()
+    _metrics_lock = threading.Lock()
+    for metric in _metrics:
+        _metrics[metric] = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _build_openai_client():
+    """Create an OpenAI client with a tuned keep-alive pool and timeouts"""
+    api_key = getattr(settings, 'OPENAI_API_KEY', None)
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in settings")
+    
+    pool_size = getattr(settings, 'OPENAI_POOL_SIZE', 10)
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=getattr(settings, 'OPENAI_KEEPALIVE_SECONDS', 120),
+        ),
+        timeout=httpx.Timeout(
+            getattr(settings, 'OPENAI_TIMEOUT_SECONDS', 120),
+            connect=getattr(settings, 'OPENAI_CONNECT_TIMEOUT_SECONDS', 10),
+        ),
+    )
+    client = OpenAI(
+        api_key=api_key,
+        # Point at a local stub server in tests/dev; None means the real API
+        base_url=getattr(settings, 'OPENAI_BASE_URL', None) or None,
+        http_client=http_client,
+        max_retries=0,  # Retries handled by ExamAIConverter._chat
+    )
+    return client, http_client
+
+
+def get_openai_client() -> OpenAI:
+    """Get or create the pooled OpenAI client for this process"""
+    global _client_instance, _http_client, _registry_pid
+    pid = os.getpid()
+    client = _client_instance
+    if client is not None and _registry_pid == pid:
+        return client
+    with _registry_lock:
+        if _client_instance is None or _registry_pid != pid:
+            _client_instance, _http_client = _build_openai_client()
+            _registry_pid = pid
+        return _client_instance
+
 
 def get_ai_converter() -> ExamAIConverter:
     """Get or create singleton AI converter instance"""
     global _converter_instance
-    if _converter_instance is None:
-        _converter_instance = ExamAIConverter()
-    return _converter_instance
+    client = get_openai_client()
+    converter = _converter_instance
+    if converter is None or converter.client is not client:
+        with _registry_lock:
+            if _converter_instance is None or _converter_instance.client is not client:
+                _converter_instance = ExamAIConverter(client)
+            converter = _converter_instance
+    return converter
+
+
+def reset_ai_clients():
+    """Discard the cached client and converter (e.g. after changing OPENAI_BASE_URL in tests)"""
+    global _client_instance, _http_client, _converter_instance
+    with _registry_lock:
+        client = _client_instance
+        _client_instance, _http_client, _converter_instance = None, None, None
+    if client is not None:
+        client.close()
+
+
+def warm_ai_client() -> bool:
+    """
+    Build the client and open a keep-alive connection to the API host, so the
+    first AI request in a fresh worker skips DNS/TLS setup. Returns False when
+    no API key is configured or the host is unreachable.
+    """
+    if not getattr(settings, 'OPENAI_API_KEY', None):
+        return False
+    try:
+        client = get_openai_client()
+        # Any response (even 404) leaves an established connection in the pool
+        _http_client.head(str(client.base_url))
+        return True
+    except Exception as e:
+        logger.warning(f"OpenAI client warmup failed: {e}")
+        return False
+
+
+def get_ai_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool that runs AI calls for async views"""
+    global _executor
+    executor = _executor
+    if executor is not None:
+        return executor
+    with _registry_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'AI_WORKER_THREADS', 10),
+                thread_name_prefix='openai',
+            )
+        return _executor
+
+
+async def run_ai_call(func, *args, **kwargs):
+    """Await a blocking converter call on the AI thread pool"""
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_ai_executor(), call)
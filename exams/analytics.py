@@ -0,0 +1,86 @@
+"""
+Per-question (item) analytics for exams and lesson quizzes.
+
+Item stats are a JSON dict kept on the stats row of the exam or lesson:
+    {question_id: {'attempts': n, 'correct': n, 'answers': {answer: n}}}
+Only answered questions count as attempts. The stats are updated
+incrementally at grading time and can be rebuilt from stored answers.
+"""
+from .grading import compile_answer_key, exam_answer_key
+
+
+def grade_exam_items(exam, answers):
+    """(question_id, answer, correct) for each answered question of an ActiveExam"""
+    return exam_answer_key(exam).items(answers)
+
+
+def grade_quiz_items(quiz, answers):
+    """(question_id, answer, correct) for each answered question of a Lesson.quiz"""
+    return compile_answer_key('quiz', quiz).items(answers)
+
+
+def apply_item_results(item_stats, results, sign=1):
+    """Add (sign=1) or remove (sign=-1) graded items from an item stats dict in place"""
+    for question_id, answer, correct in results:
+        item = item_stats.setdefault(question_id, {'attempts': 0, 'correct': 0, 'answers': {}})
+        item['attempts'] += sign
+        item['correct'] += sign * int(correct)
+        item['answers'][answer] = item['answers'].get(answer, 0) + sign
+        if item['answers'][answer] <= 0:
+            del item['answers'][answer]
+        if item['attempts'] <= 0:
+            del item_stats[question_id]
+    return item_stats
+
+
+def _percent(part, whole):
+    return round(part / whole * 100, 1) if whole else 0
+
+
+def _item_row(number, question_id, text, item, choices):
+    """
+    One analysis row; `choices` is [(answer key, label, is correct)] in display order
+    """
+    attempts = item.get('attempts', 0)
+    counts = item.get('answers', {})
+    return {
+        'number': number,
+        'question_id': question_id,
+        'text': text,
+        'attempts': attempts,
+        'correct': item.get('correct', 0),
+        'correct_pct': _percent(item.get('correct', 0), attempts),
+        'choices': [
+            {'label': label, 'count': counts.get(key, 0), 'pct': _percent(counts.get(key, 0), attempts),
+             'is_correct': is_correct}
+            for key, label, is_correct in choices
+        ],
+    }
+
+
+def exam_item_analysis(exam, item_stats):
+    """Rows for every exam question, most-missed first (unattempted questions last)"""
+    rows = []
+    for number, question in enumerate(exam.questions, start=1):
+        question_id = str(question.get('id'))
+        if exam.exam_type == 'multi_choice':
+            choices = [(str(index), option, index == question.get('correct_answer'))
+                       for index, option in enumerate(question.get('options', []))]
+            text = question.get('question', '')
+        else:
+            choices = [('passed', 'Passed', True), ('failed', 'Failed', False)]
+            text = question.get('title', '')
+        rows.append(_item_row(number, question_id, text, item_stats.get(question_id, {}), choices))
+    return sorted(rows, key=lambda row: (row['attempts'] == 0, row['correct_pct'], row['number']))
+
+
+def quiz_item_analysis(quiz, item_stats):
+    """Rows for every lesson quiz question, most-missed first (unattempted questions last)"""
+    rows = []
+    for number, question in enumerate(quiz, start=1):
+        question_id = str(question['question_id'])
+        choices = [(str(index), question.get(f'option{index}', ''), str(index) == str(question['answer']))
+                   for index in range(1, 5) if question.get(f'option{index}')]
+        rows.append(_item_row(number, question_id, question.get('question', ''),
+                              item_stats.get(question_id, {}), choices))
+    return sorted(rows, key=lambda row: (row['attempts'] == 0, row['correct_pct'], row['number']))
@@ -0,0 +1,115 @@
+"""
+Autosave of in-progress exam answers.
+
+The browser sends only the answers that changed since its last autosave.
+Deltas are merged into a per-student buffer in the shared cache, under a
+cache lock so concurrent requests can't drop each other's deltas, and
+written behind: once the buffer is AUTOSAVE_FLUSH_SECONDS old, the next
+autosave or heartbeat merges it into ExamSubmission.draft_answers with a
+single UPDATE, so the JSON is never read back into Python. With the
+browser autosaving every 10 seconds, a student costs one write per 30
+seconds instead of one per request.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Func, JSONField, Value
+from django.utils import timezone
+
+from pyez_learning.caching import cache_lock
+
+from .models import ExamSubmission
+
+
+AUTOSAVE_FLUSH_SECONDS = 30
+# Larger autosave requests are rejected
+AUTOSAVE_MAX_BYTES = 256 * 1024
+AUTOSAVE_BUFFER_KEY = 'exams:draft:{exam_id}:{student_id}'
+
+# Buffered deltas outlive a missed flush long enough for the sweeper to pick them up
+_BUFFER_TIMEOUT = 24 * 60 * 60
+# Waiting for another request's merge into the same buffer, before writing through
+_LOCK_TIMEOUT = 10
+_LOCK_ATTEMPTS = 50
+_LOCK_RETRY_SECONDS = 0.02
+
+
+class JSONMerge(Func):
+    """Merges a JSON object into a JSON column inside the database"""
+    function = 'JSON_PATCH'
+    output_field = JSONField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(%(expressions)s)', arg_joiner=' || ',
+                           **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, function='JSON_MERGE_PATCH', **extra_context)
+
+
+def _buffer_key(exam_id, student_id):
+    return AUTOSAVE_BUFFER_KEY.format(exam_id=exam_id, student_id=student_id)
+
+
+def flush_draft(exam_id, student_id, answers):
+    """
+    Merge `answers` into the in-progress submission's draft with one UPDATE.
+    Returns False if there is no in-progress submission (not entered, or
+    already submitted).
+    """
+    return bool(
+        ExamSubmission.objects.in_progress()
+        .filter(exam_id=exam_id, student_id=student_id)
+        .update(
+            draft_answers=JSONMerge('draft_answers', Value(answers, output_field=JSONField())),
+            draft_saved_at=timezone.now(),
+        )
+    )
+
+
+def _merge(exam_id, student_id, delta, force=False):
+    key = _buffer_key(exam_id, student_id)
+    for _ in range(_LOCK_ATTEMPTS):
+        with cache_lock(key, _LOCK_TIMEOUT) as acquired:
+            if acquired:
+                buffer = cache.get(key) or {'answers': {}, 'since': time.time()}
+                buffer['answers'].update(delta)
+                if not buffer['answers']:
+                    return True
+                if not force and time.time() - buffer['since'] < AUTOSAVE_FLUSH_SECONDS:
+                    cache.set(key, buffer, _BUFFER_TIMEOUT)
+                    return True
+                saved = flush_draft(exam_id, student_id, buffer['answers'])
+                cache.delete(key)
+                return saved
+        time.sleep(_LOCK_RETRY_SECONDS)
+    # The buffer is stuck behind a lock: write this delta straight through rather than lose it
+    return flush_draft(exam_id, student_id, delta) if delta else True
+
+
+def save_answers(exam_id, student_id, delta):
+    """
+    Buffer one autosave delta, flushing the buffer to the database once it
+    is AUTOSAVE_FLUSH_SECONDS old. Returns False if the flush found no
+    in-progress submission to save into.
+    """
+    return _merge(exam_id, student_id, delta)
+
+
+def flush_buffer(exam_id, student_id, force=False):
+    """Write the buffered deltas to the database if they are due, or now with `force`"""
+    return _merge(exam_id, student_id, {}, force)
+
+
+def get_draft_answers(submission):
+    """Saved draft answers plus any deltas still waiting in the buffer"""
+    buffer = cache.get(_buffer_key(submission.exam_id, submission.student_id))
+    draft = dict(submission.draft_answers or {})
+    if buffer:
+        draft.update(buffer['answers'])
+    return {question_id: answer for question_id, answer in draft.items() if answer is not None}
+
+
+def discard_buffer(exam_id, student_id):
+    """Drop buffered deltas once the final answers are submitted"""
+    cache.delete(_buffer_key(exam_id, student_id))
@@ -0,0 +1,256 @@
+"""
+Sandboxed execution and grading of students' exam code.
+
+Each test run is a separate Python process (`python -I -S`) with an empty
+environment, a wall-clock timeout and CPU/memory/output rlimits where the
+platform supports them. With CODE_RUNNER_SANDBOX = 'bwrap' (the default
+outside DEBUG) the process runs under bubblewrap: new user, network, PID and
+mount namespaces, uid nobody, no capabilities, and a filesystem holding only
+the Python installation and system libraries read-only plus an empty /tmp, so
+the project tree, its settings and the network are out of reach. If bwrap
+is missing or can't create namespaces on the host, code is not run at all.
+CODE_RUNNER_SANDBOX = 'none' keeps only the process limits; it is meant for
+local development, not for untrusted students.
+
+Runs go through a process-wide thread pool of CODE_RUNNER_WORKERS threads,
+so a burst of submissions queues up behind a fixed number of child
+processes instead of forking one per test case.
+"""
+import functools
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Student code longer than this is rejected without running it
+MAX_CODE_LENGTH = 64 * 1024
+
+# uid/gid of the student's code inside the bwrap sandbox (nobody/nogroup)
+SANDBOX_UID = 65534
+# System directories bound read-only into the sandbox when they exist
+_SANDBOX_SYSTEM_DIRS = ['/usr', '/lib', '/lib64', '/lib32', '/bin', '/etc/alternatives', '/etc/ld.so.cache']
+
+
+class SandboxUnavailable(RuntimeError):
+    """The configured sandbox can't run code on this host"""
+
+RunResult = namedtuple('RunResult', ['output', 'error', 'timed_out'])
+
+# Sets the rlimits inside the child, then runs the student's code (argv[1]) as __main__
+_BOOTSTRAP = '''
+import sys
+try:
+    import resource
+    memory, cpu, output = (int(value) for value in sys.argv[2:5])
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (output, output))
+except (ImportError, ValueError, OSError):
+    pass
+code = sys.argv[1]
+del sys.argv[1:]
+exec(compile(code, '<solution>', 'exec'), {'__name__': '__main__'})
+'''
+
+
+def _limits():
+    timeout = getattr(settings, 'CODE_RUNNER_TIMEOUT_SECONDS', 5)
+    memory = getattr(settings, 'CODE_RUNNER_MEMORY_MB', 256) * 1024 * 1024
+    output = getattr(settings, 'CODE_RUNNER_MAX_OUTPUT_KB', 64) * 1024
+    return timeout, memory, output
+
+
+def _sandbox_mode():
+    return getattr(settings, 'CODE_RUNNER_SANDBOX', 'bwrap')
+
+
+def _interpreter():
+    # The base interpreter: a virtualenv's own directory isn't bound into the sandbox,
+    # and -I -S never imports its site-packages anyway
+    return getattr(sys, '_base_executable', None) or sys.executable
+
+
+def _bwrap_command():
+    """bwrap argv prefix that runs a command isolated from the host"""
+    bwrap = shutil.which('bwrap')
+    if bwrap is None:
+        raise SandboxUnavailable('bubblewrap (bwrap) is not installed')
+    command = [
+        bwrap, '--unshare-all', '--unshare-user', '--die-with-parent', '--new-session', '--clearenv',
+        '--uid', str(SANDBOX_UID), '--gid', str(SANDBOX_UID), '--cap-drop', 'ALL',
+    ]
+    for path in _SANDBOX_SYSTEM_DIRS:
+        command += ['--ro-bind-try', path, path]
+    for prefix in sorted({sys.base_prefix, sys.base_exec_prefix}):
+        command += ['--ro-bind', prefix, prefix]
+    return command + ['--proc', '/proc', '--dev', '/dev', '--tmpfs', '/tmp', '--chdir', '/tmp']
+
+
+@functools.lru_cache(maxsize=None)
+def _check_sandbox(mode):
+    if mode == 'none':
+        return None
+    if mode != 'bwrap':
+        return f'Unknown CODE_RUNNER_SANDBOX {mode!r}'
+    try:
+        command = _bwrap_command() + [_interpreter(), '-I', '-S', '-c', 'print(1)']
+        probe = subprocess.run(command, capture_output=True, timeout=10)
+    except (SandboxUnavailable, OSError, subprocess.TimeoutExpired) as e:
+        return str(e)
+    if probe.stdout.strip() != b'1':
+        # Typically the host doesn't allow unprivileged user namespaces
+        return _last_line(probe.stderr.decode('utf-8', errors='replace'))
+    return None
+
+
+def sandbox_error():
+    """Why student code can't be run here, or None if the configured sandbox works"""
+    return _check_sandbox(_sandbox_mode())
+
+
+def _last_line(text):
+    lines = [line for line in text.strip().splitlines() if line.strip()]
+    return lines[-1] if lines else 'Error'
+
+
+def run_python(code, stdin=''):
+    """
+    Run `code` in a sandboxed child process with `stdin` as its input.
+    Raises SandboxUnavailable rather than run code outside the configured sandbox.
+    """
+    if len(code) > MAX_CODE_LENGTH:
+        return RunResult('', 'Code is too long', False)
+    error = sandbox_error()
+    if error is not None:
+        logger.error("Not running student code, the %s sandbox is unavailable: %s", _sandbox_mode(), error)
+        raise SandboxUnavailable(error)
+
+    timeout, memory, output_limit = _limits()
+    command = [_interpreter(), '-I', '-S', '-c', _BOOTSTRAP, code,
+               str(memory), str(max(1, int(timeout))), str(output_limit)]
+    if _sandbox_mode() == 'bwrap':
+        command = _bwrap_command() + command
+    # Output goes to files, not pipes, so RLIMIT_FSIZE caps it
+    with tempfile.TemporaryDirectory(prefix='pyez-run-') as workdir, \
+            tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.run(
+                command, input=str(stdin or '').encode(), stdout=stdout, stderr=stderr,
+                cwd=workdir, env={}, timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            return RunResult('', f'Time limit exceeded ({timeout}s)', True)
+        stdout.seek(0)
+        stderr.seek(0)
+        output = stdout.read(output_limit).decode('utf-8', errors='replace')
+        if process.returncode != 0:
+            return RunResult(output, _last_line(stderr.read(output_limit).decode('utf-8', errors='replace')), False)
+        return RunResult(output, None, False)
+
+
+# Process-wide pool, rebuilt after fork (threads don't survive into the child)
+_pool_lock = threading.Lock()
+_pool_pid = None
+_pool = None
+
+
+def _reset_after_fork():
+    global _pool_lock, _pool_pid, _pool
+    _pool_lock = threading.Lock()
+    _pool_pid = None
+    _pool = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_runner_pool():
+    """Get or create the bounded code-runner pool for this process"""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    pool = _pool
+    if pool is not None and _pool_pid == pid:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CODE_RUNNER_WORKERS', 4),
+                thread_name_prefix='code-runner',
+            )
+            _pool_pid = pid
+        return _pool
+
+
+def _check(run, test_case):
+    expected = str(test_case.get('expected', '')).strip()
+    actual = run.output.strip()
+    result = {'input': test_case.get('input', ''), 'expected': expected, 'actual': actual,
+              'passed': run.error is None and actual == expected}
+    if run.error:
+        result['error'] = run.error
+    return result
+
+
+def run_test_cases(code, test_cases):
+    """Run `code` once per test case (input on stdin) on the pool; results in test order"""
+    pool = get_runner_pool()
+    futures = [pool.submit(run_python, code, test_case.get('input', '')) for test_case in test_cases]
+    return [_check(future.result(), test_case) for future, test_case in zip(futures, test_cases)]
+
+
+def grade_coding_answers(problems, answers):
+    """
+    Grade every submitted solution against each problem's test cases,
+    including `hidden_test_cases` that are never sent to the browser.
+    Returns the answers dict with server-computed 'passed' flags; the
+    client's own flag is ignored. All runs of the submission are queued
+    at once so they execute in parallel, bounded by the pool size.
+    """
+    pool = get_runner_pool()
+    pending = []
+    for problem in problems:
+        problem_id = str(problem.get('id'))
+        answer = answers.get(problem_id)
+        code = answer.get('code') if isinstance(answer, dict) else None
+        if not isinstance(code, str) or not code.strip():
+            continue
+        test_cases = problem.get('test_cases', []) + problem.get('hidden_test_cases', [])
+        futures = [pool.submit(run_python, code, test_case.get('input', '')) for test_case in test_cases]
+        pending.append((problem_id, code, test_cases, futures))
+
+    graded = {}
+    for problem_id, code, test_cases, futures in pending:
+        results = [_check(future.result(), test_case) for future, test_case in zip(futures, test_cases)]
+        tests_passed = sum(result['passed'] for result in results)
+        graded[problem_id] = {
+            'code': code,
+            'passed': tests_passed == len(results),
+            'tests_passed': tests_passed,
+            'tests_total': len(results),
+        }
+    return graded
+
+
+def code_answers(answers):
+    """Submitted answers reduced to the code; a browser's own 'passed' flags are dropped"""
+    return {
+        problem_id: {'code': answer['code']}
+        for problem_id, answer in answers.items()
+        if isinstance(answer, dict) and isinstance(answer.get('code'), str)
+    }
+
+
+def public_problems(problems):
+    """Exam problems as sent to students: hidden test cases removed"""
+    return [{key: value for key, value in problem.items() if key != 'hidden_test_cases'}
+            for problem in problems]
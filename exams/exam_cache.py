@@ -0,0 +1,40 @@
+"""
+Cached exam metadata. The exam-start surge only needs a few scalar fields
+per exam (question count, schedule, access rules), so they are kept in the
+shared cache and invalidated whenever the exam is saved or deleted.
+"""
+from django.core.cache import cache
+
+
+EXAM_META_CACHE_KEY = 'exams:meta:{exam_id}'
+EXAM_META_CACHE_SECONDS = 60 * 60
+
+
+def get_exam_meta(exam_id):
+    """Plain dict of exam metadata, or None if the exam doesn't exist"""
+    key = EXAM_META_CACHE_KEY.format(exam_id=exam_id)
+    meta = cache.get(key)
+    if meta is None:
+        from .models import ActiveExam
+
+        exam = ActiveExam.objects.filter(id=exam_id).first()
+        if exam is None:
+            return None
+        meta = {
+            'id': exam.id,
+            'teacher_id': exam.teacher_id,
+            'exam_type': exam.exam_type,
+            'total_questions': len(exam.questions),
+            'start_time': exam.start_time,
+            'end_time': exam.end_time,
+            'duration_minutes': exam.duration_minutes,
+            'is_ended': exam.is_ended,
+            'points_value': exam.points_value,
+            'allowed_classes': list(exam.allowed_classes or []),
+        }
+        cache.set(key, meta, EXAM_META_CACHE_SECONDS)
+    return meta
+
+
+def invalidate_exam_meta(exam_id):
+    cache.delete(EXAM_META_CACHE_KEY.format(exam_id=exam_id))
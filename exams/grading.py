@@ -0,0 +1,137 @@
+"""
+Precompiled answer keys for exam and lesson quiz grading.
+
+The questions JSON is compiled once into parallel tuples of question ids and
+expected answers, cached in-process by a hash of those ids and answers, so
+changing an exam's or quiz's answers produces a new key automatically.
+Grading a submission is then one pass over those tuples, and the same key
+grades a whole batch of submissions when an exam is regraded.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+ANSWER_KEY_CACHE_SIZE = 256
+
+_MISSING = object()
+_answer_keys = OrderedDict()
+# Request threads share the cache; the LRU bookkeeping isn't thread-safe on its own
+_answer_keys_lock = threading.Lock()
+
+
+class AnswerKey:
+    """
+    Compiled answer key. `kind` is 'multi_choice' or 'coding' for exams and
+    'quiz' for lesson quizzes; `expected` holds each question's answer already
+    normalized for comparison.
+    """
+    __slots__ = ('kind', 'digest', 'question_ids', 'expected', 'correct_answers')
+
+    def __init__(self, kind, digest, question_ids, expected, correct_answers):
+        self.kind = kind
+        self.digest = digest
+        self.question_ids = question_ids
+        self.expected = expected
+        self.correct_answers = correct_answers
+
+    @property
+    def total(self):
+        return len(self.question_ids)
+
+    def marks(self, answers):
+        """True/False per question, in question order"""
+        pairs = zip(self.question_ids, self.expected)
+        if self.kind == 'multi_choice':
+            return [answers.get(question_id, _MISSING) == expected for question_id, expected in pairs]
+        if self.kind == 'coding':
+            return [_passed(answers.get(question_id)) for question_id in self.question_ids]
+        # Quiz answers arrive as strings or ints; unanswered (None) never matches
+        return [str(answers.get(question_id)) == expected for question_id, expected in pairs]
+
+    def score(self, answers):
+        """(score, total) for one submission's answers dict"""
+        return sum(self.marks(answers)), self.total
+
+    def score_many(self, answer_dicts):
+        """Scores for a batch of submissions graded against this key"""
+        return [sum(self.marks(answers or {})) for answers in answer_dicts]
+
+    def items(self, answers):
+        """(question_id, answer, correct) for each answered question, as used by item analytics"""
+        results = []
+        for question_id, correct in zip(self.question_ids, self.marks(answers)):
+            answer = answers.get(question_id)
+            if answer is None:
+                continue
+            if self.kind == 'coding':
+                answer = 'passed' if correct else 'failed'
+            results.append((question_id, str(answer), correct))
+        return results
+
+
+def _passed(answer):
+    return bool(answer.get('passed', False)) if isinstance(answer, dict) else False
+
+
+def _content_digest(kind, questions):
+    # Only the fields grading reads are hashed: editing question text or options
+    # keeps the key, and hashing stays cheap next to the full questions JSON
+    if kind == 'quiz':
+        fields = [[question['question_id'], question['answer']] for question in questions]
+    else:
+        fields = [[question.get('id'), question.get('correct_answer')] for question in questions]
+    payload = json.dumps(fields, separators=(',', ':'), default=str)
+    return hashlib.sha1(f'{kind}:{payload}'.encode()).hexdigest()
+
+
+def _compile(kind, digest, questions):
+    if kind == 'quiz':
+        question_ids = tuple(str(question['question_id']) for question in questions)
+        correct_answers = tuple(question['answer'] for question in questions)
+        expected = tuple(str(answer) for answer in correct_answers)
+    else:
+        question_ids = tuple(str(question.get('id')) for question in questions)
+        if kind == 'multi_choice':
+            correct_answers = tuple(question.get('correct_answer') for question in questions)
+        else:
+            correct_answers = (True,) * len(questions)
+        expected = correct_answers
+    return AnswerKey(kind, digest, question_ids, expected, correct_answers)
+
+
+def compile_answer_key(kind, questions):
+    """Answer key for a questions list, reused while its ids and answers are unchanged"""
+    questions = questions or []
+    digest = _content_digest(kind, questions)
+    with _answer_keys_lock:
+        key = _answer_keys.get(digest)
+        if key is not None:
+            _answer_keys.move_to_end(digest)
+            return key
+    # Compiled outside the lock; a thread racing on the same questions builds an equal key
+    key = _compile(kind, digest, questions)
+    with _answer_keys_lock:
+        key = _answer_keys.setdefault(digest, key)
+        _answer_keys.move_to_end(digest)
+        while len(_answer_keys) > ANSWER_KEY_CACHE_SIZE:
+            _answer_keys.popitem(last=False)
+    return key
+
+
+def exam_answer_key(exam):
+    """Answer key for an ActiveExam"""
+    kind = 'multi_choice' if exam.exam_type == 'multi_choice' else 'coding'
+    return compile_answer_key(kind, exam.questions)
+
+
+def quiz_answer_key(lesson):
+    """Answer key for a Lesson's quiz"""
+    return compile_answer_key('quiz', lesson.quiz)
+
+
+def calculate_stars(score, total, points_value, abandoned=False):
+    """Stars for a graded submission; abandoned exams earn half"""
+    penalty = 0.5 if abandoned else 1.0
+    return int((score / total) * points_value * penalty) if total > 0 else 0
@@ -0,0 +1,164 @@
+"""
+DB-backed grading queue for coding exam submissions (no external broker).
+
+submit_exam saves coding submissions as 'pending' and returns at once. Worker
+threads started by `manage.py run_grading_worker` claim the oldest pending
+row with a conditional UPDATE, so each submission is graded by exactly one
+worker on any database. The code runs in the sandbox pool outside any
+transaction; the score, stars and exam stats are then written together.
+Claims older than GRADING_LEASE_SECONDS (a crashed worker) go back to the
+queue, and a submission is marked 'failed' after GRADING_MAX_ATTEMPTS.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import User
+
+from .code_runner import grade_coding_answers
+from .grading import calculate_stars, exam_answer_key
+from .models import ExamStats, ExamSubmission
+
+logger = logging.getLogger(__name__)
+
+GRADING_LEASE_SECONDS = 10 * 60
+GRADING_MAX_ATTEMPTS = 3
+
+# Pending rows looked at per claim; losing a race on one moves on to the next
+_CLAIM_CANDIDATES = 10
+
+
+def queue_position(submitted_at):
+    """How many pending submissions are ahead of one submitted at `submitted_at`"""
+    return ExamSubmission.objects.filter(grading_status='pending', submitted_at__lt=submitted_at).count()
+
+
+def claim_next():
+    """Claim the oldest pending submission: returns (id, claim time) or None if the queue is empty"""
+    candidates = list(
+        ExamSubmission.objects.filter(grading_status='pending')
+        .order_by('submitted_at', 'pk')
+        .values_list('pk', flat=True)[:_CLAIM_CANDIDATES]
+    )
+    for submission_id in candidates:
+        claimed_at = timezone.now()
+        claimed = ExamSubmission.objects.filter(pk=submission_id, grading_status='pending').update(
+            grading_status='grading',
+            grading_started_at=claimed_at,
+            grading_attempts=F('grading_attempts') + 1,
+        )
+        if claimed:
+            return submission_id, claimed_at
+    return None
+
+
+def release_stale_claims():
+    """Return claims held longer than the lease (the worker died) to the queue"""
+    cutoff = timezone.now() - timedelta(seconds=GRADING_LEASE_SECONDS)
+    return ExamSubmission.objects.filter(grading_status='grading', grading_started_at__lt=cutoff).update(
+        grading_status='pending'
+    )
+
+
+def grade_submission(submission_id, claimed_at):
+    """
+    Grade one claimed submission and award its stars. Returns False if the
+    claim was lost (released as stale and claimed again) before saving.
+    """
+    submission = ExamSubmission.objects.select_related('exam').get(pk=submission_id)
+    exam = submission.exam
+    answers = grade_coding_answers(exam.questions, submission.answers)
+
+    with transaction.atomic():
+        submission = ExamSubmission.objects.select_for_update().get(pk=submission_id)
+        if submission.grading_status != 'grading' or submission.grading_started_at != claimed_at:
+            return False
+
+        score, total = exam_answer_key(exam).score(answers)
+        stars_earned = calculate_stars(score, total, exam.points_value, submission.abandoned)
+        before = (submission.score, submission.abandoned, submission.answers, submission.grading_status)
+        # A regraded submission only moves the student's stars by the difference
+        star_change = stars_earned - (submission.stars_earned if submission.stars_credited else 0)
+
+        submission.answers = answers
+        submission.score = score
+        submission.total_questions = total
+        submission.stars_earned = stars_earned
+        submission.stars_credited = True
+        submission.grading_status = 'graded'
+        submission.save(update_fields=['answers', 'score', 'total_questions', 'stars_earned', 'stars_credited',
+                                       'grading_status'])
+
+        ExamStats.record(exam, before=before, after=(score, submission.abandoned, answers, 'graded'))
+        if star_change:
+            User.objects.filter(pk=submission.student_id).update(star_points=F('star_points') + star_change)
+    return True
+
+
+def _give_up_or_retry(submission_id, claimed_at):
+    """After a grading error: requeue the submission, or fail it once attempts run out"""
+    claim = ExamSubmission.objects.filter(pk=submission_id, grading_status='grading', grading_started_at=claimed_at)
+    claim.filter(grading_attempts__gte=GRADING_MAX_ATTEMPTS).update(grading_status='failed')
+    claim.update(grading_status='pending')
+
+
+def process_next():
+    """Claim and grade one submission; returns False when the queue is empty"""
+    claim = claim_next()
+    if claim is None:
+        return False
+    try:
+        grade_submission(*claim)
+    except Exception:
+        logger.exception("Grading submission %s failed", claim[0])
+        _give_up_or_retry(*claim)
+    return True
+
+
+def _worker_loop(stop_event, poll_interval, drain):
+    try:
+        while not stop_event.is_set():
+            close_old_connections()
+            if process_next():
+                continue
+            if drain:
+                return
+            stop_event.wait(poll_interval)
+    finally:
+        connection.close()
+
+
+def run_workers(threads=None, poll_interval=1.0, drain=False, stop_event=None):
+    """
+    Run grading worker threads until `stop_event` is set (or, with `drain`,
+    until the queue is empty). Stale claims are released while they run.
+    """
+    threads = threads or getattr(settings, 'GRADING_WORKER_THREADS', 4)
+    stop_event = stop_event or threading.Event()
+    release_stale_claims()
+    workers = [
+        threading.Thread(target=_worker_loop, args=(stop_event, poll_interval, drain),
+                         name=f'grading-worker-{index}', daemon=True)
+        for index in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    next_release = time.monotonic() + GRADING_LEASE_SECONDS / 10
+    try:
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=1)
+            if time.monotonic() >= next_release:
+                close_old_connections()
+                release_stale_claims()
+                next_release = time.monotonic() + GRADING_LEASE_SECONDS / 10
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join()
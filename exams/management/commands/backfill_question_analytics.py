@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exams.models import ExamStats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild exam statistics and per-question analytics from stored submission answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, nargs='*', dest='exam_ids',
+                            help='Only rebuild these exam ids (default: all exams)')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rebuilt = ExamStats.rebuild(options['exam_ids'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt stats for {rebuilt} exams in {elapsed:.2f}s'))
+        # Lesson quiz answers are not stored, so quiz analytics only accumulate from new submissions
+        self.stdout.write('Lesson quiz analytics start from new submissions (past quiz answers are not stored).')
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.models import ActiveExam
+from exams.regrade import REGRADE_BATCH_SIZE, regrade_exam, requeue_coding_exam
+
+
+class Command(BaseCommand):
+    help = 'Regrade all submissions of exams against their current answers and adjust students\' stars'
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_ids', type=int, nargs='+', help='Exam ids to regrade')
+        parser.add_argument('--batch-size', type=int, default=REGRADE_BATCH_SIZE,
+                            help=f'Submissions graded and updated per batch (default: {REGRADE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        exams = ActiveExam.objects.in_bulk(options['exam_ids'])
+        missing = sorted(set(options['exam_ids']) - set(exams))
+        if missing:
+            raise CommandError(f'Exam(s) not found: {", ".join(map(str, missing))}')
+
+        for exam_id in options['exam_ids']:
+            if exams[exam_id].exam_type == 'coding':
+                queued = requeue_coding_exam(exams[exam_id])
+                self.stdout.write(self.style.SUCCESS(
+                    f'✓ Exam {exam_id}: queued {queued} submissions for the grading workers'
+                ))
+                continue
+            start = time.perf_counter()
+            regraded, changed, star_change = regrade_exam(exams[exam_id], options['batch_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Exam {exam_id}: regraded {regraded} submissions, {changed} changed, '
+                f'{star_change:+d} stars in {elapsed:.2f}s'
+            ))
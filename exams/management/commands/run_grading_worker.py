@@ -0,0 +1,32 @@
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.code_runner import sandbox_error
+from exams.grading_queue import run_workers
+
+
+class Command(BaseCommand):
+    help = 'Grade queued coding exam submissions (runs until stopped, or until the queue is empty with --drain)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=getattr(settings, 'GRADING_WORKER_THREADS', 4),
+                            help='Submissions graded at the same time')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait before checking an empty queue again')
+        parser.add_argument('--drain', action='store_true',
+                            help='Exit once the queue is empty instead of waiting for new submissions')
+
+    def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
+        error = sandbox_error()
+        if error is not None:
+            # Grading without the sandbox would mark every submission wrong
+            raise CommandError(f'The {settings.CODE_RUNNER_SANDBOX} code sandbox is unavailable: {error}')
+        self.stdout.write(f'Grading worker started with {options["threads"]} threads')
+        try:
+            run_workers(options['threads'], options['poll_interval'], options['drain'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('✓ Grading worker stopped'))
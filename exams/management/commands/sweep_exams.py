@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from exams.timer import close_expired_attempts, end_expired_exams
+
+
+class Command(BaseCommand):
+    help = ('Close exam attempts that ran past their deadline (submitting their autosaved answers) '
+            'and mark exams past their end time as ended')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=int, default=0, metavar='SECONDS',
+                            help='Keep running and sweep every SECONDS (default: sweep once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            start = time.perf_counter()
+            # Attempts are closed first: those of an exam that just ended have its end_time as deadline
+            closed = close_expired_attempts()
+            ended = end_expired_exams()
+            elapsed = time.perf_counter() - start
+            if closed or ended or not options['every']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✓ Closed {closed} expired attempts and ended {ended} exams in {elapsed:.2f}s'
+                ))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_examsubmission_abandoned_examsubmission_entered_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examsubmission',
+            index=models.Index(fields=['exam', 'score'], name='submission_exam_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examsubmission',
+            index=models.Index(fields=['student', 'submitted_at'], name='submission_student_time_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_exam_stats(apps, schema_editor):
+    ExamSubmission = apps.get_model('exams', 'ExamSubmission')
+    ExamStats = apps.get_model('exams', 'ExamStats')
+
+    rows = {}
+    grouped = ExamSubmission.objects.values('exam_id', 'score').annotate(
+        count=models.Count('id'),
+        abandoned=models.Count('id', filter=models.Q(abandoned=True)),
+    )
+    for group in grouped:
+        stats = rows.setdefault(group['exam_id'], ExamStats(exam_id=group['exam_id'], score_histogram={}))
+        stats.submission_count += group['count']
+        stats.score_sum += group['score'] * group['count']
+        stats.abandoned_count += group['abandoned']
+        stats.score_histogram[str(group['score'])] = group['count']
+        stats.max_score = max(stats.max_score, group['score'])
+    ExamStats.objects.bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_examsubmission_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamStats',
+            fields=[
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='exams.activeexam')),
+                ('submission_count', models.IntegerField(default=0, help_text='Submission rows, including entries not yet submitted')),
+                ('score_sum', models.IntegerField(default=0)),
+                ('max_score', models.IntegerField(default=0)),
+                ('abandoned_count', models.IntegerField(default=0)),
+                ('score_histogram', models.JSONField(default=dict, help_text='Number of submissions per score, keyed by score')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Exam stats',
+            },
+        ),
+        migrations.RunPython(backfill_exam_stats, reverse_code=migrations.RunPython.noop),
+    ]
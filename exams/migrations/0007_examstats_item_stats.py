@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_examstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examstats',
+            name='item_stats',
+            field=models.JSONField(default=dict, help_text='Per-question attempts, correct count and answer distribution'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:44
+
+from django.db import migrations, models
+
+
+def split_blank_entries(apps, schema_editor):
+    """Move blank entry rows out of the score-0 histogram bucket into blank_count"""
+    ExamSubmission = apps.get_model('exams', 'ExamSubmission')
+    ExamStats = apps.get_model('exams', 'ExamStats')
+
+    blank = (ExamSubmission.objects.filter(score=0, abandoned=False, answers={})
+             .values('exam_id').annotate(count=models.Count('id')))
+    for row in blank:
+        stats = ExamStats.objects.filter(exam_id=row['exam_id']).first()
+        if stats is None:
+            continue
+        stats.blank_count = row['count']
+        remaining = stats.score_histogram.get('0', 0) - row['count']
+        if remaining > 0:
+            stats.score_histogram['0'] = remaining
+        else:
+            stats.score_histogram.pop('0', None)
+        stats.save(update_fields=['blank_count', 'score_histogram'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_examstats_item_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examstats',
+            name='blank_count',
+            field=models.IntegerField(default=0, help_text='Rows with nothing submitted yet, i.e. exam entries (score 0)'),
+        ),
+        migrations.AlterField(
+            model_name='examstats',
+            name='score_histogram',
+            field=models.JSONField(default=dict, help_text='Number of submissions per score, keyed by score (blank rows excluded)'),
+        ),
+        migrations.RunPython(split_blank_entries, reverse_code=migrations.RunPython.noop),
+    ]
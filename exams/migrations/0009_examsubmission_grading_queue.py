@@ -0,0 +1,34 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_examstats_blank_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsubmission',
+            name='grading_attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Grading runs started, including failed ones'),
+        ),
+        migrations.AddField(
+            model_name='examsubmission',
+            name='grading_started_at',
+            field=models.DateTimeField(blank=True, help_text='When a grading worker claimed the submission', null=True),
+        ),
+        migrations.AddField(
+            model_name='examsubmission',
+            name='grading_status',
+            field=models.CharField(choices=[('pending', 'Waiting to be graded'), ('grading', 'Being graded'), ('graded', 'Graded'), ('failed', 'Grading failed')], default='graded', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='examsubmission',
+            index=models.Index(fields=['grading_status', 'submitted_at'], name='submission_grading_queue_idx'),
+        ),
+    ]
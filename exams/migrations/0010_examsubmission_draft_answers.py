@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_examsubmission_grading_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsubmission',
+            name='draft_answers',
+            field=models.JSONField(blank=True, default=dict, help_text='Answers autosaved before submission'),
+        ),
+        migrations.AddField(
+            model_name='examsubmission',
+            name='draft_saved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-19 16:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0010_examsubmission_draft_answers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activeexam',
+            index=models.Index(fields=['is_ended', 'created_at'], name='exam_ended_created_idx'),
+        ),
+    ]
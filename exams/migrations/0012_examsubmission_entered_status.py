@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:15
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def mark_entries(apps, schema_editor):
+    """
+    Entries used to be told apart only by their blank score; give them the
+    'entered' status. Rows that were submitted empty are real scores of 0,
+    so their stats move from blank_count into the score histogram.
+    """
+    ExamSubmission = apps.get_model('exams', 'ExamSubmission')
+    ExamStats = apps.get_model('exams', 'ExamStats')
+
+    blank = ExamSubmission.objects.filter(score=0, abandoned=False, answers={}, grading_status='graded')
+    # Submitting records the time spent; an entry still has none
+    blank.filter(time_spent_seconds=0).update(grading_status='entered')
+
+    submitted_empty = blank.exclude(time_spent_seconds=0).values('exam_id').annotate(count=Count('id'))
+    for row in submitted_empty:
+        stats = ExamStats.objects.filter(exam_id=row['exam_id']).first()
+        if stats is None:
+            continue
+        stats.blank_count = max(0, stats.blank_count - row['count'])
+        stats.score_histogram['0'] = stats.score_histogram.get('0', 0) + row['count']
+        stats.save(update_fields=['blank_count', 'score_histogram'])
+
+
+def unmark_entries(apps, schema_editor):
+    ExamSubmission = apps.get_model('exams', 'ExamSubmission')
+    ExamSubmission.objects.filter(grading_status='entered').update(grading_status='graded')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0011_activeexam_ended_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='examsubmission',
+            name='grading_status',
+            field=models.CharField(choices=[('entered', 'Entered, not submitted yet'), ('pending', 'Waiting to be graded'), ('grading', 'Being graded'), ('graded', 'Graded'), ('failed', 'Grading failed')], default='graded', max_length=10),
+        ),
+        migrations.RunPython(mark_entries, reverse_code=unmark_entries),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:17
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def mark_credited(apps, schema_editor):
+    """
+    Mark the graded rows whose stars are known to be in star_points: those
+    with no stars, and those scored by the grading workers. Submitting an
+    entered exam used to skip the award, so other rows stay uncredited and
+    regrading leaves the student's stars alone for them.
+    """
+    ExamSubmission = apps.get_model('exams', 'ExamSubmission')
+    ExamSubmission.objects.filter(grading_status='graded').filter(
+        Q(stars_earned=0) | Q(grading_attempts__gt=0)
+    ).update(stars_credited=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0012_examsubmission_entered_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examsubmission',
+            name='stars_credited',
+            field=models.BooleanField(default=False, help_text="stars_earned has been added to the student's star_points"),
+        ),
+        migrations.RunPython(mark_credited, reverse_code=migrations.RunPython.noop),
+    ]
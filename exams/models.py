@@ -1,7 +1,22 @@
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
 
+class ActiveExamQuerySet(models.QuerySet):
+    def open(self, now=None):
+        """
+        Exams currently running, i.e. the query form of ActiveExam.is_active().
+        `manage.py sweep_exams` flips exams past end_time to is_ended, so the
+        indexed is_ended flag narrows this to the few live exams.
+        """
+        now = now or timezone.now()
+        return self.filter(is_ended=False).filter(
+            Q(start_time__isnull=True) | Q(start_time__lte=now),
+            Q(end_time__isnull=True) | Q(end_time__gte=now),
+        )
+
+
 class ActiveExam(models.Model):
     EXAM_TYPE_CHOICES = [
         ('multi_choice', 'Multiple Choice Test'),
@@ -31,6 +46,14 @@ class ActiveExam(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
+    objects = ActiveExamQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Dashboards: exams not ended yet, newest first
+            models.Index(fields=['is_ended', 'created_at'], name='exam_ended_created_idx'),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -66,13 +89,28 @@ class ActiveExam(models.Model):
         # Check if student's class is in allowed classes
         return student.student_class in self.allowed_classes
 
+class ExamSubmissionQuerySet(models.QuerySet):
+    def in_progress(self):
+        """Entered but not yet submitted: the placeholder rows exam_entry creates"""
+        return self.filter(grading_status='entered')
+
+
 class ExamSubmission(models.Model):
+    GRADING_STATUS_CHOICES = [
+        ('entered', 'Entered, not submitted yet'),
+        ('pending', 'Waiting to be graded'),
+        ('grading', 'Being graded'),
+        ('graded', 'Graded'),
+        ('failed', 'Grading failed'),
+    ]
+    
     exam = models.ForeignKey(ActiveExam, on_delete=models.CASCADE, related_name='submissions')
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='exam_submissions')
     answers = models.JSONField(default=dict, help_text="Student's answers")
     score = models.IntegerField(default=0, help_text="Number of correct answers")
     total_questions = models.IntegerField(default=0, help_text="Total number of questions")
     stars_earned = models.IntegerField(default=0, help_text="Stars earned based on score")
+    stars_credited = models.BooleanField(default=False, help_text="stars_earned has been added to the student's star_points")
     submitted_at = models.DateTimeField(auto_now_add=True)
     
     # Exam lockdown tracking
@@ -80,8 +118,174 @@ class ExamSubmission(models.Model):
     abandoned = models.BooleanField(default=False, help_text="True if student abandoned the exam (navigated away)")
     time_spent_seconds = models.IntegerField(default=0, help_text="Time spent on exam in seconds")
     
+    # Entries are 'entered' until submitted; coding submissions then wait as 'pending'
+    # until a grading worker scores them
+    grading_status = models.CharField(max_length=10, choices=GRADING_STATUS_CHOICES, default='graded')
+    grading_started_at = models.DateTimeField(null=True, blank=True, help_text="When a grading worker claimed the submission")
+    grading_attempts = models.PositiveSmallIntegerField(default=0, help_text="Grading runs started, including failed ones")
+    
+    # Autosaved answers while the exam is in progress (written behind by exams.autosave)
+    draft_answers = models.JSONField(default=dict, blank=True, help_text="Answers autosaved before submission")
+    draft_saved_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = ExamSubmissionQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['exam', 'student']  # Each student can only submit once per exam
+        indexes = [
+            # Per-exam rank: count of submissions with a higher score
+            models.Index(fields=['exam', 'score'], name='submission_exam_score_idx'),
+            # A student's exam history, newest first
+            models.Index(fields=['student', 'submitted_at'], name='submission_student_time_idx'),
+            # Grading queue: oldest pending submission first
+            models.Index(fields=['grading_status', 'submitted_at'], name='submission_grading_queue_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.student.username} - {self.exam.title}: {self.score}/{self.total_questions}"
\ No newline at end of file
+        return f"{self.student.username} - {self.exam.title}: {self.score}/{self.total_questions}"
+    
+    @property
+    def is_grading(self):
+        return self.grading_status in ('pending', 'grading')
+
+class ExamStats(models.Model):
+    """
+    Denormalized per-exam aggregates, so result pages and teacher dashboards
+    read one row instead of aggregating every submission. Kept current by
+    ExamStats.record() in the same transaction as each submission write.
+    """
+    exam = models.OneToOneField(ActiveExam, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    submission_count = models.IntegerField(default=0, help_text="Submission rows, including entries not yet submitted")
+    score_sum = models.IntegerField(default=0)
+    max_score = models.IntegerField(default=0)
+    abandoned_count = models.IntegerField(default=0)
+    score_histogram = models.JSONField(default=dict, help_text="Number of submissions per score, keyed by score (blank rows excluded)")
+    blank_count = models.IntegerField(default=0, help_text="Rows with nothing submitted yet, i.e. exam entries (score 0)")
+    item_stats = models.JSONField(default=dict, help_text="Per-question attempts, correct count and answer distribution")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Exam stats"
+
+    def __str__(self):
+        return f"Stats for {self.exam_id}: {self.submission_count} submissions"
+
+    @property
+    def mean_score(self):
+        return self.score_sum / self.submission_count if self.submission_count else 0
+
+    @property
+    def score_counts(self):
+        """Score histogram with blank entries counted as score 0"""
+        counts = dict(self.score_histogram)
+        if self.blank_count:
+            counts['0'] = counts.get('0', 0) + self.blank_count
+        return counts
+
+    @staticmethod
+    def _is_blank(grading_status, answers):
+        # Entries not submitted yet are counted in blank_count, so recording an entry is
+        # a single UPDATE rather than a locked JSON rewrite. A submitted empty answer
+        # sheet is a real score of 0.
+        return grading_status == 'entered' and not answers
+
+    @classmethod
+    def for_exam(cls, exam):
+        """Stats row for reading (all zeros if nobody has entered the exam yet)"""
+        return cls.objects.filter(exam=exam).first() or cls(exam=exam)
+
+    @classmethod
+    def record(cls, exam, before=None, after=None):
+        """
+        Apply one submission write to the exam's stats. `before` and `after` are
+        the row's (score, abandoned, answers, grading_status) before and after the write, None
+        when the row didn't exist / no longer exists. Must run inside the
+        transaction that writes the submission; the stats row is locked until
+        it commits.
+        """
+        from .analytics import apply_item_results, grade_exam_items
+
+        stats, _ = cls.objects.select_for_update().get_or_create(exam=exam)
+        histogram = stats.score_histogram
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            score, abandoned, answers, grading_status = state
+            stats.submission_count += sign
+            if cls._is_blank(grading_status, answers):
+                stats.blank_count += sign
+                continue
+            stats.score_sum += sign * score
+            stats.abandoned_count += sign * int(bool(abandoned))
+            key = str(score)
+            histogram[key] = histogram.get(key, 0) + sign
+            if histogram[key] <= 0:
+                del histogram[key]
+            apply_item_results(stats.item_stats, grade_exam_items(exam, answers or {}), sign)
+        stats.max_score = max((int(key) for key in histogram), default=0)
+        stats.save()
+        return stats
+
+    @classmethod
+    def record_entry(cls, exam_id):
+        """Count one new blank entry with an atomic UPDATE; no lock is held beyond the statement"""
+        updates = {
+            'submission_count': models.F('submission_count') + 1,
+            'blank_count': models.F('blank_count') + 1,
+            'updated_at': timezone.now(),
+        }
+        if not cls.objects.filter(exam_id=exam_id).update(**updates):
+            cls.objects.get_or_create(exam_id=exam_id)
+            cls.objects.filter(exam_id=exam_id).update(**updates)
+
+    @classmethod
+    def rebuild(cls, exam_ids=None):
+        """
+        Recompute stats, including item stats, from the submissions table
+        (all exams, or just `exam_ids`) in one streamed pass.
+        """
+        from .analytics import apply_item_results
+        from .grading import exam_answer_key
+
+        submissions = ExamSubmission.objects.all()
+        exams = ActiveExam.objects.only('id', 'exam_type', 'questions')
+        if exam_ids is not None:
+            submissions = submissions.filter(exam_id__in=exam_ids)
+            exams = exams.filter(id__in=exam_ids)
+        # One compiled answer key per exam grades all of its submissions
+        answer_keys = {exam_id: exam_answer_key(exam) for exam_id, exam in exams.in_bulk().items()}
+
+        rows = {}
+        values = submissions.values_list('exam_id', 'score', 'abandoned', 'answers', 'grading_status')
+        for exam_id, score, abandoned, answers, grading_status in values.iterator(chunk_size=2000):
+            stats = rows.get(exam_id)
+            if stats is None:
+                stats = rows[exam_id] = cls(exam_id=exam_id)
+            stats.submission_count += 1
+            if cls._is_blank(grading_status, answers):
+                stats.blank_count += 1
+                continue
+            stats.score_sum += score
+            stats.abandoned_count += int(abandoned)
+            key = str(score)
+            stats.score_histogram[key] = stats.score_histogram.get(key, 0) + 1
+            stats.max_score = max(stats.max_score, score)
+            apply_item_results(stats.item_stats, answer_keys[exam_id].items(answers or {}))
+
+        with transaction.atomic():
+            stale = cls.objects.all() if exam_ids is None else cls.objects.filter(exam_id__in=exam_ids)
+            stale.exclude(exam_id__in=list(rows)).delete()
+            cls.objects.bulk_create(
+                rows.values(),
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['exam'],
+                update_fields=['submission_count', 'score_sum', 'max_score', 'abandoned_count',
+                               'score_histogram', 'blank_count', 'item_stats', 'updated_at'],
+            )
+        return len(rows)
+
+    def item_analysis(self):
+        """Per-question rows for the results page, most-missed first"""
+        from .analytics import exam_item_analysis
+        return exam_item_analysis(self.exam, self.item_stats)
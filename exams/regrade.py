@@ -0,0 +1,101 @@
+"""
+Bulk regrading of exam submissions, used after a teacher fixes an answer key.
+
+Multiple-choice submissions are rescored here. Coding submissions are put
+back in the grading queue, so the grading workers run the stored code
+against the exam's current test cases.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from users.models import User
+
+from .grading import calculate_stars, exam_answer_key
+from .models import ExamStats, ExamSubmission
+
+
+REGRADE_BATCH_SIZE = 500
+
+
+def _regrade_batch(exam, answer_key, batch, star_deltas):
+    """Regrade and save one batch of submissions; returns how many changed"""
+    scores = answer_key.score_many(submission.answers for submission in batch)
+    changed = []
+    for submission, score in zip(batch, scores):
+        stars = calculate_stars(score, answer_key.total, exam.points_value, submission.abandoned)
+        if (score, stars, answer_key.total) == (submission.score, submission.stars_earned,
+                                                 submission.total_questions):
+            continue
+        if submission.stars_credited:
+            # Stars that never reached star_points aren't taken back (or added) here
+            star_deltas[submission.student_id] += stars - submission.stars_earned
+        submission.score = score
+        submission.stars_earned = stars
+        submission.total_questions = answer_key.total
+        changed.append(submission)
+    ExamSubmission.objects.bulk_update(changed, ['score', 'stars_earned', 'total_questions'])
+    return len(changed)
+
+
+def requeue_coding_exam(exam):
+    """
+    Queue every graded or failed submission of a coding exam for the grading
+    workers, which rerun the code and move the student's stars by the
+    difference. Returns the number of submissions queued.
+    """
+    return ExamSubmission.objects.filter(exam=exam, grading_status__in=['graded', 'failed']).update(
+        grading_status='pending', grading_attempts=0, grading_started_at=None,
+    )
+
+
+def regrade_exam(exam, batch_size=REGRADE_BATCH_SIZE):
+    """
+    Regrade every submitted multiple-choice answer sheet of `exam` against
+    its current answer key. Changed scores and stars are bulk-updated batch
+    by batch, each affected student's star_points moves by their change in
+    credited stars with one F() update, and the exam's stats are rebuilt,
+    all in one transaction.
+    Returns (submissions regraded, submissions changed, net star change).
+    """
+    if exam.exam_type == 'coding':
+        raise ValueError('Coding exams are regraded by the grading workers; use requeue_coding_exam()')
+    answer_key = exam_answer_key(exam)
+    star_deltas = defaultdict(int)
+    regraded = changed = 0
+
+    with transaction.atomic():
+        # Row locks keep a concurrent submit from being overwritten with a stale grade
+        submissions = (
+            ExamSubmission.objects.filter(exam=exam, grading_status='graded')
+            .select_for_update()
+            .only('id', 'student_id', 'answers', 'abandoned', 'score', 'total_questions', 'stars_earned',
+                  'stars_credited')
+            .order_by('pk')
+        )
+        batch = []
+        for submission in submissions.iterator(chunk_size=batch_size):
+            batch.append(submission)
+            if len(batch) == batch_size:
+                changed += _regrade_batch(exam, answer_key, batch, star_deltas)
+                regraded += len(batch)
+                batch = []
+        if batch:
+            changed += _regrade_batch(exam, answer_key, batch, star_deltas)
+            regraded += len(batch)
+
+        # Students whose stars moved by the same amount share one UPDATE
+        students_by_delta = defaultdict(list)
+        for student_id, delta in star_deltas.items():
+            if delta:
+                students_by_delta[delta].append(student_id)
+        for delta, student_ids in students_by_delta.items():
+            for start in range(0, len(student_ids), batch_size):
+                User.objects.filter(pk__in=student_ids[start:start + batch_size]).update(
+                    star_points=F('star_points') + delta
+                )
+
+        ExamStats.rebuild([exam.id])
+
+    return regraded, changed, sum(star_deltas.values())
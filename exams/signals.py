@@ -0,0 +1,14 @@
+"""
+Signal handlers that keep exam-derived caches in sync with the database
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .exam_cache import invalidate_exam_meta
+from .models import ActiveExam
+
+
+@receiver(post_save, sender=ActiveExam)
+@receiver(post_delete, sender=ActiveExam)
+def exam_changed(sender, instance, **kwargs):
+    invalidate_exam_meta(instance.id)
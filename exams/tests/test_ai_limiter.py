@@ -0,0 +1,103 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from openai import RateLimitError
+
+from exams.ai_converter import AIServiceBusyError, ExamAIConverter, RateLimiter
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def rate_limit_error():
+    request = httpx.Request('POST', 'https://api.openai.com/v1/chat/completions')
+    return RateLimitError('Rate limit reached', response=httpx.Response(429, request=request), body=None)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RateLimiterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limiters_share_their_buckets_through_the_cache(self):
+        # Two instances stand in for two worker processes
+        first = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, max_wait=0)
+        second = RateLimiter(requests_per_minute=2, tokens_per_minute=1000, max_wait=0)
+
+        first.acquire(10)
+        second.acquire(10)
+        with self.assertRaises(AIServiceBusyError):
+            first.acquire(10)
+
+    def test_tokens_are_limited_too(self):
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=600, max_wait=0)
+
+        limiter.acquire(500)
+        with self.assertRaises(AIServiceBusyError):
+            limiter.acquire(500)
+
+        # A refund of the unused estimate frees the tokens for the next caller
+        limiter.adjust_tokens(-400)
+        limiter.acquire(500)
+
+    def test_waits_when_the_deadline_allows(self):
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1000, max_wait=5)
+        limiter.acquire(10)
+        limiter._update(lambda requests, tokens: (0.0, tokens, None))
+
+        with mock.patch('exams.ai_converter.time.sleep') as sleep:
+            sleep.side_effect = lambda seconds: limiter._update(lambda requests, tokens: (1.0, tokens, None))
+            waited = limiter.acquire(10)
+
+        sleep.assert_called_once()
+        self.assertLessEqual(sleep.call_args.args[0], RateLimiter.POLL_SECONDS)
+        self.assertGreaterEqual(waited, 0)
+
+    def test_gives_up_without_waiting_past_the_deadline(self):
+        limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=1000, max_wait=90)
+        limiter.acquire(10)
+
+        with mock.patch('exams.ai_converter.time.sleep') as sleep:
+            with self.assertRaises(AIServiceBusyError):
+                limiter.acquire(10, deadline=time.monotonic() + 5)
+
+        # The next request is a minute away, so it doesn't queue at all
+        sleep.assert_not_called()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ChatRetryTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = mock.Mock()
+        self.converter = ExamAIConverter(client=self.client)
+        self.converter.limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=100000, max_wait=10)
+
+    def chat(self):
+        return self.converter._chat_with_retries([{'role': 'user', 'content': 'Make a quiz'}], 0.2)
+
+    def test_rate_limit_is_retried(self):
+        response = SimpleNamespace(
+            usage=SimpleNamespace(total_tokens=100),
+            choices=[SimpleNamespace(message=SimpleNamespace(content='{"questions": []}'))],
+        )
+        self.client.chat.completions.create.side_effect = [rate_limit_error(), response]
+
+        with mock.patch('exams.ai_converter.time.sleep'):
+            self.assertEqual(self.chat(), '{"questions": []}')
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
+
+    def test_backoff_past_the_deadline_raises_busy(self):
+        self.client.chat.completions.create.side_effect = rate_limit_error()
+
+        with mock.patch('exams.ai_converter.random.uniform', return_value=30.0), \
+                mock.patch('exams.ai_converter.time.sleep') as sleep:
+            with self.assertRaises(AIServiceBusyError):
+                self.chat()
+
+        sleep.assert_not_called()
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
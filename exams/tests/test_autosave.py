@@ -0,0 +1,100 @@
+import json
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from exams.autosave import AUTOSAVE_FLUSH_SECONDS, _buffer_key, get_draft_answers, save_answers
+from exams.models import ActiveExam, ExamSubmission
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+# Pages render without collectstatic or Cloudinary credentials
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, STORAGES=TEST_STORAGES)
+class AutosaveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate('en')
+        self.addCleanup(translation.deactivate)
+        teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.student = User.objects.create_user('student', password='x')
+        self.exam = ActiveExam.objects.create(
+            title='Quiz', teacher=teacher, exam_type='multi_choice',
+            questions=[{'id': i, 'question': f'Q{i}', 'options': ['A', 'B'], 'correct_answer': 0}
+                       for i in range(1, 201)],
+        )
+        self.client.force_login(self.student)
+        self.client.post(reverse('exam_entry', args=[self.exam.id]))
+        self.submission = ExamSubmission.objects.get(exam=self.exam, student=self.student)
+
+    def age_buffer(self):
+        key = _buffer_key(self.exam.id, self.student.id)
+        buffer = cache.get(key)
+        buffer['since'] -= AUTOSAVE_FLUSH_SECONDS + 1
+        cache.set(key, buffer)
+
+    def test_concurrent_deltas_are_all_kept(self):
+        def autosave(thread):
+            for question in range(20):
+                save_answers(self.exam.id, self.student.id, {f'{thread * 20 + question + 1}': 1})
+
+        threads = [threading.Thread(target=autosave, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(get_draft_answers(self.submission)), 160)
+
+    def test_heartbeat_flushes_a_due_buffer(self):
+        self.client.post(reverse('autosave_exam', args=[self.exam.id]),
+                         json.dumps({'answers': {'1': 1}}), content_type='application/json')
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.draft_answers, {})
+
+        self.age_buffer()
+        self.client.get(reverse('exam_heartbeat', args=[self.exam.id]))
+
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.draft_answers, {'1': 1})
+        self.assertIsNone(cache.get(_buffer_key(self.exam.id, self.student.id)))
+
+    def test_autosave_needs_an_attempt_in_progress(self):
+        url = reverse('autosave_exam', args=[self.exam.id])
+        ExamSubmission.objects.filter(pk=self.submission.pk).update(grading_status='graded')
+
+        response = self.client.post(url, json.dumps({'answers': {'1': 1}}), content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(cache.get(_buffer_key(self.exam.id, self.student.id)))
+
+        self.client.force_login(User.objects.create_user('outsider', password='x'))
+        response = self.client.post(url, json.dumps({'answers': {'1': 1}}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_reloaded_exam_page_gets_the_drafts_back(self):
+        ExamSubmission.objects.filter(pk=self.submission.pk).update(draft_answers={'1': 1})
+        save_answers(self.exam.id, self.student.id, {'2': 0})
+
+        response = self.client.get(reverse('exam_detail', args=[self.exam.id]))
+
+        self.assertTemplateUsed(response, 'exams/exam_detail.html')
+        self.assertEqual(response.context['draft_answers'], {'1': 1, '2': 0})
+        self.assertContains(response, 'id="exam-draft-answers"')
+
+    def test_submitted_exam_is_not_resumed(self):
+        self.client.post(reverse('submit_exam', args=[self.exam.id]),
+                         json.dumps({'answers': {'1': 0}}), content_type='application/json')
+
+        response = self.client.get(reverse('exam_detail', args=[self.exam.id]))
+
+        self.assertTemplateUsed(response, 'exams/exam_already_submitted.html')
@@ -0,0 +1,71 @@
+import shutil
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from exams import code_runner
+from exams.code_runner import SandboxUnavailable, run_python, run_test_cases
+
+
+class SandboxCacheMixin:
+    def setUp(self):
+        super().setUp()
+        code_runner._check_sandbox.cache_clear()
+        self.addCleanup(code_runner._check_sandbox.cache_clear)
+
+
+@override_settings(CODE_RUNNER_SANDBOX='none', CODE_RUNNER_TIMEOUT_SECONDS=1, CODE_RUNNER_MAX_OUTPUT_KB=4)
+class RunnerLimitsTests(SandboxCacheMixin, SimpleTestCase):
+    def test_reads_stdin_and_returns_stdout(self):
+        self.assertEqual(run_python('print(int(input()) * 2)', '21'), ('42\n', None, False))
+
+    def test_error_reports_last_line_of_traceback(self):
+        result = run_python('raise ValueError("bad input")')
+        self.assertEqual(result.error, 'ValueError: bad input')
+        self.assertFalse(result.timed_out)
+
+    def test_endless_loop_hits_the_time_limit(self):
+        result = run_python('while True:\n    pass')
+        self.assertTrue(result.timed_out)
+        self.assertEqual(result.error, 'Time limit exceeded (1s)')
+
+    def test_output_is_capped(self):
+        result = run_python('import sys\nwhile True:\n    sys.stdout.write("x" * 1024)')
+        self.assertFalse(result.timed_out)
+        self.assertIsNotNone(result.error)
+        self.assertLessEqual(len(result.output), 4 * 1024)
+
+    def test_overlong_code_is_not_run(self):
+        result = run_python('#' * (code_runner.MAX_CODE_LENGTH + 1))
+        self.assertEqual(result.error, 'Code is too long')
+
+    def test_run_test_cases_keeps_test_order(self):
+        results = run_test_cases('print(input())', [{'input': str(n), 'expected': str(n)} for n in range(6)])
+        self.assertEqual([result['actual'] for result in results], [str(n) for n in range(6)])
+        self.assertTrue(all(result['passed'] for result in results))
+
+
+@override_settings(CODE_RUNNER_SANDBOX='bwrap')
+class SandboxTests(SandboxCacheMixin, SimpleTestCase):
+    def test_code_is_not_run_without_bwrap(self):
+        with mock.patch('exams.code_runner.shutil.which', return_value=None), \
+                self.assertLogs('exams.code_runner', 'ERROR'), self.assertRaises(SandboxUnavailable):
+            run_python('print(1)')
+
+    @override_settings(CODE_RUNNER_SANDBOX='chroot')
+    def test_unknown_sandbox_is_refused(self):
+        with self.assertLogs('exams.code_runner', 'ERROR'), self.assertRaises(SandboxUnavailable):
+            run_python('print(1)')
+
+    def test_project_tree_and_network_are_out_of_reach(self):
+        if shutil.which('bwrap') is None or code_runner.sandbox_error() is not None:
+            self.skipTest('bubblewrap sandbox not available on this host')
+        probe = (
+            'import os, socket\n'
+            f'print(os.path.exists({code_runner.__file__!r}), os.getuid())\n'
+            'try:\n'
+            '    socket.create_connection(("1.1.1.1", 53), timeout=1)\n'
+            'except OSError:\n'
+            '    print("offline")\n'
+        )
+        self.assertEqual(run_python(probe).output.split(), ['False', str(code_runner.SANDBOX_UID), 'offline'])
@@ -0,0 +1,151 @@
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+STATS_FIELDS = ('submission_count', 'score_sum', 'max_score', 'abandoned_count',
+                'score_histogram', 'blank_count', 'item_stats')
+
+
+def multi_choice_questions(correct_answers):
+    return [
+        {'id': i, 'question': f'Question {i}', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': answer}
+        for i, answer in enumerate(correct_answers, start=1)
+    ]
+
+
+def stats_values(exam_id):
+    return ExamStats.objects.filter(exam_id=exam_id).values(*STATS_FIELDS).get()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExamStatsRecordTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.exam = ActiveExam.objects.create(
+            title='Quiz', teacher=teacher, exam_type='multi_choice', questions=multi_choice_questions([0, 1]),
+        )
+
+    def state(self, submission):
+        return (submission.score, submission.abandoned, submission.answers, submission.grading_status)
+
+    def enter(self, username):
+        submission = ExamSubmission.objects.create(
+            exam=self.exam, student=User.objects.create_user(username, password='x'),
+            total_questions=2, grading_status='entered',
+        )
+        ExamStats.record_entry(self.exam.id)
+        return submission
+
+    def write(self, submission, **changes):
+        with transaction.atomic():
+            before = self.state(submission)
+            for field, value in changes.items():
+                setattr(submission, field, value)
+            submission.save()
+            ExamStats.record(self.exam, before=before, after=self.state(submission))
+
+    def test_entries_are_blank_until_submitted(self):
+        self.enter('a')
+        submitted = self.enter('b')
+        self.write(submitted, answers={'1': 0, '2': 0}, score=1, grading_status='graded')
+
+        stats = ExamStats.for_exam(self.exam)
+        self.assertEqual((stats.submission_count, stats.blank_count, stats.score_sum), (2, 1, 1))
+        self.assertEqual(stats.score_histogram, {'1': 1})
+        self.assertEqual(stats.score_counts, {'0': 1, '1': 1})
+        self.assertEqual(stats.mean_score, 0.5)
+
+    def test_submitted_empty_sheet_is_a_score_of_zero(self):
+        submission = self.enter('a')
+        self.write(submission, grading_status='graded', abandoned=True)
+
+        stats = ExamStats.for_exam(self.exam)
+        self.assertEqual((stats.blank_count, stats.abandoned_count), (0, 1))
+        self.assertEqual(stats.score_histogram, {'0': 1})
+
+    def test_recorded_writes_match_a_rebuild(self):
+        self.enter('a')
+        best = self.enter('b')
+        self.write(best, answers={'1': 0, '2': 1}, score=2, grading_status='graded')
+        regraded = self.enter('c')
+        self.write(regraded, answers={'1': 0, '2': 0}, score=1, grading_status='graded')
+        self.write(regraded, score=0, abandoned=True)
+        removed = self.enter('d')
+        self.write(removed, answers={'1': 3}, score=0, grading_status='graded')
+        with transaction.atomic():
+            ExamStats.record(self.exam, before=self.state(removed))
+            removed.delete()
+
+        recorded = stats_values(self.exam.id)
+        self.assertEqual(recorded['max_score'], 2)
+        self.assertEqual(recorded['score_histogram'], {'0': 1, '2': 1})
+
+        ExamStats.rebuild([self.exam.id])
+        self.assertEqual(stats_values(self.exam.id), recorded)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExamStatsMigrationTests(TransactionTestCase):
+    """The backfills in 0006, 0008 and 0012 leave the stats a rebuild would compute"""
+
+    def migrate(self, target=None):
+        """Migrate exams to `target` (the latest migration by default); returns the historical apps"""
+        executor = MigrationExecutor(connection)
+        latest = executor.loader.graph.leaf_nodes()
+        nodes = [node if node[0] != 'exams' or target is None else ('exams', target) for node in latest]
+        executor.migrate(nodes)
+        return executor.loader.project_state(nodes).apps
+
+    def tearDown(self):
+        self.migrate()
+
+    def test_backfills(self):
+        apps = self.migrate('0005_examsubmission_indexes')
+        Exam = apps.get_model('exams', 'ActiveExam')
+        Submission = apps.get_model('exams', 'ExamSubmission')
+        teacher = apps.get_model('users', 'User').objects.create(username='teacher', role='teacher')
+        exam = Exam.objects.create(title='Quiz', teacher=teacher, exam_type='multi_choice',
+                                   questions=multi_choice_questions([0, 1]))
+
+        def submission(username, **fields):
+            student = apps.get_model('users', 'User').objects.create(username=username)
+            Submission.objects.create(exam=exam, student=student, total_questions=2, **fields)
+
+        submission('entry')
+        submission('empty', time_spent_seconds=40)
+        submission('zero', answers={'1': 3, '2': 3}, time_spent_seconds=50)
+        submission('one', answers={'1': 0, '2': 0}, score=1, time_spent_seconds=60, abandoned=True)
+        submission('two', answers={'1': 0, '2': 1}, score=2, time_spent_seconds=70)
+
+        apps = self.migrate('0006_examstats')
+        stats = apps.get_model('exams', 'ExamStats').objects.get(exam_id=exam.id)
+        self.assertEqual((stats.submission_count, stats.score_sum, stats.max_score, stats.abandoned_count),
+                         (5, 3, 2, 1))
+        self.assertEqual(stats.score_histogram, {'0': 3, '1': 1, '2': 1})
+
+        # Both blank rows look like entries until 0012 can tell them apart
+        apps = self.migrate('0008_examstats_blank_count')
+        stats = apps.get_model('exams', 'ExamStats').objects.get(exam_id=exam.id)
+        self.assertEqual(stats.blank_count, 2)
+        self.assertEqual(stats.score_histogram, {'0': 1, '1': 1, '2': 1})
+
+        apps = self.migrate('0012_examsubmission_entered_status')
+        stats = apps.get_model('exams', 'ExamStats').objects.get(exam_id=exam.id)
+        self.assertEqual(stats.blank_count, 1)
+        self.assertEqual(stats.score_histogram, {'0': 2, '1': 1, '2': 1})
+        statuses = dict(apps.get_model('exams', 'ExamSubmission').objects.values_list('student__username', 'grading_status'))
+        self.assertEqual(statuses['entry'], 'entered')
+        self.assertEqual(statuses['empty'], 'graded')
+        migrated = {field: getattr(stats, field) for field in STATS_FIELDS if field != 'item_stats'}
+
+        self.migrate()
+        ExamStats.rebuild([exam.id])
+        rebuilt = stats_values(exam.id)
+        del rebuilt['item_stats']
+        self.assertEqual(rebuilt, migrated)
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from exams import code_runner
+from exams.grading_queue import (
+    GRADING_LEASE_SECONDS, GRADING_MAX_ATTEMPTS, claim_next, grade_submission, process_next, release_stale_claims,
+)
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+DOUBLE_IT = [{
+    'id': 1, 'title': 'Double', 'description': 'Print twice the input.',
+    'test_cases': [{'input': '2', 'expected': '4'}],
+    'hidden_test_cases': [{'input': '5', 'expected': '10'}],
+}]
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CODE_RUNNER_SANDBOX='none')
+class GradingQueueTests(TestCase):
+    def setUp(self):
+        code_runner._check_sandbox.cache_clear()
+        self.addCleanup(code_runner._check_sandbox.cache_clear)
+        self.teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.exam = ActiveExam.objects.create(
+            title='Coding', teacher=self.teacher, exam_type='coding', questions=DOUBLE_IT, points_value=10,
+        )
+
+    def queue(self, username, code='print(int(input()) * 2)', minutes_ago=0):
+        student = User.objects.create_user(username, password='x')
+        submission = ExamSubmission.objects.create(
+            exam=self.exam, student=student, answers={'1': {'code': code}}, total_questions=1,
+            grading_status='pending', time_spent_seconds=60,
+        )
+        ExamSubmission.objects.filter(pk=submission.pk).update(
+            submitted_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+        return submission
+
+    def test_claims_oldest_pending_submission_once(self):
+        newer = self.queue('newer', minutes_ago=1)
+        older = self.queue('older', minutes_ago=5)
+
+        first, second = claim_next(), claim_next()
+
+        self.assertEqual([first[0], second[0]], [older.pk, newer.pk])
+        self.assertIsNone(claim_next())
+        older.refresh_from_db()
+        self.assertEqual((older.grading_status, older.grading_attempts), ('grading', 1))
+        self.assertEqual(older.grading_started_at, first[1])
+
+    def test_claim_lost_to_another_worker_is_skipped(self):
+        taken = self.queue('taken', minutes_ago=5)
+        free = self.queue('free', minutes_ago=1)
+        real_filter = ExamSubmission.objects.filter
+
+        def claim_race(*args, **kwargs):
+            # Another worker claims `taken` between the candidate SELECT and our UPDATE
+            if kwargs.get('pk') == taken.pk and kwargs.get('grading_status') == 'pending':
+                real_filter(pk=taken.pk).update(grading_status='grading')
+            return real_filter(*args, **kwargs)
+
+        with mock.patch.object(ExamSubmission.objects, 'filter', side_effect=claim_race):
+            claimed = claim_next()
+
+        self.assertEqual(claimed[0], free.pk)
+
+    def test_grades_submission_and_credits_stars(self):
+        submission = self.queue('student')
+
+        self.assertTrue(process_next())
+
+        submission.refresh_from_db()
+        self.assertEqual((submission.grading_status, submission.score, submission.stars_earned), ('graded', 1, 10))
+        self.assertTrue(submission.stars_credited)
+        self.assertTrue(submission.answers['1']['passed'])
+        self.assertEqual(User.objects.get(pk=submission.student_id).star_points, 10)
+        self.assertEqual(ExamStats.objects.get(exam=self.exam).score_histogram, {'1': 1})
+
+    def test_hidden_test_cases_count(self):
+        submission = self.queue('hardcoded', code='print(4)')
+
+        process_next()
+
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.stars_earned), (0, 0))
+        self.assertFalse(submission.answers['1']['passed'])
+
+    def test_regrading_moves_credited_stars_by_the_difference(self):
+        submission = self.queue('student')
+        process_next()
+        ExamSubmission.objects.filter(pk=submission.pk).update(grading_status='pending')
+        self.exam.questions = [dict(DOUBLE_IT[0], hidden_test_cases=[{'input': '5', 'expected': '11'}])]
+        self.exam.save()
+
+        process_next()
+
+        submission.refresh_from_db()
+        self.assertEqual((submission.score, submission.stars_earned), (0, 0))
+        self.assertEqual(User.objects.get(pk=submission.student_id).star_points, 0)
+
+    def test_stale_claim_is_released_and_late_result_dropped(self):
+        submission = self.queue('student')
+        submission_id, claimed_at = claim_next()
+        ExamSubmission.objects.filter(pk=submission_id).update(
+            grading_started_at=claimed_at - timedelta(seconds=GRADING_LEASE_SECONDS + 1)
+        )
+
+        self.assertEqual(release_stale_claims(), 1)
+        new_claim = claim_next()
+        self.assertEqual(new_claim[0], submission_id)
+        # The first worker finishing late must not overwrite the new claim
+        self.assertFalse(grade_submission(submission_id, claimed_at))
+        self.assertTrue(grade_submission(*new_claim))
+        submission.refresh_from_db()
+        self.assertEqual((submission.grading_status, submission.grading_attempts), ('graded', 2))
+        self.assertEqual(User.objects.get(pk=submission.student_id).star_points, 10)
+
+    def test_error_is_retried_then_marked_failed(self):
+        submission = self.queue('student')
+
+        with mock.patch('exams.grading_queue.grade_coding_answers', side_effect=RuntimeError('boom')), \
+                self.assertLogs('exams.grading_queue', 'ERROR'):
+            for attempt in range(1, GRADING_MAX_ATTEMPTS + 1):
+                self.assertTrue(process_next())
+                submission.refresh_from_db()
+                expected = 'failed' if attempt == GRADING_MAX_ATTEMPTS else 'pending'
+                self.assertEqual((submission.grading_status, submission.grading_attempts), (expected, attempt))
+
+        self.assertFalse(process_next())
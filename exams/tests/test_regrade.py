@@ -0,0 +1,90 @@
+from django.test import TestCase, override_settings
+
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from exams.regrade import regrade_exam, requeue_coding_exam
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def multi_choice_questions(correct_answers):
+    return [
+        {'id': i, 'question': f'Question {i}', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': answer}
+        for i, answer in enumerate(correct_answers, start=1)
+    ]
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RegradeStarsTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.exam = ActiveExam.objects.create(
+            title='Quiz', teacher=self.teacher, exam_type='multi_choice',
+            questions=multi_choice_questions([0, 1]), points_value=10,
+        )
+
+    def submit(self, username, answers, stars_credited, star_points):
+        student = User.objects.create_user(username, password='x', star_points=star_points)
+        key = self.exam.questions
+        score = sum(answers.get(str(q['id'])) == q['correct_answer'] for q in key)
+        ExamSubmission.objects.create(
+            exam=self.exam, student=student, answers=answers, score=score, total_questions=len(key),
+            stars_earned=score * 5, stars_credited=stars_credited, time_spent_seconds=60,
+        )
+        return student
+
+    def fix_answer_key(self, correct_answers):
+        self.exam.questions = multi_choice_questions(correct_answers)
+        self.exam.save()
+
+    def test_credited_submission_moves_stars_by_the_difference(self):
+        student = self.submit('credited', {'1': 0, '2': 1}, stars_credited=True, star_points=30)
+        self.fix_answer_key([0, 2])
+
+        regraded, changed, star_change = regrade_exam(self.exam)
+
+        self.assertEqual((regraded, changed, star_change), (1, 1, -5))
+        student.refresh_from_db()
+        self.assertEqual(student.star_points, 25)
+        submission = ExamSubmission.objects.get(student=student)
+        self.assertEqual((submission.score, submission.stars_earned), (1, 5))
+
+    def test_uncredited_submission_leaves_star_points_alone(self):
+        # Its stars never reached star_points, so taking them back could go negative
+        student = self.submit('uncredited', {'1': 0, '2': 1}, stars_credited=False, star_points=0)
+        self.fix_answer_key([3, 3])
+
+        regraded, changed, star_change = regrade_exam(self.exam)
+
+        self.assertEqual((regraded, changed, star_change), (1, 1, 0))
+        student.refresh_from_db()
+        self.assertEqual(student.star_points, 0)
+        self.assertEqual(ExamSubmission.objects.get(student=student).stars_earned, 0)
+
+    def test_entries_not_submitted_yet_are_skipped(self):
+        student = User.objects.create_user('entered', password='x')
+        ExamSubmission.objects.create(exam=self.exam, student=student, grading_status='entered')
+
+        regraded, changed, star_change = regrade_exam(self.exam)
+
+        self.assertEqual((regraded, changed, star_change), (0, 0, 0))
+        stats = ExamStats.objects.get(exam=self.exam)
+        self.assertEqual((stats.submission_count, stats.blank_count), (1, 1))
+
+    def test_coding_exam_is_queued_for_the_grading_workers(self):
+        self.exam.exam_type = 'coding'
+        self.exam.save()
+        for username, status in (('graded', 'graded'), ('failed', 'failed'), ('entered', 'entered')):
+            student = User.objects.create_user(username, password='x')
+            ExamSubmission.objects.create(exam=self.exam, student=student, grading_status=status,
+                                          grading_attempts=3)
+
+        self.assertEqual(requeue_coding_exam(self.exam), 2)
+        self.assertEqual(
+            dict(ExamSubmission.objects.values_list('student__username', 'grading_status')),
+            {'graded': 'pending', 'failed': 'pending', 'entered': 'entered'},
+        )
+        self.assertFalse(ExamSubmission.objects.filter(grading_status='pending', grading_attempts__gt=0).exists())
+        with self.assertRaises(ValueError):
+            regrade_exam(self.exam)
@@ -0,0 +1,67 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SubmitExamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        translation.activate('en')
+        self.addCleanup(translation.deactivate)
+        teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.student = User.objects.create_user('student', password='x')
+        self.exam = ActiveExam.objects.create(
+            title='Quiz', teacher=teacher, exam_type='multi_choice', points_value=10,
+            questions=[{'id': 1, 'question': 'Q1', 'options': ['A', 'B'], 'correct_answer': 1}],
+        )
+        self.client.force_login(self.student)
+        self.client.post(reverse('exam_entry', args=[self.exam.id]))
+
+    def submit(self):
+        return self.client.post(reverse('submit_exam', args=[self.exam.id]),
+                                json.dumps({'answers': {'1': 1}}), content_type='application/json')
+
+    def assert_counted_once(self):
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.star_points, 10)
+        stats = ExamStats.objects.get(exam=self.exam)
+        self.assertEqual((stats.submission_count, stats.blank_count, stats.score_sum), (1, 0, 1))
+        self.assertEqual(stats.score_histogram, {'1': 1})
+
+    def test_second_submit_is_rejected(self):
+        self.assertEqual(self.submit().status_code, 200)
+        response = self.submit()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Already submitted')
+        self.assert_counted_once()
+
+    def test_submit_that_lost_the_race_is_rejected(self):
+        # The racing submit read the row while it was still an entry, before the first one committed
+        stale = ExamSubmission.objects.get(exam=self.exam, student=self.student)
+        self.assertEqual(self.submit().status_code, 200)
+
+        with mock.patch.object(ExamSubmission.objects, 'get_or_create', return_value=(stale, False)):
+            response = self.submit()
+
+        self.assertEqual(response.status_code, 400)
+        self.assert_counted_once()
+
+    def test_submit_without_entry_counts_once(self):
+        ExamSubmission.objects.all().delete()
+        ExamStats.rebuild([self.exam.id])
+
+        self.assertEqual(self.submit().status_code, 200)
+        self.assertEqual(self.submit().status_code, 400)
+        self.assert_counted_once()
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from exams.autosave import _buffer_key, save_answers
+from exams.models import ActiveExam, ExamStats, ExamSubmission
+from exams.timer import close_expired_attempts, end_expired_exams
+from users.models import User
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ExamSweepTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        teacher = User.objects.create_user('teacher', password='x', role='teacher')
+        self.exam = ActiveExam.objects.create(
+            title='Quiz', teacher=teacher, exam_type='multi_choice', points_value=10, duration_minutes=30,
+            questions=[{'id': i, 'question': f'Q{i}', 'options': ['A', 'B'], 'correct_answer': 1}
+                       for i in range(1, 3)],
+        )
+
+    def enter(self, username, minutes_ago, draft_answers=None):
+        student = User.objects.create_user(username, password='x')
+        submission = ExamSubmission.objects.create(
+            exam=self.exam, student=student, total_questions=2, grading_status='entered',
+            entered_at=self.now - timedelta(minutes=minutes_ago), draft_answers=draft_answers or {},
+        )
+        ExamStats.record_entry(self.exam.id)
+        return submission
+
+    def test_expired_attempt_is_submitted_with_its_drafts(self):
+        expired = self.enter('late', minutes_ago=40, draft_answers={'1': 1})
+        save_answers(self.exam.id, expired.student_id, {'2': 1})  # Still in the autosave buffer
+        running = self.enter('running', minutes_ago=5)
+
+        self.assertEqual(close_expired_attempts(self.now), 1)
+
+        expired.refresh_from_db()
+        self.assertEqual(expired.grading_status, 'graded')
+        self.assertEqual(expired.answers, {'1': 1, '2': 1})
+        self.assertEqual((expired.score, expired.stars_earned), (2, 5))
+        self.assertTrue(expired.abandoned)
+        self.assertTrue(expired.stars_credited)
+        self.assertEqual(expired.time_spent_seconds, 30 * 60)
+        self.assertEqual(expired.draft_answers, {})
+        self.assertIsNone(cache.get(_buffer_key(self.exam.id, expired.student_id)))
+        self.assertEqual(User.objects.get(pk=expired.student_id).star_points, 5)
+        self.assertEqual(ExamSubmission.objects.get(pk=running.pk).grading_status, 'entered')
+
+        stats = ExamStats.for_exam(self.exam)
+        self.assertEqual((stats.submission_count, stats.blank_count, stats.abandoned_count), (2, 1, 1))
+        self.assertEqual(stats.score_histogram, {'2': 1})
+
+    def test_sweeping_again_closes_nothing(self):
+        expired = self.enter('late', minutes_ago=40, draft_answers={'1': 1})
+        close_expired_attempts(self.now)
+
+        self.assertEqual(close_expired_attempts(self.now + timedelta(minutes=1)), 0)
+        self.assertEqual(User.objects.get(pk=expired.student_id).star_points, 2)
+        self.assertEqual(ExamStats.for_exam(self.exam).score_histogram, {'1': 1})
+
+    def test_attempts_within_the_grace_period_stay_open(self):
+        self.enter('almost', minutes_ago=30)
+
+        self.assertEqual(close_expired_attempts(self.now), 0)
+
+    def test_ended_exam_closes_every_attempt_at_its_end_time(self):
+        self.exam.end_time = self.now - timedelta(minutes=10)
+        self.exam.save()
+        running = self.enter('running', minutes_ago=15)
+
+        self.assertEqual(close_expired_attempts(self.now), 1)
+        self.assertEqual(end_expired_exams(self.now), 1)
+
+        running.refresh_from_db()
+        self.assertEqual(running.grading_status, 'graded')
+        self.assertEqual(running.time_spent_seconds, 5 * 60)
+        self.assertTrue(ActiveExam.objects.get(pk=self.exam.pk).is_ended)
+
+    def test_sweep_command(self):
+        self.enter('late', minutes_ago=40)
+        output = StringIO()
+
+        call_command('sweep_exams', stdout=output)
+
+        self.assertIn('Closed 1 expired attempts and ended 0 exams', output.getvalue())
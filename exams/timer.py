@@ -0,0 +1,111 @@
+"""
+Server-side exam timing. A student's attempt ends at entered_at +
+duration_minutes, or at the exam's end_time if that comes first; the
+browser's countdown is only a display synced from the heartbeat endpoint.
+Attempts still open past their deadline (the browser was closed or went
+offline) are closed by close_expired_attempts(), and exams past their
+end_time are flagged is_ended by end_expired_exams(); both run periodically
+in `manage.py sweep_exams`.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from users.models import User
+
+from .autosave import discard_buffer, get_draft_answers
+from .code_runner import code_answers
+from .exam_cache import invalidate_exam_meta
+from .grading import calculate_stars, exam_answer_key
+from .models import ActiveExam, ExamStats, ExamSubmission
+
+
+# Submissions arriving this long after the deadline (network latency) are still accepted
+DEADLINE_GRACE_SECONDS = 30
+
+
+def attempt_deadline(entered_at, duration_minutes, end_time=None):
+    """When an attempt that started at `entered_at` must be submitted"""
+    deadline = entered_at + timedelta(minutes=duration_minutes)
+    if end_time is not None and end_time < deadline:
+        return end_time
+    return deadline
+
+
+def _close_attempt(exam, submission_id, now):
+    """Submit one expired attempt with its autosaved answers, as abandoned"""
+    with transaction.atomic():
+        submission = ExamSubmission.objects.in_progress().select_for_update().filter(pk=submission_id).first()
+        if submission is None:
+            return False  # Submitted in the meantime
+
+        answers = get_draft_answers(submission)
+        abandoned = True
+        if exam.exam_type == 'coding':
+            # Graded by the grading workers like any other coding submission
+            answers = code_answers(answers)
+            score, total, stars_earned = 0, len(exam.questions), 0
+        else:
+            score, total = exam_answer_key(exam).score(answers)
+            stars_earned = calculate_stars(score, total, exam.points_value, abandoned)
+        before = (submission.score, submission.abandoned, submission.answers, submission.grading_status)
+
+        deadline = attempt_deadline(submission.entered_at, exam.duration_minutes, exam.end_time)
+        submission.answers = answers
+        submission.score = score
+        submission.total_questions = total
+        submission.stars_earned = stars_earned
+        submission.abandoned = abandoned
+        submission.time_spent_seconds = max(0, int((min(now, deadline) - submission.entered_at).total_seconds()))
+        submission.submitted_at = now
+        submission.grading_status = 'pending' if exam.exam_type == 'coding' else 'graded'
+        submission.stars_credited = exam.exam_type != 'coding'
+        submission.draft_answers = {}
+        submission.save()
+
+        ExamStats.record(exam, before=before, after=(score, abandoned, answers, submission.grading_status))
+        if stars_earned:
+            User.objects.filter(pk=submission.student_id).update(star_points=F('star_points') + stars_earned)
+
+    discard_buffer(exam.id, submission.student_id)
+    return True
+
+
+def close_expired_attempts(now=None):
+    """
+    Close every in-progress attempt whose deadline (plus grace) has passed.
+    Returns the number of attempts closed.
+    """
+    now = now or timezone.now()
+    grace = timedelta(seconds=DEADLINE_GRACE_SECONDS)
+    open_attempts = ExamSubmission.objects.in_progress().filter(entered_at__isnull=False)
+    exam_ids = open_attempts.values_list('exam_id', flat=True).distinct()
+
+    closed = 0
+    for exam in ActiveExam.objects.filter(id__in=list(exam_ids)):
+        expired = open_attempts.filter(exam=exam)
+        # Attempts can't outlive the exam; otherwise each gets its full duration
+        if exam.end_time is None or exam.end_time + grace > now:
+            expired = expired.filter(entered_at__lt=now - grace - timedelta(minutes=exam.duration_minutes))
+        for submission_id in expired.values_list('pk', flat=True):
+            closed += _close_attempt(exam, submission_id, now)
+    return closed
+
+
+def end_expired_exams(now=None):
+    """
+    Flag every exam past its end_time as ended, in one UPDATE, so dashboards
+    can filter on is_ended. Returns the number of exams ended.
+    """
+    now = now or timezone.now()
+    expired = ActiveExam.objects.filter(is_ended=False, end_time__lt=now)
+    exam_ids = list(expired.values_list('pk', flat=True))
+    if not exam_ids:
+        return 0
+    ended = ActiveExam.objects.filter(pk__in=exam_ids, is_ended=False).update(is_ended=True, updated_at=now)
+    # update() skips the post_save signal that drops cached exam metadata
+    for exam_id in exam_ids:
+        invalidate_exam_meta(exam_id)
+    return ended
@@ -5,9 +5,16 @@ urlpatterns = [
     # Student views
     path('<int:exam_id>/', views.exam_detail, name='exam_detail'),
     path('<int:exam_id>/entry/', views.exam_entry, name='exam_entry'),
+    path('<int:exam_id>/autosave/', views.autosave_exam, name='autosave_exam'),
+    path('<int:exam_id>/heartbeat/', views.exam_heartbeat, name='exam_heartbeat'),
     path('<int:exam_id>/submit/', views.submit_exam, name='submit_exam'),
+    path('<int:exam_id>/status/', views.exam_submission_status, name='exam_submission_status'),
     path('<int:exam_id>/run-code/', views.run_exam_code, name='run_exam_code'),
     
+    # Teacher views
+    path('<int:exam_id>/export/', views.export_exam_results, name='export_exam_results'),
+    path('<int:exam_id>/regrade/', views.regrade_exam, name='regrade_exam'),
+    
     # AI conversion endpoints
     path('ai/convert-text/', views.ai_convert_text, name='ai_convert_text'),
     path('ai/convert-file/', views.ai_convert_file, name='ai_convert_file'),
@@ -1,19 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.utils import timezone
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
-from django.db.models import Count, Avg
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from datetime import timedelta
 import json
 import os
-import tempfile
 
-from .models import ActiveExam, ExamSubmission
+from .autosave import AUTOSAVE_MAX_BYTES, discard_buffer, flush_buffer, get_draft_answers, save_answers
+from .code_runner import SandboxUnavailable, code_answers, public_problems, run_test_cases
+from .exam_cache import get_exam_meta
+from .grading_queue import queue_position
+from .grading import calculate_stars, exam_answer_key
+from .models import ActiveExam, ExamStats, ExamSubmission
+from .timer import DEADLINE_GRACE_SECONDS, attempt_deadline
+from pyez_learning.exports import EXPORT_CHUNK_SIZE, stream_csv
 from users.models import User
-from .ai_converter import get_ai_converter
+from .ai_converter import get_ai_converter, run_ai_call, AIServiceBusyError
 
 
 @login_required
@@ -72,7 +83,9 @@ def exam_detail(request, exam_id):
     
     # Check if exam is ended
     if exam.is_ended:
-        return render(request, 'exams/exam_closed.html', {'exam': exam, 'ended_by_teacher': True})
+        # Exams past end_time are also flagged ended, by the sweeper
+        ended_by_teacher = exam.end_time is None or exam.end_time > timezone.now()
+        return render(request, 'exams/exam_closed.html', {'exam': exam, 'ended_by_teacher': ended_by_teacher})
     
     # Check if exam is active (for students only, teachers can always access)
     if not request.user.is_teacher and not exam.is_active():
@@ -88,7 +101,9 @@ def exam_detail(request, exam_id):
         student=request.user
     ).first()
     
-    if existing_submission:
+    # An attempt still in progress (e.g. the page was reloaded) resumes with its autosaved answers
+    resuming = existing_submission is not None and existing_submission.grading_status == 'entered'
+    if existing_submission and not resuming:
         return render(request, 'exams/exam_already_submitted.html', {
             'exam': exam,
             'submission': existing_submission
@@ -109,8 +124,9 @@ def exam_detail(request, exam_id):
     # Show the exam
     context = {
         'exam': exam,
-        'questions': exam.questions,
+        'questions': public_problems(exam.questions) if exam.exam_type == 'coding' else exam.questions,
         'exam_type': exam.exam_type,
+        'draft_answers': get_draft_answers(existing_submission) if resuming else {},
     }
     return render(request, 'exams/exam_detail.html', context)
 
@@ -119,31 +135,62 @@ def exam_detail(request, exam_id):
 @require_POST
 def exam_entry(request, exam_id):
     """Record when a student enters/starts an exam"""
-    exam = get_object_or_404(ActiveExam, id=exam_id)
-    
-    # Check if already has a submission or entry record
-    existing = ExamSubmission.objects.filter(exam=exam, student=request.user).first()
-    if existing:
-        return JsonResponse({'success': False, 'error': 'Already entered or submitted'}, status=400)
+    meta = get_exam_meta(exam_id)
+    if meta is None:
+        raise Http404('Exam not found')
     
     try:
-        # Create a temporary submission record to mark entry
-        # This prevents re-entry even if they abandon
-        submission = ExamSubmission.objects.create(
-            exam=exam,
-            student=request.user,
-            entered_at=timezone.now(),
-            answers={},
-            score=0,
-            total_questions=len(exam.questions),
-            stars_earned=0
-        )
+        # One INSERT plus the stats UPDATE. A repeated or racing entry fails on
+        # unique_together and leaves the existing entry/submission untouched.
+        # This temporary record prevents re-entry even if they abandon
+        with transaction.atomic():
+            ExamSubmission.objects.create(
+                exam_id=exam_id,
+                student=request.user,
+                entered_at=timezone.now(),
+                answers={},
+                score=0,
+                total_questions=meta['total_questions'],
+                stars_earned=0,
+                grading_status='entered',
+            )
+            ExamStats.record_entry(exam_id)
         
         return JsonResponse({'success': True, 'message': 'Exam entry recorded'})
+    except IntegrityError:
+        return JsonResponse({'success': False, 'error': 'Already entered or submitted'}, status=400)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@login_required
+@require_POST
+def autosave_exam(request, exam_id):
+    """Student's browser sends the answers changed since its last autosave"""
+    meta = get_exam_meta(exam_id)
+    if meta is None:
+        raise Http404('Exam not found')
+    
+    if len(request.body) > AUTOSAVE_MAX_BYTES:
+        return JsonResponse({'success': False, 'error': 'Autosave too large'}, status=400)
+    
+    try:
+        delta = json.loads(request.body).get('answers', {})
+    except (ValueError, AttributeError):
+        return JsonResponse({'success': False, 'error': 'Invalid autosave'}, status=400)
+    if not isinstance(delta, dict) or len(delta) > meta['total_questions']:
+        return JsonResponse({'success': False, 'error': 'Invalid autosave'}, status=400)
+    
+    # Only an entered, not yet submitted attempt takes drafts
+    in_progress = ExamSubmission.objects.in_progress().filter(exam_id=exam_id, student=request.user).exists()
+    if not in_progress:
+        return JsonResponse({'success': False, 'error': 'Exam is not in progress'}, status=400)
+    
+    if delta and not save_answers(exam_id, request.user.id, {str(key): value for key, value in delta.items()}):
+        return JsonResponse({'success': False, 'error': 'Exam is not in progress'}, status=400)
+    return JsonResponse({'success': True})
+
+
 @login_required
 @require_POST
 def submit_exam(request, exam_id):
@@ -154,49 +201,81 @@ def submit_exam(request, exam_id):
         data = json.loads(request.body)
         answers = data.get('answers', {})
         abandoned = data.get('abandoned', False)
-        time_spent = data.get('time_spent', 0)
-        
-        # Get or create submission (in case entry wasn't recorded)
-        submission, created = ExamSubmission.objects.get_or_create(
-            exam=exam,
-            student=request.user,
-            defaults={
-                'answers': {},
-                'score': 0,
-                'total_questions': len(exam.questions),
-                'stars_earned': 0,
-                'entered_at': timezone.now()
-            }
-        )
         
-        # If already submitted with valid score, don't allow resubmission
-        if not created and submission.score > 0:
-            return JsonResponse({'success': False, 'error': 'Already submitted'}, status=400)
+        # Coding solutions are queued for the grading workers (run_grading_worker), which
+        # run them in the sandbox; only the code is kept, never the browser's 'passed' flags
+        queued = exam.exam_type == 'coding'
+        if queued:
+            answers = code_answers(answers)
         
-        # Calculate score based on exam type
-        if exam.exam_type == 'multi_choice':
-            score, total = calculate_quiz_score(exam.questions, answers)
-        else:  # coding
-            score, total = calculate_coding_score(exam.questions, answers)
+        with transaction.atomic():
+            # Get or create submission (in case entry wasn't recorded)
+            submission, created = ExamSubmission.objects.get_or_create(
+                exam=exam,
+                student=request.user,
+                defaults={
+                    'answers': {},
+                    'score': 0,
+                    'total_questions': len(exam.questions),
+                    'stars_earned': 0,
+                    'entered_at': timezone.now(),
+                    'grading_status': 'entered',
+                }
+            )
+            # Lock the row: a concurrent submit, or the sweeper closing the attempt, waits
+            # here and then finds it submitted, so stats and stars are counted once
+            submission = ExamSubmission.objects.select_for_update().get(pk=submission.pk)
+            
+            # Only an entry that hasn't been submitted yet can be submitted
+            if submission.grading_status != 'entered':
+                return JsonResponse({'success': False, 'error': 'Already submitted'}, status=400)
+            
+            # Time is kept by the server: past the deadline the attempt is closed by the sweeper
+            now = timezone.now()
+            entered_at = submission.entered_at or now
+            deadline = attempt_deadline(entered_at, exam.duration_minutes, exam.end_time)
+            if now > deadline + timedelta(seconds=DEADLINE_GRACE_SECONDS):
+                return JsonResponse({'success': False, 'error': 'Time is up'}, status=400)
+            time_spent = max(0, int((min(now, deadline) - entered_at).total_seconds()))
+            
+            if queued:
+                # Scored and awarded stars by the grading worker
+                score, total, stars_earned = 0, len(exam.questions), 0
+            else:
+                # Grade against the exam's compiled answer key
+                score, total = exam_answer_key(exam).score(answers)
+                # Calculate stars earned (reduced if abandoned)
+                stars_earned = calculate_stars(score, total, exam.points_value, abandoned)
         
-        # Calculate stars earned (reduced if abandoned)
-        penalty = 0.5 if abandoned else 1.0
-        stars_earned = int((score / total) * exam.points_value * penalty) if total > 0 else 0
+            before = None if created else (submission.score, submission.abandoned, submission.answers,
+                                             submission.grading_status)
+            # Update submission
+            submission.answers = answers
+            submission.score = score
+            submission.total_questions = total
+            submission.stars_earned = stars_earned
+            submission.abandoned = abandoned
+            submission.time_spent_seconds = time_spent
+            submission.submitted_at = now
+            submission.grading_status = 'pending' if queued else 'graded'
+            submission.stars_credited = not queued
+            submission.draft_answers = {}
+            submission.save()
+            
+            # Exam stats and the student's stars change in the same transaction as the submission
+            ExamStats.record(exam, before=before, after=(score, abandoned, answers, submission.grading_status))
+            if stars_earned:
+                User.objects.filter(pk=request.user.pk).update(star_points=F('star_points') + stars_earned)
         
-        # Update submission
-        submission.answers = answers
-        submission.score = score
-        submission.total_questions = total
-        submission.stars_earned = stars_earned
-        submission.abandoned = abandoned
-        submission.time_spent_seconds = time_spent
-        submission.submitted_at = timezone.now()
-        submission.save()
+        # The final answers supersede anything still waiting to be autosaved
+        discard_buffer(exam.id, request.user.id)
         
-        # Award stars to student (only if not already awarded)
-        if created or submission.stars_earned == 0:
-            request.user.star_points += stars_earned
-            request.user.save()
+        if queued:
+            return JsonResponse({
+                'success': True,
+                'grading': True,
+                'status_url': reverse('exam_submission_status', args=[exam.id]),
+            })
         
         return JsonResponse({
             'success': True,
@@ -210,6 +289,63 @@ def submit_exam(request, exam_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@login_required
+def exam_heartbeat(request, exam_id):
+    """Seconds left in the student's attempt by the server's clock, polled by the exam page"""
+    meta = get_exam_meta(exam_id)
+    if meta is None:
+        raise Http404('Exam not found')
+    
+    entered_at = ExamSubmission.objects.in_progress().filter(
+        exam_id=exam_id, student=request.user
+    ).values_list('entered_at', flat=True).first()
+    if entered_at is None:
+        return JsonResponse({'success': True, 'status': 'closed'})
+    
+    deadline = attempt_deadline(entered_at, meta['duration_minutes'], meta['end_time'])
+    remaining = 0 if meta['is_ended'] else max(0, int((deadline - timezone.now()).total_seconds()))
+    # Autosaved answers reach the database even if the student stops changing them,
+    # and all of them once time is up
+    flush_buffer(exam_id, request.user.id, force=not remaining)
+    return JsonResponse({
+        'success': True,
+        'status': 'in_progress' if remaining else 'time_up',
+        'remaining_seconds': remaining,
+        'deadline': deadline.isoformat(),
+    })
+
+
+@login_required
+def exam_submission_status(request, exam_id):
+    """Student polls this while their coding submission waits in the grading queue"""
+    submission = ExamSubmission.objects.filter(exam_id=exam_id, student=request.user).values(
+        'grading_status', 'score', 'total_questions', 'stars_earned', 'abandoned', 'submitted_at'
+    ).first()
+    if submission is None:
+        return JsonResponse({'success': False, 'error': 'Submission not found'}, status=404)
+    
+    status = submission['grading_status']
+    if status == 'failed':
+        return JsonResponse({'success': False, 'status': status, 'error': 'Grading failed, please contact your teacher'})
+    if status != 'graded':
+        data = {'success': True, 'status': status, 'grading': True}
+        if status == 'pending':
+            data['queue_position'] = queue_position(submission['submitted_at'])
+        return JsonResponse(data)
+    
+    score, total = submission['score'], submission['total_questions']
+    return JsonResponse({
+        'success': True,
+        'status': status,
+        'grading': False,
+        'score': score,
+        'total': total,
+        'stars_earned': submission['stars_earned'],
+        'percentage': int((score / total) * 100) if total > 0 else 0,
+        'abandoned': submission['abandoned']
+    })
+
+
 @login_required
 @require_POST
 def run_exam_code(request, exam_id):
@@ -231,49 +367,9 @@ def run_exam_code(request, exam_id):
         if not problem:
             return JsonResponse({'success': False, 'error': 'Problem not found'}, status=404)
         
-        # Execute code with test cases
-        test_cases = problem.get('test_cases', [])
-        all_passed = True
-        results = []
-        
-        # Simple code execution (you should use a safer method in production)
-        import sys
-        from io import StringIO
-        
-        for test_case in test_cases:
-            try:
-                # Capture output
-                old_stdout = sys.stdout
-                sys.stdout = StringIO()
-                
-                # Execute the code
-                exec_globals = {}
-                exec(code, exec_globals)
-                
-                # Get output
-                output = sys.stdout.getvalue().strip()
-                sys.stdout = old_stdout
-                
-                expected = str(test_case.get('expected', '')).strip()
-                passed = output == expected
-                
-                if not passed:
-                    all_passed = False
-                
-                results.append({
-                    'input': test_case.get('input'),
-                    'expected': expected,
-                    'actual': output,
-                    'passed': passed
-                })
-            except Exception as e:
-                sys.stdout = old_stdout
-                all_passed = False
-                results.append({
-                    'input': test_case.get('input'),
-                    'error': str(e),
-                    'passed': False
-                })
+        # Run the visible test cases in the sandbox, each with its input on stdin
+        results = run_test_cases(str(code), problem.get('test_cases', []))
+        all_passed = all(result['passed'] for result in results)
         
         return JsonResponse({
             'success': all_passed,
@@ -281,6 +377,8 @@ def run_exam_code(request, exam_id):
             'error': None if all_passed else 'Some tests failed'
         })
         
+    except SandboxUnavailable:
+        return JsonResponse({'success': False, 'error': 'Running code is not available right now'}, status=503)
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
@@ -294,70 +392,97 @@ def teacher_exam_results(request, exam_id):
     
     exam = get_object_or_404(ActiveExam, id=exam_id, teacher=request.user)
     submissions = exam.submissions.select_related('student').order_by('-stars_earned', '-submitted_at')
+    stats = ExamStats.for_exam(exam)
     
     context = {
         'exam': exam,
         'submissions': submissions,
-        'total_submissions': submissions.count(),
-        'avg_score': submissions.aggregate(avg=Avg('score'))['avg'] or 0,
+        'stats': stats,
+        'item_analysis': stats.item_analysis(),
+        'total_submissions': stats.submission_count,
+        'avg_score': stats.mean_score,
     }
     return render(request, 'exams/exam_results.html', context)
 
 
 @login_required
-def teacher_exams_list(request):
-    """Teacher views all their exams"""
+@require_POST
+def regrade_exam(request, exam_id):
+    """Teacher regrades all submissions after fixing the exam's answers"""
     if not request.user.is_teacher:
         return redirect('dashboard')
     
-    exams = ActiveExam.objects.filter(teacher=request.user).annotate(
-        submission_count=Count('submissions')
-    ).order_by('-created_at')
+    from .regrade import regrade_exam as regrade_submissions, requeue_coding_exam
     
-    context = {
-        'exams': exams,
-    }
-    return render(request, 'exams/teacher_exams_list.html', context)
+    exam = get_object_or_404(ActiveExam, id=exam_id, teacher=request.user)
+    if exam.exam_type == 'coding':
+        # The grading workers rerun the code; results update as they finish
+        queued = requeue_coding_exam(exam)
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return JsonResponse({'success': True, 'queued': queued})
+        messages.success(request, f'Queued {queued} submissions for regrading.')
+        return redirect('teacher_exam_results', exam_id=exam.id)
+    
+    regraded, changed, star_change = regrade_submissions(exam)
+    
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({'success': True, 'regraded': regraded, 'changed': changed, 'star_change': star_change})
+    
+    messages.success(request, f'Regraded {regraded} submissions ({changed} changed).')
+    return redirect('teacher_exam_results', exam_id=exam.id)
 
 
-# Helper functions
-def calculate_quiz_score(questions, answers):
-    """Calculate score for multiple choice quiz"""
-    score = 0
-    total = len(questions)
+@login_required
+def export_exam_results(request, exam_id):
+    """Teacher downloads exam results as CSV (streamed, same order as the results page)"""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
+    
+    exam = get_object_or_404(ActiveExam, id=exam_id, teacher=request.user)
+    rows = exam.submissions.order_by('-stars_earned', '-submitted_at').values_list(
+        'student__username', 'student__first_name', 'student__last_name', 'student__student_class',
+        'score', 'total_questions', 'stars_earned', 'abandoned', 'time_spent_seconds',
+        'entered_at', 'submitted_at',
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
     
-    for question in questions:
-        question_id = str(question.get('id'))
-        if question_id in answers:
-            student_answer = answers[question_id]
-            correct_answer = question.get('correct_answer')
-            if student_answer == correct_answer:
-                score += 1
+    def ranked():
+        for rank, (username, first_name, last_name, student_class, score, total, stars, abandoned,
+                   time_spent, entered_at, submitted_at) in enumerate(rows, start=1):
+            percentage = round(score / total * 100, 1) if total else 0
+            yield (rank, username, first_name, last_name, student_class, score, total, percentage,
+                   stars, 'yes' if abandoned else 'no', time_spent, entered_at, submitted_at)
     
-    return score, total
+    header = ['rank', 'username', 'first_name', 'last_name', 'class', 'score', 'total_questions',
+              'percentage', 'stars_earned', 'abandoned', 'time_spent_seconds', 'entered_at', 'submitted_at']
+    return stream_csv(f'exam-{exam.id}-results.csv', header, ranked(), request=request)
 
 
-def calculate_coding_score(problems, answers):
-    """Calculate score for coding test (based on passed tests)"""
-    score = 0
-    total = len(problems)
+@login_required
+def teacher_exams_list(request):
+    """Teacher views all their exams"""
+    if not request.user.is_teacher:
+        return redirect('dashboard')
     
-    for problem in problems:
-        problem_id = str(problem.get('id'))
-        if problem_id in answers:
-            if answers[problem_id].get('passed', False):
-                score += 1
+    exams = ActiveExam.objects.filter(teacher=request.user).annotate(
+        submission_count=Coalesce('stats__submission_count', Value(0))
+    ).order_by('-created_at')
     
-    return score, total
+    context = {
+        'exams': exams,
+    }
+    return render(request, 'exams/teacher_exams_list.html', context)
 
 
 # AI-Assisted Exam Creation Views
+# Async: the OpenAI call runs on a worker thread, so under the ASGI worker a
+# slow completion no longer holds a whole worker process
 @login_required
 @require_POST
 @ensure_csrf_cookie
-def ai_convert_text(request):
+async def ai_convert_text(request):
     """Convert natural language text to exam JSON using AI"""
-    if not request.user.is_teacher:
+    user = await request.auser()
+    if not user.is_teacher:
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
@@ -371,27 +496,27 @@ def ai_convert_text(request):
         
         # Use AI converter
         converter = get_ai_converter()
-        result = converter.convert_text_to_exam(text, exam_type, language)
+        result = await run_ai_call(converter.convert_text_to_exam, text, exam_type, language)
         
         return JsonResponse(result)
     
+    except AIServiceBusyError:
+        # Requests already queued and retried with backoff; quota is still exhausted
+        return JsonResponse({
+            'success': False, 
+            'error': 'AI service is temporarily busy. Please try again in a minute or use a simpler prompt.'
+        }, status=429)
     except Exception as e:
-        error_msg = str(e)
-        # Check for quota/rate limit errors
-        if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower():
-            return JsonResponse({
-                'success': False, 
-                'error': 'AI service is temporarily busy. Please try again in a minute or use a simpler prompt.'
-            }, status=429)
-        return JsonResponse({'success': False, 'error': f'AI Error: {error_msg}'}, status=500)
+        return JsonResponse({'success': False, 'error': f'AI Error: {str(e)}'}, status=500)
 
 
 @login_required
 @require_POST
 @ensure_csrf_cookie
-def ai_convert_file(request):
+async def ai_convert_file(request):
     """Convert uploaded file to exam JSON using AI"""
-    if not request.user.is_teacher:
+    user = await request.auser()
+    if not user.is_teacher:
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
@@ -406,44 +531,33 @@ def ai_convert_file(request):
         if uploaded_file.size > 10 * 1024 * 1024:
             return JsonResponse({'success': False, 'error': 'File too large (max 10MB)'}, status=400)
         
-        # Save file temporarily
         file_ext = os.path.splitext(uploaded_file.name)[1].lower()
         if file_ext not in ['.txt', '.pdf']:
             return JsonResponse({'success': False, 'error': 'Only .txt and .pdf files are supported'}, status=400)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-            for chunk in uploaded_file.chunks():
-                tmp_file.write(chunk)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Use AI converter
-            converter = get_ai_converter()
-            result = converter.convert_file_to_exam(tmp_file_path, exam_type, language)
-            return JsonResponse(result)
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.remove(tmp_file_path)
+        # Use AI converter (reads the upload directly, no temporary file)
+        converter = get_ai_converter()
+        result = await run_ai_call(converter.convert_file_to_exam, uploaded_file, exam_type, language,
+                                   file_ext=file_ext)
+        return JsonResponse(result)
     
+    except AIServiceBusyError:
+        # Requests already queued and retried with backoff; quota is still exhausted
+        return JsonResponse({
+            'success': False, 
+            'error': 'AI service is temporarily busy. Please try again in a minute or use a simpler file.'
+        }, status=429)
     except Exception as e:
-        error_msg = str(e)
-        # Check for quota/rate limit errors
-        if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower():
-            return JsonResponse({
-                'success': False, 
-                'error': 'AI service is temporarily busy. Please try again in a minute or use a simpler file.'
-            }, status=429)
-        return JsonResponse({'success': False, 'error': f'AI Error: {error_msg}'}, status=500)
+        return JsonResponse({'success': False, 'error': f'AI Error: {str(e)}'}, status=500)
 
 
 @login_required
 @require_POST
 @ensure_csrf_cookie
-def ai_validate_json(request):
+async def ai_validate_json(request):
     """Validate and fix JSON format using AI"""
-    if not request.user.is_teacher:
+    user = await request.auser()
+    if not user.is_teacher:
         return JsonResponse({'success': False, 'error': 'Unauthorized'}, status=403)
     
     try:
@@ -457,16 +571,15 @@ def ai_validate_json(request):
         
         # Use AI converter to validate and fix
         converter = get_ai_converter()
-        result = converter.validate_and_fix_json(json_text, exam_type, language)
+        result = await run_ai_call(converter.validate_and_fix_json, json_text, exam_type, language)
         
         return JsonResponse(result)
     
+    except AIServiceBusyError:
+        # Requests already queued and retried with backoff; quota is still exhausted
+        return JsonResponse({
+            'success': False, 
+            'error': 'AI service is temporarily busy. Please try again in a minute.'
+        }, status=429)
     except Exception as e:
-        error_msg = str(e)
-        # Check for quota/rate limit errors
-        if '429' in error_msg or 'quota' in error_msg.lower() or 'rate limit' in error_msg.lower():
-            return JsonResponse({
-                'success': False, 
-                'error': 'AI service is temporarily busy. Please try again in a minute.'
-            }, status=429)
-        return JsonResponse({'success': False, 'error': f'AI Error: {error_msg}'}, status=500)
+        return JsonResponse({'success': False, 'error': f'AI Error: {str(e)}'}, status=500)
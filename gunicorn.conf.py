@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration (picked up automatically from the working directory).
+
+Worker hooks warm per-process resources right after fork so the first
+requests served by a fresh worker don't pay their setup cost.
+"""
+import os
+import threading
+
+
+def _setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pyez_learning.settings')
+    import django
+    django.setup()
+
+
+def _warm_worker(log):
+    """Open the OpenAI keep-alive connection for this worker"""
+    from exams.ai_converter import warm_ai_client
+    if warm_ai_client():
+        log.info("OpenAI client warmed")
+
+
+def _warm_templates(log):
+    """Compile all templates into the cached loader before the worker takes requests"""
+    from pyez_learning.warmup import warm_templates
+    compiled, failed, seconds = warm_templates()
+    log.info("Compiled %d templates in %.0f ms", compiled, seconds * 1000)
+    for name in failed:
+        log.warning("Template failed to compile during warm-up: %s", name)
+
+
+def post_fork(server, worker):
+    """Runs in each worker after fork; network warm-up happens off the boot path"""
+    _setup_django()
+    _warm_templates(worker.log)
+    threading.Thread(target=_warm_worker, args=(worker.log,), daemon=True).start()
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pyez_learning.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from pyez_learning.http_client import with_lifespan  # noqa: E402 (after Django setup)
+
+# Lifespan events open and close the process's pooled HTTP client
+application = with_lifespan(django_application)
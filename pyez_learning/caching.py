@@ -0,0 +1,99 @@
+"""
+Helpers on top of the shared cache. `single_flight` makes sure an expensive
+value is recomputed by one worker at a time: the others wait for it to land
+in the cache instead of all recomputing on the same miss (cache stampede).
+`async_single_flight` is the same for async views.
+"""
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+
+from django.core.cache import cache
+
+
+_MISSING = object()
+
+
+@contextmanager
+def cache_lock(key, timeout=60):
+    """
+    Best-effort cross-process lock built on cache.add.
+    Yields True if this caller holds the lock; it expires after `timeout`
+    seconds so a crashed holder can't block everyone forever.
+    """
+    lock_key = f'lock:{key}'
+    token = uuid.uuid4().hex
+    acquired = cache.add(lock_key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        # Only release our own lock (it may have expired and been re-taken)
+        if acquired and cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def single_flight(key, compute, timeout, lock_timeout=60, wait_seconds=10, poll_interval=0.1):
+    """
+    Return the cached value for `key`, computing and caching it on a miss.
+    Concurrent misses wait up to `wait_seconds` for the worker holding the lock;
+    after that they compute the value themselves rather than fail.
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        with cache_lock(key, lock_timeout) as acquired:
+            if acquired:
+                # The previous holder may have filled it between our miss and the lock
+                value = cache.get(key, _MISSING)
+                if value is _MISSING:
+                    value = compute()
+                    cache.set(key, value, timeout)
+                return value
+
+        if time.monotonic() >= deadline:
+            return compute()
+        time.sleep(poll_interval)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+
+@asynccontextmanager
+async def async_cache_lock(key, timeout=60):
+    """cache_lock for async code"""
+    lock_key = f'lock:{key}'
+    token = uuid.uuid4().hex
+    acquired = await cache.aadd(lock_key, token, timeout)
+    try:
+        yield acquired
+    finally:
+        if acquired and await cache.aget(lock_key) == token:
+            await cache.adelete(lock_key)
+
+
+async def async_single_flight(key, compute, timeout, lock_timeout=60, wait_seconds=10, poll_interval=0.1):
+    """single_flight for async views: `compute` is a coroutine function"""
+    value = await cache.aget(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        async with async_cache_lock(key, lock_timeout) as acquired:
+            if acquired:
+                value = await cache.aget(key, _MISSING)
+                if value is _MISSING:
+                    value = await compute()
+                    await cache.aset(key, value, timeout)
+                return value
+
+        if time.monotonic() >= deadline:
+            return await compute()
+        await asyncio.sleep(poll_interval)
+        value = await cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            return value
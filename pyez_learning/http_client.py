@@ -0,0 +1,82 @@
+"""
+Shared async HTTP client for views that fetch from other services
+(Cloudinary files). Under the ASGI worker there is one event loop, hence one
+keep-alive pool, per process: a worker waiting on many downloads keeps
+serving other requests instead of blocking on each one.
+
+The pooled client lives as long as the ASGI server: it is opened and closed
+by the lifespan events handled in `with_lifespan`. Elsewhere (runserver,
+tests) each async view runs on a short-lived loop of its own, so every call
+gets a client that is closed when the call ends.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+
+HTTP_TIMEOUT_SECONDS = 10
+
+_client = None
+_client_loop = None
+
+
+def _new_client():
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+    )
+
+
+def open_shared_client():
+    """Create the pooled client on the running (server) loop"""
+    global _client, _client_loop
+    _client = _new_client()
+    _client_loop = asyncio.get_running_loop()
+
+
+async def close_shared_client():
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def async_http_client():
+    """The pooled client on the server loop, otherwise a client for this call only"""
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        yield _client
+        return
+    async with _new_client() as client:
+        yield client
+
+
+async def fetch_bytes(url, timeout=HTTP_TIMEOUT_SECONDS):
+    """GET `url` and return the body; raises httpx.HTTPError on failure or an error status"""
+    async with async_http_client() as client:
+        response = await client.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def with_lifespan(application):
+    """
+    Wrap the Django ASGI application to handle lifespan events (Django only
+    serves HTTP): the pooled client is opened on startup and closed on shutdown.
+    """
+    async def app(scope, receive, send):
+        if scope['type'] != 'lifespan':
+            return await application(scope, receive, send)
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                open_shared_client()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_shared_client()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    return app
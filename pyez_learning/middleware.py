@@ -0,0 +1,149 @@
+"""
+Request instrumentation: wall time, DB query count/time and response size
+per view, kept in an in-memory ring buffer and exposed via Server-Timing.
+Enabled with the REQUEST_METRICS_ENABLED setting.
+"""
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+# Most recent requests for this worker process (oldest dropped first)
+_samples = deque(maxlen=getattr(settings, 'REQUEST_METRICS_BUFFER_SIZE', 2000))
+_samples_lock = threading.Lock()
+
+
+class _QueryTimer:
+    """execute_wrapper that counts queries and sums their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """Record per-view latency, query count/time and response bytes"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # Under ASGI, stay async so async views aren't pushed onto a thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer, wrappers, start = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self._stop(wrappers)
+        return self._finish(request, response, timer, start)
+
+    async def __acall__(self, request):
+        # Connections are per thread: wrap the one the request's (thread-sensitive)
+        # ORM calls use, not the event loop's
+        timer, wrappers, start = await sync_to_async(self._start)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(self._stop)(wrappers)
+        return self._finish(request, response, timer, start)
+
+    @staticmethod
+    def _start():
+        timer = _QueryTimer()
+        wrappers = [connections[alias].execute_wrapper(timer) for alias in connections]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        return timer, wrappers, time.perf_counter()
+
+    @staticmethod
+    def _stop(wrappers):
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+    def _finish(self, request, response, timer, start):
+        wall = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (getattr(match.func, '__name__', None) or match.view_name) if match else None
+        if view is None:
+            # Unresolved URLs (404s, static files) would only add noise
+            return response
+
+        size = len(response.content) if not response.streaming else 0
+        sample = {
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'wall_ms': wall * 1000,
+            'queries': timer.count,
+            'db_ms': timer.seconds * 1000,
+            'bytes': size,
+            'timestamp': time.time(),
+        }
+        with _samples_lock:
+            _samples.append(sample)
+
+        response['Server-Timing'] = (
+            f'app;dur={wall * 1000:.1f}, '
+            f'db;dur={timer.seconds * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def get_request_metrics_summary():
+    """Aggregate the ring buffer per view, slowest (p95 wall time) first"""
+    with _samples_lock:
+        samples = list(_samples)
+
+    by_view = {}
+    for sample in samples:
+        by_view.setdefault(sample['view'], []).append(sample)
+
+    summary = []
+    for view, rows in by_view.items():
+        wall = sorted(r['wall_ms'] for r in rows)
+        queries = [r['queries'] for r in rows]
+        summary.append({
+            'view': view,
+            'count': len(rows),
+            'avg_ms': sum(wall) / len(wall),
+            'p95_ms': _percentile(wall, 0.95),
+            'max_ms': wall[-1],
+            'avg_queries': sum(queries) / len(queries),
+            'max_queries': max(queries),
+            'avg_db_ms': sum(r['db_ms'] for r in rows) / len(rows),
+            'avg_bytes': sum(r['bytes'] for r in rows) / len(rows),
+            'errors': sum(1 for r in rows if r['status'] >= 500),
+        })
+    summary.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return summary
+
+
+def clear_request_metrics():
+    with _samples_lock:
+        _samples.clear()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
@@ -61,7 +62,8 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add for static files
+    'pyez_learning.static_middleware.WhiteNoiseMiddleware',  # WhiteNoise static files, async-capable for ASGI
+    'pyez_learning.middleware.RequestMetricsMiddleware',  # No-op unless REQUEST_METRICS_ENABLED
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,14 +74,24 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
 ]
 
+# Per-view latency/query instrumentation (Server-Timing header + /performance/ summary)
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'False') == 'True'
+REQUEST_METRICS_BUFFER_SIZE = int(os.getenv('REQUEST_METRICS_BUFFER_SIZE', '2000'))
+
 ROOT_URLCONF = 'pyez_learning.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')], # Add this
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept per worker; gunicorn.conf.py pre-compiles them after fork
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -100,12 +112,36 @@ WSGI_APPLICATION = 'pyez_learning.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default=os.getenv('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
-        conn_max_age=600,
+        # Persistent connections suit the WSGI worker. Under the ASGI worker each request
+        # runs on its own thread, so keep DB_CONN_MAX_AGE=0 there or connections pile up
+        conn_max_age=int(os.getenv('DB_CONN_MAX_AGE', '600')),
         conn_health_checks=True,
     )
 }
 
 
+# Cache
+# Shared by all workers: Redis in production (REDIS_URL), a file-based cache
+# locally so several runserver/gunicorn processes still see the same entries.
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'pyez',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pyez_learning_cache')),
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -219,6 +255,38 @@ SOCIALACCOUNT_QUERY_EMAIL = True
 # OpenAI API Key for AI-assisted exam creation (ChatGPT)
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# OpenAI rate limiting (shared by all worker processes through the cache): calls beyond these limits are queued
+# for up to OPENAI_MAX_QUEUE_SECONDS, then retried with exponential backoff
+OPENAI_REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', '60'))
+OPENAI_TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', '150000'))
+OPENAI_MAX_QUEUE_SECONDS = int(os.getenv('OPENAI_MAX_QUEUE_SECONDS', '90'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '5'))
+
+# OpenAI HTTP client (one keep-alive pool per worker process, warmed in gunicorn post_fork).
+# Set OPENAI_BASE_URL to a local stub server for tests; leave empty for the real API.
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+OPENAI_POOL_SIZE = int(os.getenv('OPENAI_POOL_SIZE', '10'))
+# Threads per process running AI calls for the async AI views (one call each)
+AI_WORKER_THREADS = int(os.getenv('AI_WORKER_THREADS', OPENAI_POOL_SIZE))
+OPENAI_KEEPALIVE_SECONDS = int(os.getenv('OPENAI_KEEPALIVE_SECONDS', '120'))
+OPENAI_TIMEOUT_SECONDS = int(os.getenv('OPENAI_TIMEOUT_SECONDS', '120'))
+OPENAI_CONNECT_TIMEOUT_SECONDS = int(os.getenv('OPENAI_CONNECT_TIMEOUT_SECONDS', '10'))
+
+# Sandboxed code runner for coding exams: each test case runs in its own child
+# process; at most CODE_RUNNER_WORKERS run at once per (web or grading worker) process
+CODE_RUNNER_WORKERS = int(os.getenv('CODE_RUNNER_WORKERS', '4'))
+CODE_RUNNER_TIMEOUT_SECONDS = int(os.getenv('CODE_RUNNER_TIMEOUT_SECONDS', '5'))
+CODE_RUNNER_MEMORY_MB = int(os.getenv('CODE_RUNNER_MEMORY_MB', '256'))
+CODE_RUNNER_MAX_OUTPUT_KB = int(os.getenv('CODE_RUNNER_MAX_OUTPUT_KB', '64'))
+# 'bwrap' isolates each run with bubblewrap (no network, no view of the project, uid nobody)
+# and refuses to run code if it's unavailable; 'none' only applies the limits above and
+# is for local development
+CODE_RUNNER_SANDBOX = os.getenv('CODE_RUNNER_SANDBOX', 'none' if DEBUG else 'bwrap')
+
+# Coding exam submissions are graded off the request by `manage.py run_grading_worker`;
+# this many submissions are graded at once per worker process
+GRADING_WORKER_THREADS = int(os.getenv('GRADING_WORKER_THREADS', '4'))
+
 # Default file size
 DEFAULT_CHARSET = 'utf-8'
 
@@ -0,0 +1,49 @@
+"""
+WhiteNoise static file middleware that also runs natively under ASGI.
+
+The stock WhiteNoiseMiddleware is sync-only, and one sync middleware makes
+Django run every view below it, async views included, on a thread. This
+subclass keeps the middleware chain async under the ASGI worker and streams
+static files with an async iterator instead of having Django buffer them.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+
+_FILE_BLOCK_SIZE = 64 * 1024
+
+
+async def _aiter_file(filelike):
+    if filelike is None:
+        return
+    read = sync_to_async(filelike.read, thread_sensitive=False)
+    while chunk := await read(_FILE_BLOCK_SIZE):
+        yield chunk
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+
+        response = await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        # The open file (if any) is still closed with the response
+        response.streaming_content = _aiter_file(response.file_to_stream)
+        return response
@@ -31,6 +31,7 @@ urlpatterns = [
     path('profile/', user_views.profile, name='profile'),
     path('teacher-management/', user_views.teacher_management, name='teacher_management'),
     path('toggle-teacher-status/<int:teacher_id>/', user_views.toggle_teacher_status, name='toggle_teacher_status'),
+    path('performance/', user_views.performance_summary, name='performance_summary'),
     path('', include('curriculum.urls')),  # Dashboard is here at /en/
     path('exams/', include('exams.urls')),
     path('users/', include('django.contrib.auth.urls')),
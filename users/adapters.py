@@ -2,9 +2,8 @@ from allauth.socialaccount.adapter import DefaultSocialAccountAdapter
 from allauth.account.signals import user_logged_in
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-import requests
-from io import BytesIO
-from django.core.files import File
+
+from .avatars import queue_avatar
 
 User = get_user_model()
 
@@ -59,30 +58,21 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
         return user
     
     def save_user(self, request, sociallogin, form=None):
-        """Save user to database with Google profile picture"""
+        """Save user to database; the Google profile picture is fetched in the background"""
         user = super().save_user(request, sociallogin, form)
         
         # Save Google ID
         if sociallogin.account.provider == 'google':
             user.google_id = sociallogin.account.uid
             
-            # Download and save profile picture
+            # Download, store and thumbnail the profile picture after the login commits
             extra_data = sociallogin.account.extra_data
-            if 'picture' in extra_data:
-                picture_url = extra_data['picture']
-                try:
-                    # Download the image
-                    response = requests.get(picture_url, timeout=10)
-                    if response.status_code == 200:
-                        # Create a file from the response content
-                        img_temp = BytesIO(response.content)
-                        filename = f"google_{user.google_id}.jpg"
-                        user.profile_picture.save(filename, File(img_temp), save=False)
-                except Exception as e:
-                    # If download fails, just log it and continue
-                    print(f"Failed to download profile picture: {e}")
+            if 'picture' in extra_data and not user.profile_picture:
+                user.avatar_source_url = extra_data['picture']
             
             user.save()
+            if user.avatar_source_url:
+                queue_avatar(user.pk)
         
         return user
 
@@ -90,25 +80,18 @@ class CustomSocialAccountAdapter(DefaultSocialAccountAdapter):
 @receiver(user_logged_in)
 def user_logged_in_handler(sender, **kwargs):
     """Handle post-login actions for Google OAuth users"""
-    request = kwargs['request']
     user = kwargs['user']
     
-    # Update profile picture if it's a social login and picture is missing
+    # A download still pending (lost to a restart, or failed and worth retrying) is tried again
+    if user.avatar_source_url:
+        queue_avatar(user.pk)
+        return
+    # Queue the profile picture if it's a social login and the picture is missing
+    if user.profile_picture:
+        return
     if hasattr(user, 'socialaccount_set'):
-        social_accounts = user.socialaccount_set.filter(provider='google')
-        if social_accounts.exists():
-            social_account = social_accounts.first()
-            extra_data = social_account.extra_data
-            
-            # Update profile picture if missing
-            if not user.profile_picture and 'picture' in extra_data:
-                picture_url = extra_data['picture']
-                try:
-                    response = requests.get(picture_url, timeout=10)
-                    if response.status_code == 200:
-                        img_temp = BytesIO(response.content)
-                        filename = f"google_{user.google_id}.jpg"
-                        user.profile_picture.save(filename, File(img_temp), save=True)
-                except Exception as e:
-                    print(f"Failed to update profile picture: {e}")
-
+        social_account = user.socialaccount_set.filter(provider='google').first()
+        if social_account and 'picture' in social_account.extra_data:
+            user.avatar_source_url = social_account.extra_data['picture']
+            User.objects.filter(pk=user.pk).update(avatar_source_url=user.avatar_source_url)
+            queue_avatar(user.pk)
@@ -0,0 +1,176 @@
+"""
+Profile pictures processed in the background.
+
+Google sign-in only records the avatar URL on the user (avatar_source_url);
+downloading it and uploading it to media storage happen on a small
+per-process thread pool after the login transaction commits, so login no
+longer waits on those two round-trips. The same job makes the fixed-size
+thumbnail used by the leaderboard and class lists, also for pictures the
+user uploads. Jobs lost to a restart or a failed download are queued again
+on the user's next login and picked up by `manage.py process_avatars
+--every`.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import requests
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails are shown at 40px (w-10); 2x for high-density screens
+AVATAR_THUMBNAIL_SIZE = 80
+AVATAR_DOWNLOAD_TIMEOUT_SECONDS = 10
+# Larger downloads are dropped
+AVATAR_MAX_BYTES = 5 * 1024 * 1024
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+AVATAR_WORKERS = 2
+
+
+def make_thumbnail(data):
+    """Square JPEG thumbnail of the image bytes, cropped to the center"""
+    with Image.open(BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        thumbnail = ImageOps.fit(image, (AVATAR_THUMBNAIL_SIZE, AVATAR_THUMBNAIL_SIZE), Image.LANCZOS)
+    output = BytesIO()
+    thumbnail.save(output, 'JPEG', quality=85, optimize=True)
+    return output.getvalue()
+
+
+def _download(url):
+    too_large = ValueError(f'Picture is larger than {AVATAR_MAX_BYTES} bytes')
+    # Streamed, so an oversized picture is dropped without reading it all
+    with requests.get(url, timeout=AVATAR_DOWNLOAD_TIMEOUT_SECONDS, stream=True) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length', '')
+        if length.isdigit() and int(length) > AVATAR_MAX_BYTES:
+            raise too_large
+        data = bytearray()
+        for chunk in response.iter_content(_DOWNLOAD_CHUNK_SIZE):
+            data += chunk
+            if len(data) > AVATAR_MAX_BYTES:
+                raise too_large
+    return bytes(data)
+
+
+def _store_source_picture(user):
+    """Download the pending remote picture into profile_picture; returns its bytes or None"""
+    from .models import User
+
+    url = user.avatar_source_url
+    try:
+        data = _download(url)
+        make_thumbnail(data)  # Rejects anything that isn't an image before it's stored
+    except requests.HTTPError as e:
+        if e.response is None or e.response.status_code >= 500:
+            raise  # Worth retrying later, like timeouts and connection errors
+        error = e
+    except (ValueError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        error = e
+    else:
+        error = None
+    if error is not None:
+        # Gone, too large, not an image or a decompression bomb: give up on this URL
+        logger.warning("Dropping profile picture %s of user %s: %s", url, user.pk, error)
+        User.objects.filter(pk=user.pk, avatar_source_url=url).update(avatar_source_url='')
+        return None
+
+    user.profile_picture.save(f'google_{user.google_id or user.pk}.jpg', ContentFile(data), save=False)
+    # The user may have uploaded their own picture meanwhile, which clears avatar_source_url
+    stored = User.objects.filter(pk=user.pk, avatar_source_url=url).update(
+        profile_picture=user.profile_picture.name, profile_thumbnail=None, avatar_source_url='',
+    )
+    if not stored:
+        # Nothing points at the file just written
+        user.profile_picture.delete(save=False)
+        return None
+    return data
+
+
+def process_avatar(user_id):
+    """Download a pending Google picture and/or thumbnail the profile picture of one user"""
+    from .models import User
+
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return False
+    data = None
+    if user.avatar_source_url:
+        data = _store_source_picture(user)
+        if data is None:
+            return False
+    elif not user.profile_picture or user.profile_thumbnail:
+        return False
+    else:
+        with user.profile_picture.open('rb') as picture:
+            data = picture.read()
+
+    user.profile_thumbnail.save(f'{user.pk}.jpg', ContentFile(make_thumbnail(data)), save=False)
+    # Only kept if the picture it was made from is still the current one
+    stored = User.objects.filter(pk=user.pk, profile_picture=user.profile_picture.name).update(
+        profile_thumbnail=user.profile_thumbnail.name,
+    )
+    if not stored:
+        user.profile_thumbnail.delete(save=False)
+    return bool(stored)
+
+
+def _run(user_id):
+    try:
+        close_old_connections()
+        process_avatar(user_id)
+    except Exception:
+        logger.exception("Processing the profile picture of user %s failed", user_id)
+    finally:
+        connection.close()
+
+
+# Process-wide pool, rebuilt after fork (threads don't survive into the child)
+_pool_lock = threading.Lock()
+_pool_pid = None
+_pool = None
+
+
+def _reset_after_fork():
+    global _pool_lock, _pool_pid, _pool
+    _pool_lock = threading.Lock()
+    _pool_pid = None
+    _pool = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_avatar_pool():
+    """Get or create the avatar processing pool for this process"""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    pool = _pool
+    if pool is not None and _pool_pid == pid:
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ThreadPoolExecutor(max_workers=AVATAR_WORKERS, thread_name_prefix='avatars')
+            _pool_pid = pid
+        return _pool
+
+
+def queue_avatar(user_id):
+    """Process the user's picture in the background once the current transaction commits"""
+    transaction.on_commit(lambda: get_avatar_pool().submit(_run, user_id))
+
+
+def pending_avatar_users():
+    """Users whose Google picture or thumbnail is still to be made"""
+    from .models import User
+
+    has_picture = Q(profile_picture__isnull=False) & ~Q(profile_picture='')
+    no_thumbnail = Q(profile_thumbnail__isnull=True) | Q(profile_thumbnail='')
+    return User.objects.filter(~Q(avatar_source_url='') | (has_picture & no_thumbnail))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from users.avatars import pending_avatar_users, process_avatar
+
+
+class Command(BaseCommand):
+    help = 'Download pending Google profile pictures and make missing avatar thumbnails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--every', type=int, default=0, metavar='SECONDS',
+                            help='Keep running and process pending pictures every SECONDS (default: once and exit)')
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            processed = failed = 0
+            for user_id in pending_avatar_users().values_list('pk', flat=True).iterator():
+                try:
+                    processed += process_avatar(user_id)
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'User {user_id}: {e}'))
+            if processed or failed or not options['every']:
+                self.stdout.write(self.style.SUCCESS(f'✓ Processed {processed} profile pictures ({failed} failed)'))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
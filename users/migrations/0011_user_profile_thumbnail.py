@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_user_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_source_url',
+            field=models.URLField(blank=True, default='', help_text='Google picture waiting to be downloaded', max_length=1000),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='profile_thumbnail',
+            field=models.ImageField(blank=True, max_length=500, null=True, upload_to='profiles/thumbnails/'),
+        ),
+    ]
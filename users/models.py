@@ -24,10 +24,21 @@ class User(AbstractUser):
     progress_percent = models.IntegerField(default=0, help_text='Learning progress percentage (0-100)')
     google_id = models.CharField(max_length=255, blank=True, null=True, unique=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True, max_length=500)
+    # Made from profile_picture in the background by users.avatars
+    profile_thumbnail = models.ImageField(upload_to='profiles/thumbnails/', blank=True, null=True, max_length=500)
+    avatar_source_url = models.URLField(max_length=1000, blank=True, default='', help_text='Google picture waiting to be downloaded')
     bio = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Leaderboard and star rank counts (always filtered by role)
+            models.Index(fields=['role', 'star_points'], name='user_role_stars_idx'),
+            # Class rosters and per-class counts
+            models.Index(fields=['role', 'student_class'], name='user_role_class_idx'),
+        ]
+
     def __str__(self):
         return self.username
     
@@ -35,7 +46,29 @@ class User(AbstractUser):
         """Auto-set role to admin if user is superuser or staff"""
         if self.is_superuser or self.is_staff:
             self.role = 'admin'
+        
+        # A newly uploaded picture replaces any pending Google one and needs a new thumbnail
+        update_fields = kwargs.get('update_fields')
+        picture_saved = update_fields is None or 'profile_picture' in update_fields
+        new_picture = picture_saved and bool(self.profile_picture) and not self.profile_picture._committed
+        if new_picture or (picture_saved and not self.profile_picture):
+            self.profile_thumbnail = None
+        if new_picture:
+            self.avatar_source_url = ''
         super().save(*args, **kwargs)
+        
+        if new_picture:
+            from .avatars import queue_avatar
+            queue_avatar(self.pk)
+    
+    @property
+    def avatar_thumbnail_url(self):
+        """Small avatar for lists (leaderboard, class rosters), the full picture until its thumbnail is made"""
+        if self.profile_thumbnail:
+            return self.profile_thumbnail.url
+        if self.profile_picture:
+            return self.profile_picture.url
+        return ''
     
     @property
     def is_teacher(self):
@@ -52,16 +85,14 @@ class User(AbstractUser):
         if self.role != 'student':
             return
         
-        from curriculum.models import Lesson, Progress
+        from curriculum.models import Lesson
+        from curriculum.progress_cache import get_progress_snapshot
         
         total_lessons = Lesson.objects.count()
         if total_lessons == 0:
             self.progress_percent = 0
         else:
-            completed_lessons = Progress.objects.filter(
-                student=self, 
-                is_completed=True
-            ).count()
+            completed_lessons = sum(1 for p in get_progress_snapshot(self).values() if p.is_completed)
             self.progress_percent = int((completed_lessons / total_lessons) * 100)
         
         self.save(update_fields=['progress_percent'])
\ No newline at end of file
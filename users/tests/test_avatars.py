@@ -0,0 +1,68 @@
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from users.avatars import _store_source_picture, make_thumbnail, process_avatar
+from users.models import User
+
+
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def image_bytes():
+    output = BytesIO()
+    Image.new('RGB', (120, 90), 'red').save(output, 'JPEG')
+    return output.getvalue()
+
+
+class AvatarRaceTests(TestCase):
+    def setUp(self):
+        # A fresh in-memory storage for every test
+        self.enterContext(override_settings(STORAGES=TEST_STORAGES))
+
+    def stored_files(self, directory):
+        return default_storage.listdir(directory)[1]
+
+    def test_google_picture_is_stored_and_thumbnailed(self):
+        user = User.objects.create_user('student', password='x', avatar_source_url='https://example.com/a.jpg')
+
+        with mock.patch('users.avatars._download', return_value=image_bytes()):
+            self.assertTrue(process_avatar(user.pk))
+
+        user.refresh_from_db()
+        self.assertEqual(user.avatar_source_url, '')
+        self.assertTrue(user.profile_picture)
+        self.assertTrue(user.profile_thumbnail)
+
+    def test_google_picture_losing_to_an_upload_is_deleted(self):
+        user = User.objects.create_user('student', password='x', avatar_source_url='https://example.com/a.jpg')
+        # The user uploads their own picture while the download runs
+        User.objects.filter(pk=user.pk).update(avatar_source_url='', profile_picture='profiles/own.jpg')
+
+        with mock.patch('users.avatars._download', return_value=image_bytes()):
+            self.assertIsNone(_store_source_picture(user))
+
+        self.assertEqual(self.stored_files('profiles'), [])
+        self.assertEqual(User.objects.get(pk=user.pk).profile_picture.name, 'profiles/own.jpg')
+
+    def test_thumbnail_of_a_replaced_picture_is_deleted(self):
+        user = User.objects.create_user('student', password='x')
+        user.profile_picture.save('old.jpg', ContentFile(image_bytes()))
+
+        def replace_picture_meanwhile(data):
+            # A new picture is uploaded while the thumbnail of the old one is made
+            User.objects.filter(pk=user.pk).update(profile_picture='profiles/new.jpg')
+            return make_thumbnail(data)
+
+        with mock.patch('users.avatars.make_thumbnail', side_effect=replace_picture_meanwhile):
+            self.assertFalse(process_avatar(user.pk))
+
+        self.assertEqual(self.stored_files('profiles/thumbnails'), [])
+        self.assertFalse(User.objects.get(pk=user.pk).profile_thumbnail)
@@ -139,6 +139,25 @@ def toggle_teacher_status(request, teacher_id):
     
     return JsonResponse({'success': False, 'error': 'Invalid request method'}, status=400)
 
+@login_required(login_url='signin')
+@user_passes_test(is_admin_or_superuser, login_url='dashboard')
+def performance_summary(request):
+    """Per-view latency and query counts from the request metrics buffer (admin only)"""
+    from django.conf import settings
+    from pyez_learning.middleware import get_request_metrics_summary, clear_request_metrics
+    from exams.ai_converter import get_ai_metrics
+    
+    if request.method == 'POST':
+        clear_request_metrics()
+        return redirect('performance_summary')
+    
+    context = {
+        'enabled': getattr(settings, 'REQUEST_METRICS_ENABLED', False),
+        'views': get_request_metrics_summary(),
+        'ai_metrics': get_ai_metrics(),
+    }
+    return render(request, 'auth/performance.html', context)
+
 @login_required(login_url='signin')
 @require_http_methods(["GET", "POST"])
 def profile(request):